@@ -0,0 +1,518 @@
+import asyncio
+import collections
+import copy
+import itertools
+import json
+import math
+import threading
+import urllib.parse
+import urllib.request
+import uuid
+from datetime import datetime, timezone
+
+from .data import fetch_bars
+from .strategies import STRATEGIES
+from .universe import get_universe
+try:
+    from config import (ALERT_POLL_SECONDS, ALERT_HISTORY, ALERT_WEBHOOK_URL, ALERT_WEBHOOK_ALLOWLIST,
+                        ALERT_WEBHOOK_TIMEOUT_SECONDS)
+except ImportError:
+    try:
+        from ..config import (ALERT_POLL_SECONDS, ALERT_HISTORY, ALERT_WEBHOOK_URL, ALERT_WEBHOOK_ALLOWLIST,
+                              ALERT_WEBHOOK_TIMEOUT_SECONDS)
+    except ImportError:
+        from backend.config import (ALERT_POLL_SECONDS, ALERT_HISTORY, ALERT_WEBHOOK_URL, ALERT_WEBHOOK_ALLOWLIST,
+                                    ALERT_WEBHOOK_TIMEOUT_SECONDS)
+
+# History fetched per interval to warm up a symbol's state, and the shorter
+# window fetched on later polls, which only has to reach back to the last
+# confirmed bar (the full history is refetched if it doesn't).
+ALERT_PERIODS = {"1d": "6mo", "5m": "5d"}
+ALERT_UPDATE_PERIODS = {"1d": "1mo", "5m": "1d"}
+
+
+def _now():
+    return datetime.now(timezone.utc).astimezone().isoformat()
+
+
+# --- Incremental indicators: O(1) per bar, matching the vectorbt versions ---
+
+class _RollingMean:
+    __slots__ = ("window", "values", "total")
+
+    def __init__(self, window):
+        self.window = window
+        self.values = collections.deque()
+        self.total = 0.0
+
+    def update(self, x):
+        self.values.append(x)
+        self.total += x
+        if len(self.values) > self.window:
+            self.total -= self.values.popleft()
+        return self.total / self.window if len(self.values) == self.window else math.nan
+
+
+class MAState:
+    """Simple moving average of closes (vbt.MA)."""
+
+    __slots__ = ("mean", "value")
+
+    def __init__(self, window):
+        self.mean = _RollingMean(window)
+        self.value = math.nan
+
+    def update(self, close):
+        self.value = self.mean.update(close)
+        return self.value
+
+
+class RSIState:
+    """RSI with rolling-mean gains/losses, as vbt.RSI computes it by default."""
+
+    __slots__ = ("gains", "losses", "prev", "value")
+
+    def __init__(self, window):
+        self.gains = _RollingMean(window)
+        self.losses = _RollingMean(window)
+        self.prev = None
+        self.value = math.nan
+
+    def update(self, close):
+        if self.prev is not None:
+            change = close - self.prev
+            gain = self.gains.update(max(change, 0.0))
+            loss = self.losses.update(max(-change, 0.0))
+            if loss:
+                self.value = 100.0 - 100.0 / (1.0 + gain / loss)
+            else:
+                # No losses in the window: 100, or undefined if flat (0/0)
+                self.value = 100.0 if gain > 0 else math.nan
+        self.prev = close
+        return self.value
+
+
+class CloseState:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = math.nan
+
+    def update(self, close):
+        self.value = close
+        return close
+
+
+def _make_indicator(key):
+    kind, *params = key
+    if kind == "ma":
+        return MAState(*params)
+    if kind == "rsi":
+        return RSIState(*params)
+    return CloseState()
+
+
+# --- Rules ---
+
+RULE_KINDS = ("rsi_cross", "ma_cross", "price_cross", "signal")
+
+
+def _gt(a, b):
+    return None if math.isnan(a) or math.isnan(b) else bool(a > b)
+
+
+def _lt(a, b):
+    return None if math.isnan(a) or math.isnan(b) else bool(a < b)
+
+
+def _rule_spec(kind, params):
+    """(indicator keys, condition(values) -> bool|None, description) for a rule.
+
+    An alert fires on the bar where the condition turns from False to True.
+    """
+    direction = params.get("direction", "above")
+    if direction not in ("above", "below"):
+        raise ValueError("direction must be 'above' or 'below'")
+    cmp = _gt if direction == "above" else _lt
+
+    if kind == "rsi_cross":
+        window, level = int(params.get("window", 14)), float(params.get("level", 30))
+        key = ("rsi", window)
+        return [key], lambda v: cmp(v[key], level), f"RSI({window}) crosses {direction} {level:g}"
+
+    if kind == "ma_cross":
+        fast, slow = int(params.get("fast", 10)), int(params.get("slow", 30))
+        if fast >= slow:
+            raise ValueError("fast must be shorter than slow")
+        f, s = ("ma", fast), ("ma", slow)
+        return [f, s], lambda v: cmp(v[f], v[s]), f"MA{fast} crosses {direction} MA{slow}"
+
+    if kind == "price_cross":
+        if "level" not in params:
+            raise ValueError("price_cross needs a level")
+        level = float(params["level"])
+        key = ("close",)
+        return [key], lambda v: cmp(v[key], level), f"Close crosses {direction} {level:g}"
+
+    if kind == "signal":
+        # A registered strategy's analysis signal flipping to Buy/Sell
+        strategy, to = params.get("strategy", "momentum"), params.get("to", "Buy")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy '{strategy}'")
+        if to not in ("Buy", "Sell"):
+            raise ValueError("to must be 'Buy' or 'Sell'")
+        spec = STRATEGIES[strategy]
+        p = spec["params"]
+        buy = to == "Buy"
+        if spec["indicator"] == "ma_cross":
+            f, s = ("ma", p.get("fast", 10)), ("ma", p.get("slow", 30))
+            keys, cond = [f, s], (lambda v: _gt(v[f], v[s])) if buy else (lambda v: _lt(v[f], v[s]))
+        elif spec["indicator"] == "rsi_band":
+            key = ("rsi", p.get("window", 14))
+            lower, upper = p.get("lower", 30), p.get("upper", 55)
+            keys, cond = [key], (lambda v: _lt(v[key], lower)) if buy else (lambda v: _gt(v[key], upper))
+        else:
+            raise ValueError(f"Strategy '{strategy}' can't be evaluated incrementally")
+        return keys, cond, f"{strategy} signal turns {to}"
+
+    raise ValueError(f"Unknown rule kind '{kind}'. Choose from {list(RULE_KINDS)}")
+
+
+class Rule:
+    __slots__ = ("id", "kind", "params", "index", "symbols", "interval", "webhook", "created",
+                 "keys", "condition", "description")
+
+    def __init__(self, kind, params, symbols, interval, index=None, webhook=None):
+        self.keys, self.condition, self.description = _rule_spec(kind, params)
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.params = params
+        self.index = index
+        self.symbols = tuple(symbols)
+        self.interval = interval
+        self.webhook = webhook
+        self.created = _now()
+
+    def to_dict(self):
+        return {
+            "rule_id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "description": self.description,
+            "index": self.index,
+            "symbols": list(self.symbols),
+            "interval": self.interval,
+            "webhook": self.webhook,
+            "created": self.created,
+        }
+
+
+class _SymbolState:
+    """Indicator state and rule outcomes for one (symbol, interval).
+
+    Both are as of `last_ts`, the last confirmed bar. The newest bar may still
+    be forming, so it is only ever applied to a fork; `fired` (shared with
+    forks) records the bar each rule last fired on so it doesn't fire twice.
+    """
+
+    __slots__ = ("last_ts", "indicators", "conditions", "fired")
+
+    def __init__(self):
+        self.last_ts = None
+        self.indicators = {}
+        self.conditions = {}
+        self.fired = {}
+
+    def feed(self, close):
+        for ind in self.indicators.values():
+            ind.update(close)
+        return {key: ind.value for key, ind in self.indicators.items()}
+
+    def fork(self):
+        state = _SymbolState()
+        state.last_ts = self.last_ts
+        state.indicators = copy.deepcopy(self.indicators)
+        state.conditions = dict(self.conditions)
+        state.fired = self.fired
+        return state
+
+
+class AlertEngine:
+    """Evaluates alert rules against newly arrived bars only.
+
+    Each (symbol, interval) keeps incremental indicator state (MA/RSI running
+    sums) and the last outcome of every rule watching it, so a poll costs
+    O(new bars x rules) after the first one warms the state up from history.
+    Bars are fetched outside the evaluation lock. Fired alerts go to the
+    history (`since`), SSE subscribers and webhooks.
+    """
+
+    def __init__(self, poll_seconds=ALERT_POLL_SECONDS, history=ALERT_HISTORY, webhook=ALERT_WEBHOOK_URL,
+                 webhook_allowlist=ALERT_WEBHOOK_ALLOWLIST):
+        self.poll_seconds = poll_seconds
+        self.webhook = webhook
+        self.webhook_allowlist = list(webhook_allowlist)
+        self._lock = threading.Lock()
+        self._eval_lock = threading.Lock()
+        self._rules = {}
+        self._states = {}
+        self._seq = itertools.count(1)
+        self._history = collections.deque(maxlen=history)
+        self._subscribers = set()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # Rules
+
+    def add_rule(self, kind, params, symbols, interval="1d", index=None, webhook=None):
+        """Register a rule (ValueError on bad parameters) and start polling."""
+        if interval not in ALERT_PERIODS:
+            raise ValueError(f"interval must be one of {list(ALERT_PERIODS)}")
+        if webhook and not _webhook_allowed(webhook, self.webhook_allowlist):
+            raise ValueError("webhook is not in ALERT_WEBHOOK_ALLOWLIST")
+        rule = Rule(kind, params, symbols, interval, index=index, webhook=webhook)
+        with self._lock:
+            self._rules[rule.id] = rule
+        self.start()
+        return rule
+
+    def remove_rule(self, rule_id):
+        with self._lock:
+            rule = self._rules.pop(rule_id, None)
+        if rule is not None:
+            with self._eval_lock:
+                for symbol in rule.symbols:
+                    state = self._states.get((symbol, rule.interval))
+                    if state is not None:
+                        state.conditions.pop(rule_id, None)
+                        state.fired.pop(rule_id, None)
+        return rule
+
+    def rules(self):
+        with self._lock:
+            return [rule.to_dict() for rule in self._rules.values()]
+
+    # Evaluation
+
+    def _groups(self):
+        with self._lock:
+            rules = list(self._rules.values())
+        groups = {}
+        for rule in rules:
+            for symbol in rule.symbols:
+                groups.setdefault((symbol, rule.interval), []).append(rule)
+        return groups
+
+    def evaluate(self):
+        """Feed every watched symbol its new bars; returns the alerts fired."""
+        groups = self._groups()
+        with self._eval_lock:
+            # Drop state nobody watches any more
+            for key in [k for k in self._states if k not in groups]:
+                del self._states[key]
+
+        fired = []
+        for (symbol, interval), rules in groups.items():
+            try:
+                fired.extend(self._evaluate_symbol(symbol, interval, rules))
+            except Exception as e:
+                print(f"Alert evaluation failed for {symbol}: {e}")
+
+        for alert in fired:
+            self._publish(alert)
+        return fired
+
+    def _evaluate_symbol(self, symbol, interval, rules):
+        keys = {key for rule in rules for key in rule.keys}
+        with self._eval_lock:
+            state = self._states.get((symbol, interval))
+            last_ts = state.last_ts if state is not None and keys.issubset(state.indicators) else None
+
+        # Network calls happen without the lock; a warm state only needs recent bars
+        bars = None
+        if last_ts is not None:
+            bars = fetch_bars(symbol, period=ALERT_UPDATE_PERIODS[interval], interval=interval)
+            if bars.empty or bars.index[0] > last_ts:
+                bars = None
+        if bars is None:
+            bars = fetch_bars(symbol, period=ALERT_PERIODS[interval], interval=interval)
+        if bars.empty:
+            return []
+
+        with self._eval_lock:
+            return self._apply(symbol, interval, rules, keys, bars)
+
+    def _apply(self, symbol, interval, rules, keys, bars):
+        state = self._states.get((symbol, interval))
+        if (state is None or not keys.issubset(state.indicators)
+                or state.last_ts is None or bars.index[0] > state.last_ts):
+            # First sight of this symbol (a rule needing a new indicator, or a
+            # gap in the bars): warm up from history without firing
+            state = _SymbolState()
+            state.indicators = {key: _make_indicator(key) for key in keys}
+            for close in bars.close[:-1].tolist():
+                if not math.isnan(close):
+                    state.feed(close)
+            state.last_ts = bars.index[-2] if len(bars) > 1 else None
+            self._states[(symbol, interval)] = state
+            values = {key: ind.value for key, ind in state.indicators.items()}
+            for rule in rules:
+                state.conditions[rule.id] = rule.condition(values)
+            start = len(bars) - 1
+        else:
+            start = bars.index.searchsorted(state.last_ts, side="right")
+
+        # A rule added since the last poll starts from the current outcome
+        values = {key: ind.value for key, ind in state.indicators.items()}
+        for rule in rules:
+            if rule.id not in state.conditions:
+                state.conditions[rule.id] = rule.condition(values)
+
+        fired = []
+        last = len(bars) - 1
+        for i in range(start, last):
+            close = float(bars.close[i])
+            if not math.isnan(close):
+                fired.extend(self._step(state, rules, symbol, bars.index[i], close))
+            state.last_ts = bars.index[i]
+        # The newest bar may still be forming: apply it to a fork, so the next
+        # poll re-applies its final values from the confirmed state
+        close = float(bars.close[last])
+        if start <= last and not math.isnan(close):
+            fired.extend(self._step(state.fork(), rules, symbol, bars.index[last], close))
+        return fired
+
+    def _step(self, state, rules, symbol, ts, close):
+        values = state.feed(close)
+        fired = []
+        for rule in rules:
+            now = rule.condition(values)
+            if now and state.conditions.get(rule.id) is False and state.fired.get(rule.id) != ts:
+                state.fired[rule.id] = ts
+                fired.append(self._alert(rule, symbol, ts, close, values))
+            state.conditions[rule.id] = now
+        return fired
+
+    def _alert(self, rule, symbol, ts, close, values):
+        return {
+            "rule_id": rule.id,
+            "kind": rule.kind,
+            "description": rule.description,
+            "symbol": symbol,
+            "index": rule.index,
+            "interval": rule.interval,
+            "bar_time": ts.isoformat(),
+            "close": close,
+            "values": {"_".join(map(str, key)): _finite(v) for key, v in values.items() if key in rule.keys},
+            "message": f"{symbol}: {rule.description}",
+            "webhook": rule.webhook,
+        }
+
+    # Delivery
+
+    def _publish(self, alert):
+        webhook = alert.pop("webhook") or self.webhook
+        with self._lock:
+            alert["seq"] = next(self._seq)
+            alert["fired_at"] = _now()
+            self._history.append(alert)
+            subscribers = list(self._subscribers)
+        for loop, q in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, q, alert)
+            except RuntimeError:
+                pass  # subscriber's event loop has closed
+        if webhook:
+            threading.Thread(target=_post_webhook, args=(webhook, alert), daemon=True).start()
+
+    def since(self, seq=0):
+        with self._lock:
+            return [a for a in self._history if a["seq"] > seq]
+
+    def subscribe(self, maxsize=1000):
+        """An asyncio.Queue of fired alerts; call from the event loop that reads it."""
+        q = asyncio.Queue(maxsize=maxsize)
+        with self._lock:
+            self._subscribers.add((asyncio.get_running_loop(), q))
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers = {sub for sub in self._subscribers if sub[1] is not q}
+
+    # Polling
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="alert-engine", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self._rules:
+                self.evaluate()
+            self._stop.wait(self.poll_seconds)
+
+    def status(self):
+        with self._lock:
+            return {
+                "rules": len(self._rules),
+                "watched": len(self._states),
+                "subscribers": len(self._subscribers),
+                "poll_seconds": self.poll_seconds,
+                "last_seq": self._history[-1]["seq"] if self._history else 0,
+                "running": self._thread is not None and self._thread.is_alive(),
+            }
+
+
+def _finite(value):
+    return value if value is not None and not math.isnan(value) else None
+
+
+def _offer(q, alert):
+    try:
+        q.put_nowait(alert)
+    except asyncio.QueueFull:
+        pass  # slow consumer; it can catch up from /api/alerts?since=
+
+
+def _webhook_allowed(url, allowlist):
+    """Does `url` start with an allowlisted prefix (same scheme and host, path within)?"""
+    target = urllib.parse.urlsplit(url)
+    for prefix in allowlist:
+        allowed = urllib.parse.urlsplit(prefix)
+        if (target.scheme, target.netloc.lower()) == (allowed.scheme, allowed.netloc.lower()) \
+                and target.path.startswith(allowed.path):
+            return True
+    return False
+
+
+def _post_webhook(url, alert):
+    body = json.dumps(alert).encode("utf-8")
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"}, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=ALERT_WEBHOOK_TIMEOUT_SECONDS):
+            pass
+    except Exception as e:
+        print(f"Alert webhook {url} failed: {e}")
+
+
+def resolve_symbols(index=None, symbol=None):
+    """Symbols a rule watches: one symbol, or every constituent of an index."""
+    if symbol:
+        return [symbol]
+    universe = get_universe()
+    name = universe.resolve(index)
+    if name is None:
+        raise ValueError(f"Index '{index}' not found")
+    return list(universe.members(name))
+
+
+# Process-wide engine shared by the API endpoints
+ALERT_ENGINE = AlertEngine()
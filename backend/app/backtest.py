@@ -1,6 +1,12 @@
 import vectorbt as vbt
 import numpy as np
-from .strategies import momentum_strategy, mean_reversion_strategy
+from .strategies import (
+    momentum_strategy, mean_reversion_strategy, latest_indicators,
+    STRATEGIES, strategy_signals, stacked_signals,
+)
+from .costs import broadcast_costs
+from .bars import as_bars
+from .robustness import bootstrap_returns
 
 
 def _to_float(x):
@@ -14,46 +20,41 @@ def _to_float(x):
         return None
 
 
-def run_backtest(data):
-    close = data["Close"]
-    # Ensure `close` is a Series (single column). If yfinance returned a DataFrame
-    # (multi-index columns when a ticker is present), pick the first column to
-    # keep downstream indicator logic simple.
-    try:
-        # pandas DataFrame has `columns` attribute
-        if hasattr(close, 'columns'):
-            close = close.iloc[:, 0]
-    except Exception:
-        pass
+def run_backtest(data, costs=None):
+    # `data` is Bars (or a provider DataFrame, normalised once here)
+    close = as_bars(data).close_series()
 
     m_entries, m_exits = momentum_strategy(close)
     mr_entries, mr_exits = mean_reversion_strategy(close)
 
-    pf_m = vbt.Portfolio.from_signals(close, m_entries, m_exits)
-    pf_mr = vbt.Portfolio.from_signals(close, mr_entries, mr_exits)
+    # `costs` are from_signals kwargs from `resolve_costs`, resolved once per scan
+    costs = costs or {}
+    pf_m = vbt.Portfolio.from_signals(close, m_entries, m_exits, **costs)
+    pf_mr = vbt.Portfolio.from_signals(close, mr_entries, mr_exits, **costs)
 
     m_ret = _to_float(pf_m.total_return())
     mr_ret = _to_float(pf_mr.total_return())
+    rsi, ma_spread = latest_indicators(close)
 
     return {
         "momentum_return": round(m_ret * 100, 2) if m_ret is not None else None,
         "mean_rev_return": round(mr_ret * 100, 2) if mr_ret is not None else None,
+        "rsi": _to_float(rsi),
+        "ma_spread_pct": _to_float(ma_spread),
     }
 
 
-def run_analysis(data, freq=None):
-    close = data["Close"]
-    try:
-        if hasattr(close, 'columns'):
-            close = close.iloc[:, 0]
-    except Exception:
-        pass
+def run_analysis(data, freq=None, costs=None, robustness=None):
+    # robustness: optional bootstrap_returns kwargs (n_samples, block, seed);
+    # adds resampled confidence intervals to each strategy's metrics
+    close = as_bars(data).close_series()
 
     m_entries, m_exits = momentum_strategy(close)
     mr_entries, mr_exits = mean_reversion_strategy(close)
 
-    mom_pf = vbt.Portfolio.from_signals(close, m_entries, m_exits, init_cash=100000, freq=freq)
-    rev_pf = vbt.Portfolio.from_signals(close, mr_entries, mr_exits, init_cash=100000, freq=freq)
+    costs = costs or {}
+    mom_pf = vbt.Portfolio.from_signals(close, m_entries, m_exits, init_cash=100000, freq=freq, **costs)
+    rev_pf = vbt.Portfolio.from_signals(close, mr_entries, mr_exits, init_cash=100000, freq=freq, **costs)
 
     def get_metrics(pf):
         return {
@@ -93,8 +94,121 @@ def run_analysis(data, freq=None):
     elif is_long_term_good:
         recommendation = "Long Term Buy"
 
+    if robustness is not None:
+        mom_metrics["robustness"] = bootstrap_returns(mom_pf.returns(), freq=freq, **robustness)
+        rev_metrics["robustness"] = bootstrap_returns(rev_pf.returns(), freq=freq, **robustness)
+
+    rsi, ma_spread = latest_indicators(close)
+
     return {
+        "rsi": _to_float(rsi),
+        "ma_spread_pct": _to_float(ma_spread),
         "momentum": {**mom_metrics, "signal": mom_signal},
         "mean_reversion": {**rev_metrics, "signal": rev_signal},
         "recommendation": recommendation
     }
+
+
+def run_portfolio_backtest(close, strategy="momentum", freq=None, init_cash=100000, weight=None, costs=None, membership=None):
+    """Simulate a strategy over a whole universe as one cash-sharing portfolio.
+
+    - close: aligned close matrix (columns are symbols)
+    - weight: fraction of `init_cash` committed per entry (defaults to 1/N)
+    - costs: from_signals cost kwargs from `resolve_costs`, broadcast per symbol
+    - membership: optional bool array shaped like `close`; entries are only
+      taken while a symbol is an index member and positions exit when it leaves
+    """
+    entries, exits = strategy_signals(strategy, close)
+    if membership is not None:
+        entries = entries & membership
+        exits = exits | ~membership
+
+    n_symbols = close.shape[1]
+    weight = weight if weight is not None else 1.0 / n_symbols
+
+    # One simulation for all constituents: a single group sharing one cash
+    # account, sells processed before buys on each bar so freed cash can be
+    # reused, and a fixed INR allocation per position.
+    pf = vbt.Portfolio.from_signals(
+        close, entries, exits,
+        init_cash=init_cash,
+        cash_sharing=True,
+        group_by=True,
+        call_seq="auto",
+        size=init_cash * weight,
+        size_type="value",
+        freq=freq,
+        **broadcast_costs(costs or {}, n_symbols),
+    )
+
+    equity = pf.value()
+    traded_value = float((pf.asset_flow().abs() * close).sum().sum())
+    avg_equity = float(equity.mean()) if len(equity) else 0.0
+
+    # Per-symbol PnL: all cash paid/received for the symbol plus what is still held
+    pnl = pf.cash_flow(group_by=False).sum() + pf.asset_value(group_by=False).iloc[-1]
+    contributions = []
+    for symbol, value in pnl.items():
+        contributions.append({
+            "symbol": symbol,
+            "pnl": _to_float(value),
+            "contribution_pct": _to_float(value / init_cash * 100),
+        })
+    contributions.sort(key=lambda c: c["pnl"] or 0, reverse=True)
+
+    return {
+        "strategy": strategy,
+        "symbols": n_symbols,
+        "init_cash": init_cash,
+        "final_value": _to_float(equity.iloc[-1]) if len(equity) else None,
+        "return_pct": _to_float(pf.total_return() * 100),
+        "sharpe": _to_float(pf.sharpe_ratio()),
+        "max_dd_pct": _to_float(pf.max_drawdown() * 100),
+        "turnover": _to_float(traded_value / avg_equity) if avg_equity else None,
+        "equity": [
+            {"date": ts.isoformat(), "value": _to_float(v)}
+            for ts, v in equity.items()
+        ],
+        "contributions": contributions,
+    }
+
+
+def run_strategy_matrix(close, strategies=None, freq=None, costs=None):
+    """Backtest every strategy on every symbol in one simulation.
+
+    Signals for all strategies are stacked into one (bars x strategies*symbols)
+    tensor, so vectorbt runs a single simulation and metrics come back as
+    Series over the (strategy, symbol) columns. Returns
+    {symbol: {strategy: metrics}}.
+    """
+    names = list(strategies or STRATEGIES)
+    price, entries, exits = stacked_signals(close, names)
+    pf = vbt.Portfolio.from_signals(
+        price, entries, exits,
+        init_cash=100000,
+        freq=freq,
+        **broadcast_costs(costs or {}, price.shape[1]),
+    )
+
+    metrics = {
+        "return_pct": pf.total_return() * 100,
+        "sharpe": pf.sharpe_ratio(),
+        "max_dd_pct": pf.max_drawdown() * 100,
+        "win_rate_pct": pf.trades.win_rate() * 100,
+    }
+    last_entry = entries.iloc[-1] if len(entries) else None
+    last_exit = exits.iloc[-1] if len(exits) else None
+
+    matrix = {symbol: {} for symbol in close.columns}
+    for col in price.columns:
+        strategy, symbol = col
+        signal = "Neutral"
+        if last_entry is not None and last_entry[col]:
+            signal = "Buy"
+        elif last_exit is not None and last_exit[col]:
+            signal = "Sell"
+        matrix[symbol][strategy] = {
+            **{name: _to_float(series[col]) for name, series in metrics.items()},
+            "signal": signal,
+        }
+    return matrix
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+BAR_FIELDS = ("open", "high", "low", "close", "volume")
+_FRAME_COLUMNS = {"open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume"}
+
+
+class Bars:
+    """OHLCV bars for one symbol in one canonical layout.
+
+    Each field is a contiguous float64 array aligned with a DatetimeIndex.
+    Provider quirks (yfinance's (field, ticker) MultiIndex columns, Kite's
+    lower-case names, missing Volume) are resolved once in `from_frame`, so
+    the backtest and scanner code never has to probe column shapes again.
+    `close_series()` / `to_frame()` wrap the arrays without copying them.
+    """
+
+    __slots__ = ("symbol", "index") + BAR_FIELDS
+
+    def __init__(self, index, open, high, low, close, volume, symbol=None):
+        self.symbol = symbol
+        self.index = index
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    @classmethod
+    def from_frame(cls, frame, symbol=None):
+        """Normalise a provider DataFrame (flat or MultiIndex columns)."""
+        if frame is None or frame.empty:
+            return cls.no_data(symbol)
+
+        n = len(frame)
+        arrays = {}
+        for field, column in _FRAME_COLUMNS.items():
+            if column in frame.columns:
+                values = frame[column]
+                if values.ndim == 2:
+                    # yfinance: one sub-column per ticker; we only ever ask for one
+                    values = values.iloc[:, 0]
+                arrays[field] = np.ascontiguousarray(values.to_numpy(dtype=np.float64, na_value=np.nan))
+            else:
+                arrays[field] = np.full(n, np.nan)
+        return cls(pd.DatetimeIndex(frame.index), symbol=symbol, **arrays)
+
+    @classmethod
+    def no_data(cls, symbol=None):
+        # Not named `empty`: that's the property below
+        nothing = np.empty(0, dtype=np.float64)
+        return cls(pd.DatetimeIndex([]), nothing, nothing, nothing, nothing, nothing, symbol=symbol)
+
+    def __len__(self):
+        return len(self.close)
+
+    @property
+    def empty(self):
+        return len(self.close) == 0
+
+    @property
+    def last_close(self):
+        if not len(self.close):
+            return None
+        val = float(self.close[-1])
+        return None if np.isnan(val) else val
+
+    def close_series(self):
+        return pd.Series(self.close, index=self.index, name="Close", copy=False)
+
+    def to_frame(self):
+        return pd.DataFrame(
+            {column: getattr(self, field) for field, column in _FRAME_COLUMNS.items()},
+            index=self.index,
+            copy=False,
+        )
+
+
+def as_bars(data, symbol=None):
+    """Accept either Bars or a provider DataFrame."""
+    return data if isinstance(data, Bars) else Bars.from_frame(data, symbol=symbol)
@@ -0,0 +1,230 @@
+"""Bulk-load NSE bhavcopy files into the local bar store.
+
+Usage (from the `backend` directory):
+
+    python -m app.bhavcopy /path/to/bhavcopies --actions corporate_actions.csv
+
+Files are read in date order, a batch at a time, so years of history never
+sit in memory at once. Each batch is parsed into one frame and split by
+symbol with a single groupby. Raw bars are appended to the store's `raw/1d`
+area; at the end every touched symbol is re-adjusted for splits/bonuses and
+written to `1d`, which is what `fetch_data` reads.
+
+Corporate actions file (CSV): symbol, ex_date, action, ratio
+    split  "10:2"  face value 10 -> 2, prices before ex_date x 0.2
+    bonus  "1:1"   1 new share per 1 held, prices before ex_date x 0.5
+An optional `factor` column overrides action/ratio with an explicit price multiplier.
+"""
+import argparse
+import io
+import os
+import re
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from .store import BAR_COLUMNS, append_bars, read_bars, write_bars
+
+# Column names across bhavcopy generations -> store columns, with each
+# layout's date format. Formats are explicit: guessing would read the UDiFF
+# ISO date 2024-07-08 day-first as 7 August.
+_FORMATS = [
+    # UDiFF common bhavcopy (2024-), TradDt like 2024-07-08
+    ({"TckrSymb": "symbol", "SctySrs": "series", "TradDt": "date", "OpnPric": "Open",
+      "HghPric": "High", "LwPric": "Low", "ClsPric": "Close", "TtlTradgVol": "Volume"}, "%Y-%m-%d"),
+    # Full bhavcopy with delivery data (sec_bhavdata_full), DATE1 like 08-Jul-2024
+    ({"SYMBOL": "symbol", "SERIES": "series", "DATE1": "date", "OPEN_PRICE": "Open",
+      "HIGH_PRICE": "High", "LOW_PRICE": "Low", "CLOSE_PRICE": "Close", "TTL_TRD_QNTY": "Volume"}, "%d-%b-%Y"),
+    # Legacy cmDDMONYYYYbhav.csv, TIMESTAMP like 08-JUL-2024
+    ({"SYMBOL": "symbol", "SERIES": "series", "TIMESTAMP": "date", "OPEN": "Open",
+      "HIGH": "High", "LOW": "Low", "CLOSE": "Close", "TOTTRDQTY": "Volume"}, "%d-%b-%Y"),
+]
+
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+_DATE_IN_NAME = re.compile(r"(\d{8})|(\d{2}[A-Z]{3}\d{4})", re.IGNORECASE)
+
+
+def _file_sort_key(path):
+    # Order by the trade date embedded in the file name when there is one
+    name = os.path.basename(path)
+    m = _DATE_IN_NAME.search(name)
+    if m:
+        try:
+            if m.group(1):
+                return pd.to_datetime(m.group(1), format="%Y%m%d"), name
+            return pd.to_datetime(m.group(2), format="%d%b%Y"), name
+        except ValueError:
+            pass
+    return pd.Timestamp.max, name
+
+
+def list_bhavcopy_files(directory):
+    files = [
+        os.path.join(directory, f) for f in os.listdir(directory)
+        if f.lower().endswith((".csv", ".zip"))
+    ]
+    return sorted(files, key=_file_sort_key)
+
+
+def _read_csv(source):
+    frame = pd.read_csv(source, skipinitialspace=True, dtype=str)
+    frame.columns = [c.strip() for c in frame.columns]
+    return frame
+
+
+def read_bhavcopy(path, series=("EQ",)):
+    """Parse one bhavcopy CSV or ZIP into symbol/date/OHLCV rows."""
+    if path.lower().endswith(".zip"):
+        with zipfile.ZipFile(path) as zf:
+            frames = [
+                _read_csv(io.BytesIO(zf.read(name)))
+                for name in zf.namelist() if name.lower().endswith(".csv")
+            ]
+        frame = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    else:
+        frame = _read_csv(path)
+
+    for mapping, date_format in _FORMATS:
+        if set(mapping).issubset(frame.columns):
+            break
+    else:
+        raise ValueError(f"Unrecognised bhavcopy format: {path}")
+
+    frame = frame[list(mapping)].rename(columns=mapping)
+    frame["series"] = frame["series"].str.strip()
+    if series:
+        frame = frame[frame["series"].isin(series)]
+    frame["symbol"] = frame["symbol"].str.strip()
+    frame["date"] = pd.to_datetime(frame["date"].str.strip(), format=date_format)
+    for col in BAR_COLUMNS:
+        frame[col] = pd.to_numeric(frame[col], errors="coerce").astype(np.float64)
+    return frame.drop(columns="series")
+
+
+def _parse_ratio(ratio):
+    a, b = (float(x) for x in str(ratio).split(":"))
+    return a, b
+
+
+def _parse_ex_date(value):
+    # ISO (2024-07-08) as written, anything else as the day-first dates NSE publishes
+    text = str(value).strip()
+    if _ISO_DATE.match(text):
+        return pd.to_datetime(text, format="ISO8601")
+    return pd.to_datetime(text, dayfirst=True)
+
+
+def load_corporate_actions(path):
+    """Read the actions file into {symbol: (ex_dates, price_factors)}, sorted by date."""
+    actions = pd.read_csv(path, skipinitialspace=True)
+    actions.columns = [c.strip().lower() for c in actions.columns]
+    actions["ex_date"] = actions["ex_date"].map(_parse_ex_date).astype("datetime64[ns]")
+
+    def factor(row):
+        if "factor" in row and pd.notna(row["factor"]):
+            return float(row["factor"])
+        a, b = _parse_ratio(row["ratio"])
+        action = str(row["action"]).strip().lower()
+        if action == "split":
+            return b / a
+        if action == "bonus":
+            return b / (a + b)
+        raise ValueError(f"Unknown corporate action '{row['action']}' for {row['symbol']}")
+
+    actions["factor"] = actions.apply(factor, axis=1)
+    result = {}
+    for symbol, group in actions.sort_values("ex_date").groupby("symbol"):
+        result[str(symbol).strip()] = (group["ex_date"].to_numpy(), group["factor"].to_numpy(np.float64))
+    return result
+
+
+def adjust_bars(bars, ex_dates, factors):
+    """Back-adjust prices/volume for actions with ex-date after each bar.
+
+    Each bar's multiplier is the product of factors of all later ex-dates,
+    found with one searchsorted over the sorted ex-dates.
+    """
+    suffix = np.append(np.cumprod(factors[::-1])[::-1], 1.0)
+    mult = suffix[np.searchsorted(ex_dates, bars.index.to_numpy(), side="right")]
+    adjusted = bars.copy()
+    for col in ("Open", "High", "Low", "Close"):
+        adjusted[col] = bars[col].to_numpy() * mult
+    adjusted["Volume"] = bars["Volume"].to_numpy() / mult
+    return adjusted
+
+
+def ingest_bhavcopy(directory, actions_path=None, batch_files=250, suffix=".NS",
+                    symbols=None, series=("EQ",), root=None):
+    """Ingest every bhavcopy in `directory` into the bar store.
+
+    - batch_files: files parsed and written per batch (~one trading year)
+    - suffix: appended to NSE symbols so store keys match config symbols
+    - symbols: optional iterable of store symbols to keep (e.g. one index)
+    Returns the number of symbols written.
+    """
+    wanted = set(symbols) if symbols else None
+    touched = set()
+    files = list_bhavcopy_files(directory)
+
+    for start in range(0, len(files), batch_files):
+        batch = []
+        for path in files[start:start + batch_files]:
+            try:
+                batch.append(read_bhavcopy(path, series=series))
+            except Exception as e:
+                print(f"Skipping {path}: {e}")
+        if not batch:
+            continue
+
+        frame = pd.concat(batch, ignore_index=True)
+        frame["symbol"] = frame["symbol"] + suffix
+        if wanted is not None:
+            frame = frame[frame["symbol"].isin(wanted)]
+
+        for symbol, rows in frame.groupby("symbol", sort=False):
+            bars = rows.set_index("date")[BAR_COLUMNS].sort_index()
+            bars.index.name = "Date"
+            append_bars(symbol, bars, "1d", raw=True, root=root)
+            touched.add(symbol)
+        print(f"Ingested {min(start + batch_files, len(files))}/{len(files)} files")
+
+    actions = load_corporate_actions(actions_path) if actions_path else {}
+    # Re-adjust everything ingested now, plus stored symbols with (possibly new) actions
+    for symbol in actions:
+        stored = symbol + suffix
+        if stored not in touched and (wanted is None or stored in wanted) \
+                and read_bars(stored, "1d", raw=True, root=root) is not None:
+            touched.add(stored)
+
+    for symbol in touched:
+        raw = read_bars(symbol, "1d", raw=True, root=root)
+        action = actions.get(symbol[:-len(suffix)] if suffix and symbol.endswith(suffix) else symbol)
+        bars = adjust_bars(raw, *action) if action else raw
+        write_bars(symbol, bars, "1d", root=root)
+
+    return len(touched)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest NSE bhavcopy files into the local bar store.")
+    parser.add_argument("directory", help="directory of bhavcopy .csv/.zip files")
+    parser.add_argument("--actions", help="corporate actions CSV (symbol, ex_date, action, ratio)")
+    parser.add_argument("--store", help="bar store directory (default: BAR_STORE_DIR)")
+    parser.add_argument("--batch-files", type=int, default=250, help="files per batch")
+    parser.add_argument("--series", default="EQ", help="comma-separated series to keep")
+    args = parser.parse_args(argv)
+
+    count = ingest_bhavcopy(
+        args.directory,
+        actions_path=args.actions,
+        batch_files=args.batch_files,
+        series=tuple(s.strip() for s in args.series.split(",") if s.strip()),
+        root=args.store,
+    )
+    print(f"Wrote {count} symbols")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+import sys
+import threading
+import time
+import zlib
+
+
+class _Shard:
+    __slots__ = ("lock", "data", "access", "hits", "misses", "evictions")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # key -> (value, created_at). Replaced wholesale on every write, never
+        # mutated in place, so readers can use it without taking the lock.
+        self.data = {}
+        # key -> last access time; only read by eviction, approximate is fine
+        self.access = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+def _deep_size(obj, seen=None):
+    # Rough recursive footprint of plain containers (dict/list/tuple/set) and leaves
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_size(k, seen) + _deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_deep_size(v, seen) for v in obj)
+    return size
+
+
+class ShardedCache:
+    """A key/value cache split into independently locked shards.
+
+    - Reads take no lock: each shard's table is copy-on-write, so a reader
+      always sees a complete snapshot. Stored values must be treated as
+      immutable; publish changes with `set`/`update`.
+    - Writers lock only their key's shard.
+    - Entries expire after `ttl` seconds (None = never) and the cache as a
+      whole keeps at most `max_entries`, evicting the least recently used
+      entry of any shard first (shards are locked one at a time, after the
+      write). `can_evict(value)` can veto eviction (e.g. for a scan still running).
+      An expired entry is dropped when it is read, and every shard is swept at
+      most once per `ttl`, so idle shards don't hold on to stale values.
+    - Hit/miss counters are updated without locking and are approximate.
+    """
+
+    def __init__(self, n_shards=16, max_entries=256, ttl=None, can_evict=None):
+        self._shards = [_Shard() for _ in range(n_shards)]
+        self._max_entries = max(1, max_entries)
+        self._evict_lock = threading.Lock()
+        self._ttl = ttl
+        self._can_evict = can_evict or (lambda value: True)
+        self._last_sweep = time.monotonic()
+
+    def _shard(self, key):
+        return self._shards[zlib.crc32(repr(key).encode("utf-8")) % len(self._shards)]
+
+    def _expired(self, created, now):
+        return self._ttl is not None and now - created > self._ttl
+
+    def get(self, key, default=None):
+        shard = self._shard(key)
+        item = shard.data.get(key)
+        now = time.monotonic()
+        self._maybe_sweep(now)
+        if item is None or (self._expired(item[1], now) and self._can_evict(item[0])):
+            shard.misses += 1
+            if item is not None:
+                self._drop_expired(shard, key, now)
+            return default
+        shard.hits += 1
+        shard.access[key] = now
+        return item[0]
+
+    def _drop_expired(self, shard, key, now):
+        # Readers don't wait for a busy shard; the next read or sweep retries
+        if not shard.lock.acquire(blocking=False):
+            return
+        try:
+            item = shard.data.get(key)
+            if item is not None and self._expired(item[1], now) and self._can_evict(item[0]):
+                table = dict(shard.data)
+                del table[key]
+                shard.access.pop(key, None)
+                shard.evictions += 1
+                shard.data = table
+        finally:
+            shard.lock.release()
+
+    def _maybe_sweep(self, now):
+        if self._ttl is not None and now - self._last_sweep > self._ttl:
+            self._last_sweep = now
+            self.sweep()
+
+    def sweep(self):
+        """Drop expired entries from every shard. Returns how many were dropped."""
+        now = time.monotonic()
+        dropped = 0
+        for shard in self._shards:
+            with shard.lock:
+                stale = [
+                    k for k, (v, created) in shard.data.items()
+                    if self._expired(created, now) and self._can_evict(v)
+                ]
+                if not stale:
+                    continue
+                table = dict(shard.data)
+                for key in stale:
+                    del table[key]
+                    shard.access.pop(key, None)
+                shard.evictions += len(stale)
+                shard.data = table
+                dropped += len(stale)
+        return dropped
+
+    def set(self, key, value):
+        self.update(key, lambda old: value)
+
+    def update(self, key, fn):
+        """Atomically replace the value for `key` with `fn(current or None)`.
+
+        Returning the current value unchanged from `fn` leaves the entry as is
+        (including its age). Returns the value now stored.
+        """
+        shard = self._shard(key)
+        self._maybe_sweep(time.monotonic())
+        with shard.lock:
+            item = shard.data.get(key)
+            old = item[0] if item is not None else None
+            new = fn(old)
+            if item is not None and new is old:
+                return old
+            now = time.monotonic()
+            table = dict(shard.data)
+            table[key] = (new, now)
+            shard.access[key] = now
+            self._drop_expired_from(shard, table, now, keep=key)
+            shard.data = table
+        if self._size() > self._max_entries:
+            self._evict_lru(keep=key)
+        return new
+
+    def pop(self, key):
+        shard = self._shard(key)
+        with shard.lock:
+            if key not in shard.data:
+                return None
+            table = dict(shard.data)
+            value = table.pop(key)[0]
+            shard.access.pop(key, None)
+            shard.data = table
+        return value
+
+    def _drop_expired_from(self, shard, table, now, keep):
+        # Called with the shard lock held, on the table about to be published
+        for key, (value, created) in list(table.items()):
+            if key != keep and self._expired(created, now) and self._can_evict(value):
+                del table[key]
+                shard.access.pop(key, None)
+                shard.evictions += 1
+
+    def _size(self):
+        return sum(len(s.data) for s in self._shards)
+
+    def _evict_lru(self, keep):
+        # Least recently used first, across all shards. Holds one shard lock at
+        # a time (never together with the writer's), so shards can't deadlock.
+        with self._evict_lock:
+            excess = self._size() - self._max_entries
+            if excess <= 0:
+                return
+            candidates = sorted((
+                (accessed, i, key)
+                for i, shard in enumerate(self._shards)
+                for key, accessed in shard.access.copy().items() if key != keep
+            ), key=lambda c: c[0])
+            for _, i, key in candidates:
+                if excess <= 0:
+                    break
+                shard = self._shards[i]
+                with shard.lock:
+                    item = shard.data.get(key)
+                    if item is None or not self._can_evict(item[0]):
+                        continue
+                    table = dict(shard.data)
+                    del table[key]
+                    shard.access.pop(key, None)
+                    shard.evictions += 1
+                    shard.data = table
+                excess -= 1
+
+    def keys(self):
+        return [key for shard in self._shards for key in shard.data]
+
+    def stats(self, include_memory=True):
+        """Hit rate, size and (optionally) approximate memory footprint."""
+        hits = sum(s.hits for s in self._shards)
+        misses = sum(s.misses for s in self._shards)
+        stats = {
+            "entries": sum(len(s.data) for s in self._shards),
+            "shards": len(self._shards),
+            "max_entries": self._max_entries,
+            "ttl_seconds": self._ttl,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else None,
+            "evictions": sum(s.evictions for s in self._shards),
+        }
+        if include_memory:
+            seen = set()
+            stats["approx_bytes"] = sum(
+                _deep_size(value, seen) for s in self._shards for value, _ in s.data.values()
+            )
+        return stats
@@ -0,0 +1,357 @@
+"""Batch scans and analyses from the command line, without the web server.
+
+Usage (from the `backend` directory):
+
+    python -m app.cli scan --index "NIFTY 50" --output scan.parquet
+    python -m app.cli analyze --symbols-file universe.txt --engine processes --workers 8 --output analysis.csv
+    python -m app.cli strategies --index "NIFTY BANK" --strategies momentum,macd --output matrix.parquet
+
+Every finished symbol is appended to a JSONL checkpoint (default:
+`<output>.checkpoint.jsonl`). Re-running the same command resumes: symbols
+already in the checkpoint are skipped and only failed or missing ones are
+recomputed. `--fresh` starts over. `--offline` reads only the local bar store.
+
+Engines:
+    threads    shared worker pool with per-symbol timeouts (default)
+    processes  one process per worker; vectorbt/pandas work runs in parallel
+    serial     one symbol at a time, in this process
+The `strategies` command backtests `--chunk-size` symbols per stacked simulation.
+"""
+import argparse
+import concurrent.futures
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+from .costs import resolve_costs
+from .jobs import JobManager
+from .scanner import scan_symbol, analyze_symbol, scan_strategies
+from .strategies import STRATEGIES
+from .universe import get_universe, parse_as_of
+try:
+    from config import COST_MODELS, SYMBOL_TIMEOUT_SECONDS
+except ImportError:
+    try:
+        from ..config import COST_MODELS, SYMBOL_TIMEOUT_SECONDS
+    except ImportError:
+        from backend.config import COST_MODELS, SYMBOL_TIMEOUT_SECONDS
+
+ENGINES = ("threads", "processes", "serial")
+
+
+def read_symbols_file(path):
+    """Symbols from a text file (one per line, `#` comments) or a CSV with a `symbol` column."""
+    if path.lower().endswith(".csv"):
+        frame = pd.read_csv(path)
+        column = next((c for c in frame.columns if c.strip().lower() == "symbol"), frame.columns[0])
+        return [str(s).strip() for s in frame[column].dropna() if str(s).strip()]
+    with open(path) as f:
+        return [line.split("#", 1)[0].strip() for line in f if line.split("#", 1)[0].strip()]
+
+
+def resolve_universe(indexes=(), symbols_file=None, symbols=None, as_of=None):
+    """Union of index constituents, file symbols and explicit symbols, in order, without duplicates.
+
+    Index members are those on `as_of` (YYYY-MM-DD, default today).
+    """
+    universe = []
+    if indexes:
+        index_universe = get_universe()
+        when = parse_as_of(as_of)
+        for name in indexes:
+            canonical = index_universe.resolve(name)
+            if canonical is None:
+                raise ValueError(f"Index '{name}' not found. Choose from {index_universe.names()}")
+            universe.extend(index_universe.members(canonical, when))
+    if symbols_file:
+        universe.extend(read_symbols_file(symbols_file))
+    universe.extend(symbols or ())
+    return list(dict.fromkeys(universe))
+
+
+# --- Checkpoint ---
+
+class Checkpoint:
+    """Append-only JSONL log of finished symbols.
+
+    The first line records the run parameters; a resume with different
+    parameters is refused. Each later line is one symbol:
+    {"symbol", "status": ok|no_data|error, "rows": [...], "error"}.
+    A line cut short by a kill is ignored on load.
+    """
+
+    def __init__(self, path, run, fresh=False):
+        self.path = path
+        self.records = {}
+        self._lock = threading.Lock()
+
+        if fresh or not os.path.exists(path):
+            with open(path, "w") as f:
+                f.write(json.dumps({"run": run}) + "\n")
+        else:
+            self._load(run)
+
+        self._file = open(path, "a")
+
+    def _load(self, run):
+        with open(self.path) as f:
+            lines = f.read().split("\n")
+        try:
+            header = json.loads(lines[0])["run"]
+        except (ValueError, KeyError, IndexError):
+            raise ValueError(f"{self.path} is not a checkpoint file; use --fresh to overwrite it")
+        if header != run:
+            raise ValueError(f"{self.path} was written by a run with different parameters: {header}; use --fresh")
+
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            self.records[record["symbol"]] = record
+
+        # Don't glue the next record onto a truncated last line
+        if lines[-1]:
+            with open(self.path, "a") as f:
+                f.write("\n")
+
+    def done(self):
+        return {s for s, r in self.records.items() if r["status"] != "error"}
+
+    def add(self, symbol, status, rows=(), error=None):
+        record = {"symbol": symbol, "status": status, "rows": list(rows)}
+        if error is not None:
+            record["error"] = error
+        line = json.dumps(record, default=_json_default) + "\n"
+        with self._lock:
+            self.records[symbol] = json.loads(line)
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def _json_default(value):
+    # numpy scalars and timestamps inside result rows
+    if hasattr(value, "item"):
+        return value.item()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+# --- Per-symbol tasks (module level so the process engine can pickle them) ---
+
+def _task(command, symbol, live, cost_kwargs, robustness):
+    if command == "scan":
+        row = scan_symbol(symbol, live=live, cost_kwargs=cost_kwargs)
+    else:
+        row = analyze_symbol(symbol, live=live, cost_kwargs=cost_kwargs, robustness=robustness)
+    return [row] if row is not None else []
+
+
+def _strategies_task(symbols, live, strategies, costs):
+    matrix = scan_strategies(symbols=list(symbols), live=live, strategies=strategies, costs=costs)
+    return {
+        symbol: [{"symbol": symbol, "strategy": name, **metrics} for name, metrics in by_strategy.items()]
+        for symbol, by_strategy in matrix.items()
+    }
+
+
+def _record(checkpoint, symbol, rows, error):
+    if error is not None:
+        print(f"Error {symbol}: {error}")
+        checkpoint.add(symbol, "error", error=str(error) or type(error).__name__)
+    else:
+        checkpoint.add(symbol, "ok" if rows else "no_data", rows)
+
+
+def _run_per_symbol(args, symbols, checkpoint, cost_kwargs, robustness):
+    live = bool(args.live)
+    progress = _Progress(len(symbols))
+
+    def finish(symbol, rows, error):
+        _record(checkpoint, symbol, rows, error)
+        progress.tick()
+
+    if args.engine == "serial":
+        for symbol in symbols:
+            try:
+                finish(symbol, _task(args.command, symbol, live, cost_kwargs, robustness), None)
+            except Exception as e:
+                finish(symbol, None, e)
+
+    elif args.engine == "threads":
+        manager = JobManager(workers=args.workers, history=1)
+        job = manager.submit(
+            f"cli-{args.command}", symbols,
+            lambda s: _task(args.command, s, live, cost_kwargs, robustness),
+            timeout=args.timeout,
+            on_result=finish,
+        )
+        try:
+            job.wait()
+        except KeyboardInterrupt:
+            job.cancel()
+            # Running tasks stop at their next check; let them record before the checkpoint closes
+            job.wait()
+            raise
+
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = {
+                pool.submit(_task, args.command, s, live, cost_kwargs, robustness): s for s in symbols
+            }
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    error = future.exception()
+                    finish(futures[future], None if error else future.result(), error)
+            except KeyboardInterrupt:
+                pool.shutdown(wait=True, cancel_futures=True)
+                raise
+
+
+def _run_strategies(args, symbols, checkpoint, strategies):
+    live = bool(args.live)
+    chunks = [symbols[i:i + args.chunk_size] for i in range(0, len(symbols), args.chunk_size)]
+    progress = _Progress(len(symbols))
+
+    def finish(chunk, result, error):
+        for symbol in chunk:
+            rows = result.get(symbol, []) if result is not None else None
+            _record(checkpoint, symbol, rows, error)
+            progress.tick()
+
+    if args.engine == "processes":
+        with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = {pool.submit(_strategies_task, chunk, live, strategies, args.costs): chunk for chunk in chunks}
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    error = future.exception()
+                    finish(futures[future], None if error else future.result(), error)
+            except KeyboardInterrupt:
+                pool.shutdown(wait=True, cancel_futures=True)
+                raise
+    else:
+        # One stacked simulation per chunk already uses numba; threads add little
+        for chunk in chunks:
+            try:
+                finish(chunk, _strategies_task(chunk, live, strategies, args.costs), None)
+            except Exception as e:
+                finish(chunk, None, e)
+
+
+class _Progress:
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def tick(self):
+        with self._lock:
+            self.done += 1
+            done = self.done
+        if done == self.total or done % 25 == 0:
+            elapsed = time.monotonic() - self.started
+            print(f"{done}/{self.total} symbols in {elapsed:.0f}s")
+
+
+def write_results(rows, path, fmt=None):
+    """Flatten nested result rows into columns and write Parquet or CSV."""
+    fmt = fmt or ("csv" if path.lower().endswith(".csv") else "parquet")
+    frame = pd.json_normalize(rows, sep="_") if rows else pd.DataFrame()
+    if fmt == "csv":
+        frame.to_csv(path, index=False)
+    else:
+        frame.to_parquet(path, index=False)
+    return len(frame)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Run scans and analyses in batch, without the web server.")
+    parser.add_argument("command", choices=("scan", "analyze", "strategies"))
+    parser.add_argument("--index", action="append", default=[], help="index name or alias from the index file (repeatable)")
+    parser.add_argument("--as-of", help="take index constituents as of this date (YYYY-MM-DD)")
+    parser.add_argument("--symbols-file", help="text file (one symbol per line) or CSV with a symbol column")
+    parser.add_argument("--symbols", help="comma-separated symbols")
+    parser.add_argument("--live", action="store_true", help="5m intraday bars instead of daily")
+    parser.add_argument("--costs", choices=list(COST_MODELS), help="cost model (default depends on --live)")
+    parser.add_argument("--engine", choices=ENGINES, default="threads")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--timeout", type=float, default=SYMBOL_TIMEOUT_SECONDS,
+                        help="per-symbol timeout in seconds (threads engine)")
+    parser.add_argument("--robustness", type=int, metavar="SAMPLES",
+                        help="analyze: add bootstrap intervals with this many resamples")
+    parser.add_argument("--block", type=int, default=5, help="analyze: bootstrap block length")
+    parser.add_argument("--strategies", help="strategies: comma-separated names (default: all registered)")
+    parser.add_argument("--chunk-size", type=int, default=50, help="strategies: symbols per stacked simulation")
+    parser.add_argument("--output", required=True, help="result file (.parquet or .csv)")
+    parser.add_argument("--format", choices=("parquet", "csv"), help="override the format implied by --output")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <output>.checkpoint.jsonl)")
+    parser.add_argument("--fresh", action="store_true", help="ignore an existing checkpoint and start over")
+    parser.add_argument("--offline", action="store_true", help="use only the local bar store, never the network")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    strategies = [s.strip() for s in args.strategies.split(",") if s.strip()] if args.strategies else None
+    unknown = [s for s in strategies or () if s not in STRATEGIES]
+    if unknown:
+        parser.error(f"unknown strategies {unknown}; choose from {list(STRATEGIES)}")
+    if args.offline:
+        # Read by fetch_data; inherited by process-engine workers
+        os.environ["NSE_OFFLINE"] = "true"
+
+    symbols_arg = [s.strip() for s in (args.symbols or "").split(",") if s.strip()]
+    try:
+        symbols = resolve_universe(args.index, args.symbols_file, symbols_arg, as_of=args.as_of)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    if not symbols:
+        raise SystemExit("No symbols: pass --index, --symbols-file or --symbols")
+
+    robustness = {"n_samples": args.robustness, "block": args.block} if args.robustness else None
+    run = {
+        "command": args.command,
+        "live": bool(args.live),
+        "costs": args.costs,
+        "robustness": robustness if args.command == "analyze" else None,
+        "strategies": strategies if args.command == "strategies" else None,
+        "offline": bool(args.offline),
+    }
+
+    try:
+        checkpoint = Checkpoint(args.checkpoint or args.output + ".checkpoint.jsonl", run, fresh=args.fresh)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    done = checkpoint.done()
+    todo = [s for s in symbols if s not in done]
+    print(f"{len(symbols)} symbols, {len(symbols) - len(todo)} already in checkpoint, {len(todo)} to run")
+
+    try:
+        if args.command == "strategies":
+            _run_strategies(args, todo, checkpoint, strategies)
+        else:
+            _run_per_symbol(args, todo, checkpoint, resolve_costs(args.costs, live=bool(args.live)), robustness)
+    finally:
+        checkpoint.close()
+
+    wanted = set(symbols)
+    rows = [row for s, r in checkpoint.records.items() if s in wanted for row in r["rows"]]
+    failed = [s for s in symbols if checkpoint.records.get(s, {}).get("status") == "error"]
+    count = write_results(rows, args.output, args.format)
+    print(f"Wrote {count} rows to {args.output}")
+    if failed:
+        print(f"{len(failed)} symbols failed (re-run to retry): {', '.join(failed[:20])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import numpy as np
+try:
+    from config import COST_MODELS, DEFAULT_COST_MODEL, DEFAULT_LIVE_COST_MODEL
+except ImportError:
+    try:
+        from ..config import COST_MODELS, DEFAULT_COST_MODEL, DEFAULT_LIVE_COST_MODEL
+    except ImportError:
+        from backend.config import COST_MODELS, DEFAULT_COST_MODEL, DEFAULT_LIVE_COST_MODEL
+
+
+def cost_model_name(name=None, live=False):
+    """The cost model used for `name`: the interval's default model when None."""
+    if name is None:
+        name = DEFAULT_LIVE_COST_MODEL if live else DEFAULT_COST_MODEL
+    if name not in COST_MODELS:
+        raise ValueError(f"Unknown cost model '{name}'. Choose from {list(COST_MODELS)}")
+    return name
+
+
+def resolve_costs(name=None, live=False):
+    """Turn a cost model name into `Portfolio.from_signals` keyword arguments.
+
+    vectorbt charges the same `fees` on both sides of a trade, so side-specific
+    charges (STT on sells only, stamp duty on buys only) are averaged into one
+    per-side rate. A completed round trip is charged exactly the model's total.
+    GST applies to brokerage and exchange/SEBI charges, not to STT or stamp duty.
+
+    Resolve once per scan and pass the result to every simulation; returns an
+    empty dict for the "none" model.
+    """
+    model = COST_MODELS[cost_model_name(name, live)]
+    if not model:
+        return {}
+
+    taxable = model.get("brokerage_pct", 0) + model.get("exchange_pct", 0) + model.get("sebi_pct", 0)
+    gst = taxable * model.get("gst_pct", 0) / 100
+    one_sided = (
+        model.get("stt_buy_pct", 0) + model.get("stt_sell_pct", 0) + model.get("stamp_buy_pct", 0)
+    ) / 2
+    fees_pct = taxable + gst + one_sided
+    fixed = model.get("brokerage_flat", 0) * (1 + model.get("gst_pct", 0) / 100)
+
+    kwargs = {
+        "fees": fees_pct / 100,
+        "slippage": model.get("slippage_bps", 0) / 10000,
+    }
+    if fixed:
+        kwargs["fixed_fees"] = fixed
+    return kwargs
+
+
+def broadcast_costs(cost_kwargs, n_columns):
+    """Expand scalar cost arguments to one value per column of a close matrix."""
+    return {key: np.full(n_columns, value, dtype=np.float64) for key, value in cost_kwargs.items()}
@@ -1,95 +1,199 @@
 import yfinance as yf
 import pandas as pd
+try:
+    # Per-symbol download errors; not re-exported as `yf.shared` by every release
+    import yfinance.shared as yf_shared
+except ImportError:
+    yf_shared = None
 import os
 import datetime
+from .store import load_period
+from .bars import Bars
+from .ticks import LIVE_FEED
+from .resilience import CircuitBreaker, NegativeCache, ProviderError, call_with_retries
+from .jobs import check_task
+try:
+    from config import (
+        FETCH_TIMEOUT_SECONDS, FETCH_RETRIES, FETCH_BACKOFF_SECONDS,
+        BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_SECONDS, NEGATIVE_CACHE_TTL_SECONDS,
+    )
+except ImportError:
+    try:
+        from ..config import (
+            FETCH_TIMEOUT_SECONDS, FETCH_RETRIES, FETCH_BACKOFF_SECONDS,
+            BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_SECONDS, NEGATIVE_CACHE_TTL_SECONDS,
+        )
+    except ImportError:
+        from backend.config import (
+            FETCH_TIMEOUT_SECONDS, FETCH_RETRIES, FETCH_BACKOFF_SECONDS,
+            BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_SECONDS, NEGATIVE_CACHE_TTL_SECONDS,
+        )
 
 # Global cache for Kite instruments to avoid fetching on every call
 _KITE_INSTRUMENT_MAP = None
 
 
+class _NoData(Exception):
+    """The provider answered, but has nothing for this symbol/period."""
+
+
+# Failures of these kinds are the provider's fault and worth retrying; any
+# other per-symbol yfinance error (delisted, no price data, ...) means no data.
+_YF_TRANSIENT_MARKERS = ("timed out", "timeout", "connection", "rate limit", "too many requests", "500", "502", "503", "504")
+
+
+def _fetch_kite(symbol, period, interval):
+    try:
+        from kiteconnect import KiteConnect
+    except ImportError:
+        print("Error: 'kiteconnect' not installed. Run: pip install kiteconnect")
+        raise _NoData()
+
+    api_key = os.getenv("KITE_API_KEY")
+    access_token = os.getenv("KITE_ACCESS_TOKEN")
+
+    if not api_key or not access_token:
+        print("Error: KITE_API_KEY and KITE_ACCESS_TOKEN env vars required.")
+        raise _NoData()
+
+    try:
+        kite = KiteConnect(api_key=api_key, timeout=FETCH_TIMEOUT_SECONDS)
+        kite.set_access_token(access_token)
+
+        # Fetch and cache instruments once
+        global _KITE_INSTRUMENT_MAP
+        if _KITE_INSTRUMENT_MAP is None:
+            print("Fetching Kite instruments map (NSE)...")
+            instruments = kite.instruments("NSE")
+            _KITE_INSTRUMENT_MAP = {i['tradingsymbol']: i['instrument_token'] for i in instruments}
+
+        # Convert "RELIANCE.NS" -> "RELIANCE" for Kite
+        clean_symbol = symbol.replace(".NS", "")
+        token = _KITE_INSTRUMENT_MAP.get(clean_symbol)
+
+        if not token:
+            print(f"Token not found for {clean_symbol}")
+            raise _NoData()
+
+        # Map interval/period to Kite format
+        kite_interval = "day"
+        days = 200  # default approx 6mo
+        if interval == "5m":
+            kite_interval = "5minute"
+            days = 5  # Kite limits intraday data fetch duration
+        elif interval == "1d":
+            if period == "1y": days = 365
+            elif period == "1mo": days = 30
+
+        to_date = datetime.datetime.now()
+        from_date = to_date - datetime.timedelta(days=days)
+
+        records = kite.historical_data(token, from_date, to_date, kite_interval)
+    except _NoData:
+        raise
+    except Exception as e:
+        raise ProviderError(f"Kite error for {symbol}: {e}") from e
+
+    df = pd.DataFrame(records)
+    if not df.empty:
+        df.set_index('date', inplace=True)
+        # Normalize columns to match yfinance format expected by backtest.py
+        df.rename(columns={'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'volume': 'Volume'}, inplace=True)
+    return df
+
+
+def _fetch_yahoo(symbol, period, interval):
+    # Supports NSE symbols with '.NS' suffix (e.g., 'TCS.NS')
+    try:
+        data = yf.download(
+            symbol, period=period, interval=interval,
+            progress=False, threads=False, timeout=FETCH_TIMEOUT_SECONDS,
+        )
+    except Exception as e:
+        raise ProviderError(f"Error fetching data for {symbol}: {e}") from e
+
+    if data is None or data.empty:
+        # yfinance reports per-symbol failures here instead of raising; an
+        # empty frame without an error means the symbol has no data
+        errors = getattr(yf_shared, "_ERRORS", None) or {}
+        error = str(errors.get(symbol, "")).lower()
+        if any(marker in error for marker in _YF_TRANSIENT_MARKERS):
+            raise ProviderError(f"Error fetching data for {symbol}: {error}")
+        return pd.DataFrame()
+    return data
+
+
+_PROVIDERS = {"kite": _fetch_kite, "yahoo": _fetch_yahoo}
+_BREAKERS = {
+    name: CircuitBreaker(name, threshold=BREAKER_FAILURE_THRESHOLD, reset_after=BREAKER_RESET_SECONDS)
+    for name in _PROVIDERS
+}
+# (provider, symbol, period, interval) keys that recently returned no data
+_NO_DATA = NegativeCache(ttl=NEGATIVE_CACHE_TTL_SECONDS)
+
+
+def provider_status():
+    """Circuit breaker state per provider and the size of the no-data cache."""
+    return {
+        "providers": [breaker.status() for breaker in _BREAKERS.values()],
+        "negative_cache_entries": len(_NO_DATA),
+    }
+
+
 def fetch_data(symbol, period="6mo", interval="1d"):
     """
     Fetch historical market data for a symbol.
     
     Default: Uses yfinance (Yahoo Finance).
     To use a direct NSE source (like nselib), you can modify the logic below.
+
+    Daily bars come from the local bar store when it has fresh data for the
+    symbol. Provider failures are retried with exponential backoff behind a
+    per-provider circuit breaker; symbols with no data are remembered for
+    NEGATIVE_CACHE_TTL_SECONDS. Any failure still returns an empty DataFrame.
+
+    With NSE_OFFLINE=true only the bar store is used (stale or not) and no
+    provider is ever called, e.g. for batch research runs on a frozen history.
     """
+    offline = os.getenv("NSE_OFFLINE") == "true"
 
-    # --- Option 2: Zerodha Kite Connect ---
-    if os.getenv("USE_ZERODHA") == "true":
-        try:
-            from kiteconnect import KiteConnect
-        except ImportError:
-            print("Error: 'kiteconnect' not installed. Run: pip install kiteconnect")
-            return pd.DataFrame()
-
-        api_key = os.getenv("KITE_API_KEY")
-        access_token = os.getenv("KITE_ACCESS_TOKEN")
-
-        if not api_key or not access_token:
-            print("Error: KITE_API_KEY and KITE_ACCESS_TOKEN env vars required.")
-            return pd.DataFrame()
-
-        try:
-            kite = KiteConnect(api_key=api_key)
-            kite.set_access_token(access_token)
-
-            # Fetch and cache instruments once
-            global _KITE_INSTRUMENT_MAP
-            if _KITE_INSTRUMENT_MAP is None:
-                print("Fetching Kite instruments map (NSE)...")
-                instruments = kite.instruments("NSE")
-                _KITE_INSTRUMENT_MAP = {i['tradingsymbol']: i['instrument_token'] for i in instruments}
-
-            # Convert "RELIANCE.NS" -> "RELIANCE" for Kite
-            clean_symbol = symbol.replace(".NS", "")
-            token = _KITE_INSTRUMENT_MAP.get(clean_symbol)
-
-            if not token:
-                print(f"Token not found for {clean_symbol}")
-                return pd.DataFrame()
-
-            # Map interval/period to Kite format
-            kite_interval = "day"
-            days = 200  # default approx 6mo
-            if interval == "5m":
-                kite_interval = "5minute"
-                days = 5  # Kite limits intraday data fetch duration
-            elif interval == "1d":
-                if period == "1y": days = 365
-                elif period == "1mo": days = 30
-
-            to_date = datetime.datetime.now()
-            from_date = to_date - datetime.timedelta(days=days)
-
-            records = kite.historical_data(token, from_date, to_date, kite_interval)
-            df = pd.DataFrame(records)
-            
-            if not df.empty:
-                df.set_index('date', inplace=True)
-                # Normalize columns to match yfinance format expected by backtest.py
-                df.rename(columns={'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'volume': 'Volume'}, inplace=True)
-            
-            return df
-
-        except Exception as e:
-            print(f"Kite error for {symbol}: {e}")
-            return pd.DataFrame()
-    
+    # --- Local bar store (bhavcopy ingestion) ---
+    if interval == "1d" or offline:
+        stored = load_period(symbol, period=period, interval=interval, offline=offline)
+        if stored is not None and not stored.empty:
+            return stored
+    if offline:
+        return pd.DataFrame()
+
+    # --- Option 2: Zerodha Kite Connect (USE_ZERODHA=true) ---
     # --- Option 1: Yahoo Finance (Default) ---
-    # Supports NSE symbols with '.NS' suffix (e.g., 'TCS.NS')
+    provider = "kite" if os.getenv("USE_ZERODHA") == "true" else "yahoo"
+    key = (provider, symbol, period, interval)
+    if key in _NO_DATA:
+        return pd.DataFrame()
+
     try:
-        data = yf.download(symbol, period=period, interval=interval, progress=False, threads=False)
-        
-        if data is None or data.empty:
-            return pd.DataFrame()
-            
-        return data
-    except Exception as e:
-        print(f"Error fetching data for {symbol}: {e}")
+        data = call_with_retries(
+            lambda: _PROVIDERS[provider](symbol, period, interval),
+            _BREAKERS[provider],
+            retries=FETCH_RETRIES,
+            backoff=FETCH_BACKOFF_SECONDS,
+            # Stop retrying once the job task this fetch runs for is out of time
+            check=check_task,
+        )
+    except _NoData:
+        _NO_DATA.add(key)
+        return pd.DataFrame()
+    except ProviderError as e:
+        print(f"{e}")
         return pd.DataFrame()
 
-    # --- Option 2: Example for Direct NSE (e.g., using nselib) ---
+    if data is None or data.empty:
+        _NO_DATA.add(key)
+        return pd.DataFrame()
+    return data
+
+    # --- Option 3: Example for Direct NSE (e.g., using nselib) ---
     # import nselib
     # from nselib import capital_market
     #
@@ -101,3 +205,38 @@ def fetch_data(symbol, period="6mo", interval="1d"):
     #
     # # 3. Format DataFrame to have columns: ['Open', 'High', 'Low', 'Close', 'Volume'] with DatetimeIndex
     # # return formatted_data
+
+
+def fetch_bars(symbol, period="6mo", interval="1d"):
+    """Like `fetch_data`, but return normalised `Bars` (empty on failure).
+
+    Intraday (1m/5m) bars are served from memory while the live tick feed is
+    running and has the symbol; otherwise they are downloaded as usual.
+    """
+    live = LIVE_FEED.bars(symbol, interval, period=period)
+    if live is not None and not live.empty:
+        return live
+    return Bars.from_frame(fetch_data(symbol, period=period, interval=interval), symbol=symbol)
+
+
+def fetch_close_matrix(symbols, period="6mo", interval="1d"):
+    """
+    Fetch closes for many symbols and align them into one DataFrame.
+
+    Columns are symbols, the index is the union of all bar timestamps. Gaps
+    (holidays, late listings) are forward-filled; symbols with no data at all
+    are dropped so they don't poison a portfolio-wide simulation.
+    """
+    closes = {}
+    for symbol in symbols:
+        bars = fetch_bars(symbol, period=period, interval=interval)
+        if bars.empty:
+            print(f"No data for {symbol}")
+            continue
+        closes[symbol] = bars.close_series()
+
+    if not closes:
+        return pd.DataFrame()
+
+    matrix = pd.concat(closes, axis=1).sort_index().ffill()
+    return matrix.dropna(axis=1, how="all")
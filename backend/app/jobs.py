@@ -0,0 +1,290 @@
+import contextvars
+import itertools
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from .profiling import current_session, profile_thread
+try:
+    from config import MAX_SCAN_WORKERS, JOB_HISTORY
+except ImportError:
+    try:
+        from ..config import MAX_SCAN_WORKERS, JOB_HISTORY
+    except ImportError:
+        from backend.config import MAX_SCAN_WORKERS, JOB_HISTORY
+
+# Task priorities: lower runs first. Interactive single-symbol requests jump
+# ahead of queued bulk index scans (running tasks are never preempted).
+INTERACTIVE = 0
+NORMAL = 5
+BULK = 10
+
+
+def _now():
+    return datetime.now(timezone.utc).astimezone().isoformat()
+
+
+class TaskTimeout(TimeoutError):
+    """The running task passed its job's `timeout`."""
+
+
+class TaskCancelled(Exception):
+    """The running task's job was cancelled."""
+
+
+# (job, deadline) of the task running in this thread; None outside job tasks
+_TASK = contextvars.ContextVar("job_task", default=None)
+
+
+def check_task():
+    """Raise TaskTimeout/TaskCancelled if the current job task should stop.
+
+    Timeouts are cooperative: long-running task code (provider fetches, the
+    steps of a per-symbol scan) calls this between units of work, and the
+    worker thread itself stops the task, so no thread is ever abandoned.
+    A no-op outside job tasks.
+    """
+    task = _TASK.get()
+    if task is None:
+        return
+    job, deadline = task
+    if job.cancelled:
+        raise TaskCancelled(f"job {job.id} cancelled")
+    if deadline is not None and time.monotonic() > deadline:
+        raise TaskTimeout(f"timed out after {job.timeout}s")
+
+
+class Job:
+    """A batch of per-symbol tasks run on the shared worker pool.
+
+    At most `max_parallel` of the job's tasks are queued or running at once,
+    so one large scan can't occupy every worker. `on_result(symbol, result,
+    error)` is called from worker threads as each task finishes; with
+    `collect=True` results are also kept on the job in completion order.
+    """
+
+    def __init__(self, name, symbols, fn, priority, max_parallel, timeout, on_result, on_done, collect):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.priority = priority
+        self.fn = fn
+        self.max_parallel = max(1, max_parallel)
+        self.timeout = timeout
+        self.on_result = on_result
+        self.on_done = on_done
+        self.total = len(symbols)
+        self.results = [] if collect else None
+        self.state = "queued"
+        self.created = _now()
+        self.finished = None
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = []
+        self._pending = iter(list(symbols))
+        # Profiling session of the request that submitted the job (?profile=1);
+        # held open until the job finishes
+        self.profile = current_session()
+        if self.profile is not None:
+            self.profile.acquire()
+        self._inflight = 0
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self.state == "cancelled"
+
+    def cancel(self):
+        """Stop scheduling new tasks; tasks already running finish in the background."""
+        with self._lock:
+            if self._done.is_set():
+                return False
+            self.state = "cancelled"
+            self._pending = iter(())
+            finished = self._inflight == 0
+        if finished:
+            self._finish()
+        return True
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def _finish(self):
+        with self._lock:
+            if self._done.is_set():
+                return
+            if self.state != "cancelled":
+                self.state = "done"
+            self.finished = _now()
+        if self.on_done is not None:
+            try:
+                self.on_done(self)
+            except Exception as e:
+                print(f"Job {self.id} completion callback failed: {e}")
+        if self.profile is not None:
+            self.profile.release()
+        self._done.set()
+
+    def snapshot(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "state": self.state,
+            "priority": self.priority,
+            "progress": self.completed,
+            "total": self.total,
+            "failed": self.failed,
+            "timed_out": list(self.timed_out),
+            "max_parallel": self.max_parallel,
+            "created": self.created,
+            "finished": self.finished,
+        }
+
+
+class JobManager:
+    """Runs jobs' tasks on a fixed pool of `workers` threads, highest priority first.
+
+    The pool size is a global budget shared by all jobs: tasks run in the
+    worker threads themselves, so the process never holds more than `workers`
+    job threads. A task's `timeout` is enforced cooperatively through
+    `check_task()`; a task that overruns without reaching a check is still
+    reported as timed out once it returns.
+    """
+
+    def __init__(self, workers=8, history=100):
+        self.workers = workers
+        self._history = history
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def submit(self, name, symbols, fn, priority=BULK, max_parallel=None, timeout=None,
+               on_result=None, on_done=None, collect=False):
+        """Queue `fn(symbol)` for every symbol and return the Job."""
+        max_parallel = min(max_parallel or self.workers, self.workers)
+        job = Job(name, symbols, fn, priority, max_parallel, timeout, on_result, on_done, collect)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._trim_history()
+        self._ensure_started()
+        if job.total == 0:
+            job._finish()
+        else:
+            self._feed(job)
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def list(self):
+        return [job.snapshot() for job in list(self._jobs.values())]
+
+    def cancel(self, job_id):
+        job = self._jobs.get(job_id)
+        return job.cancel() if job is not None else False
+
+    def _trim_history(self):
+        # Called with self._lock held; forget the oldest finished jobs
+        finished = [jid for jid, job in self._jobs.items() if job._done.is_set()]
+        for jid in finished[:max(0, len(self._jobs) - self._history)]:
+            del self._jobs[jid]
+
+    def _feed(self, job):
+        with job._lock:
+            batch = []
+            while job._inflight < job.max_parallel:
+                symbol = next(job._pending, None)
+                if symbol is None:
+                    break
+                job._inflight += 1
+                batch.append(symbol)
+            if batch and job.state == "queued":
+                job.state = "running"
+        for symbol in batch:
+            self._queue.put((job.priority, next(self._seq), job, symbol))
+
+    @staticmethod
+    def _call(job, symbol):
+        with profile_thread(job.profile):
+            return job.fn(symbol)
+
+    def _run(self, job, symbol):
+        started = time.monotonic()
+        deadline = started + job.timeout if job.timeout is not None else None
+        token = _TASK.set((job, deadline))
+        try:
+            result = self._call(job, symbol)
+        except TaskTimeout:
+            return None, TaskTimeout(f"{symbol} timed out after {job.timeout}s"), True
+        finally:
+            _TASK.reset(token)
+        if deadline is not None and time.monotonic() > deadline:
+            return None, TaskTimeout(f"{symbol} timed out after {job.timeout}s"), True
+        return result, None, False
+
+    def _work(self):
+        while True:
+            _, _, job, symbol = self._queue.get()
+            result, error, timed_out = None, None, False
+            if not job.cancelled:
+                try:
+                    result, error, timed_out = self._run(job, symbol)
+                except Exception as e:
+                    error = e
+
+                with job._lock:
+                    job.completed += 1
+                    if error is not None:
+                        job.failed += 1
+                    if timed_out:
+                        job.timed_out.append(symbol)
+                    if job.results is not None and error is None:
+                        job.results.append(result)
+                if job.on_result is not None:
+                    try:
+                        job.on_result(symbol, result, error)
+                    except Exception as e:
+                        print(f"Job {job.id} result callback failed for {symbol}: {e}")
+
+            with job._lock:
+                job._inflight -= 1
+            self._feed(job)
+            with job._lock:
+                drained = job._inflight == 0
+            if drained:
+                job._finish()
+
+
+def run_interactive(name, symbols, fn, timeout=None, manager=None):
+    """Run `fn` over `symbols` at interactive priority and wait for the results.
+
+    Results come back in `symbols` order; failed symbols are left out.
+    """
+    symbols = list(symbols)
+    done = {}
+
+    def on_result(symbol, result, error):
+        if error is None:
+            done[symbol] = result
+
+    job = (manager or JOB_MANAGER).submit(
+        name, symbols, fn, priority=INTERACTIVE, timeout=timeout, on_result=on_result,
+    )
+    job.wait()
+    return [done[s] for s in symbols if s in done]
+
+# Process-wide manager: every background scan and interactive request shares its budget
+JOB_MANAGER = JobManager(workers=MAX_SCAN_WORKERS, history=JOB_HISTORY)
@@ -0,0 +1,287 @@
+import contextlib
+import contextvars
+import cProfile
+import functools
+import inspect
+import json
+import os
+import pstats
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from fastapi.routing import APIRoute
+try:
+    from config import PROFILING_ENABLED, PROFILE_DIR, PROFILE_KEEP, PROFILE_TOP_N
+except ImportError:
+    try:
+        from ..config import PROFILING_ENABLED, PROFILE_DIR, PROFILE_KEEP, PROFILE_TOP_N
+    except ImportError:
+        from backend.config import PROFILING_ENABLED, PROFILE_DIR, PROFILE_KEEP, PROFILE_TOP_N
+
+# Libraries whose entry points are reported in profile summaries, matched
+# against the path of the function's source file.
+LIBRARIES = ("vectorbt", "pandas", "numpy", "numba", "yfinance", "pyarrow")
+
+# The profiling session of the current request. It follows the request into
+# the endpoint's worker thread (contextvars are copied) and into job threads
+# (jobs capture it at submit time).
+_SESSION = contextvars.ContextVar("profile_session", default=None)
+
+
+def _library(filename):
+    path = filename.replace("\\", "/")
+    for lib in LIBRARIES:
+        if f"/{lib}/" in path:
+            return lib
+    return None
+
+
+class ProfileSession:
+    """cProfile stats collected from every thread working for one request or job.
+
+    cProfile only sees the thread it is enabled in, so each participating
+    thread profiles itself (`profile_thread`) and merges its stats here.
+    The session is written out once the last holder releases it: usually
+    when the response is sent, or when a background job started by the
+    request finishes.
+    """
+
+    def __init__(self, label):
+        self.id = datetime.now().strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+        self.label = label
+        self.started = time.monotonic()
+        self.created = datetime.now(timezone.utc).astimezone().isoformat()
+        self._lock = threading.Lock()
+        self._stats = None
+        self._threads = 0
+        self._refs = 1
+
+    def add(self, profile):
+        with self._lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(profile)
+            else:
+                self._stats.add(profile)
+            self._threads += 1
+
+    def acquire(self):
+        with self._lock:
+            self._refs += 1
+
+    def release(self):
+        with self._lock:
+            self._refs -= 1
+            last = self._refs == 0
+        if last:
+            try:
+                self._write()
+            except Exception as e:
+                print(f"Writing profile {self.id} failed: {e}")
+
+    def _write(self):
+        if self._stats is None:
+            return
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        self._stats.dump_stats(os.path.join(PROFILE_DIR, self.id + ".pstats"))
+        summary = {
+            "id": self.id,
+            "label": self.label,
+            "created": self.created,
+            "wall_seconds": time.monotonic() - self.started,
+            "threads": self._threads,
+            **summarize(self._stats),
+        }
+        with open(os.path.join(PROFILE_DIR, self.id + ".json"), "w") as f:
+            json.dump(summary, f, indent=1)
+        _log_summary(summary)
+        _prune()
+
+
+def summarize(stats, top=PROFILE_TOP_N):
+    """Where the time went, by library and by library entry point.
+
+    An entry point is a library function called from outside that library
+    (e.g. app code calling `Portfolio.from_signals` or `DataFrame.rolling`);
+    its time is the cumulative time of those calls only, so nested internals
+    aren't counted twice.
+    """
+    self_time = {}
+    entries = []
+    for (filename, line, name), (_, _, tt, _, callers) in stats.stats.items():
+        lib = _library(filename)
+        self_time[lib or "other"] = self_time.get(lib or "other", 0.0) + tt
+        if lib is None:
+            continue
+        calls, cum = 0, 0.0
+        for (caller_file, _, _), caller_stats in callers.items():
+            if _library(caller_file) != lib:
+                calls += caller_stats[1]
+                cum += caller_stats[3]
+        if calls:
+            entries.append({
+                "library": lib,
+                "function": name,
+                "file": f"{filename}:{line}",
+                "calls": calls,
+                "cumulative_seconds": cum,
+            })
+
+    entries.sort(key=lambda e: e["cumulative_seconds"], reverse=True)
+    return {
+        "total_seconds": stats.total_tt,
+        "self_seconds_by_library": dict(sorted(self_time.items(), key=lambda kv: kv[1], reverse=True)),
+        "top_library_calls": entries[:top],
+    }
+
+
+def _log_summary(summary):
+    print(f"Profile {summary['id']} ({summary['label']}): {summary['wall_seconds']:.2f}s wall, "
+          f"{summary['threads']} thread(s); by library: "
+          + ", ".join(f"{lib} {secs:.2f}s" for lib, secs in summary["self_seconds_by_library"].items()))
+    for entry in summary["top_library_calls"][:10]:
+        print(f"  {entry['cumulative_seconds']:8.3f}s {entry['calls']:6d}x  {entry['library']}.{entry['function']}  {entry['file']}")
+
+
+def _prune():
+    files = sorted(
+        (f for f in os.listdir(PROFILE_DIR) if f.endswith(".pstats")),
+        key=lambda f: os.path.getmtime(os.path.join(PROFILE_DIR, f)),
+    )
+    for name in files[:max(0, len(files) - PROFILE_KEEP)]:
+        for ext in (".pstats", ".json"):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(os.path.join(PROFILE_DIR, name[:-len(".pstats")] + ext))
+
+
+def current_session():
+    return _SESSION.get()
+
+
+@contextlib.contextmanager
+def request_session(label):
+    """Profile everything done for the current context until the block ends."""
+    session = ProfileSession(label)
+    token = _SESSION.set(session)
+    try:
+        yield session
+    finally:
+        _SESSION.reset(token)
+        session.release()
+
+
+@contextlib.contextmanager
+def profile_thread(session):
+    """Run the block under cProfile in this thread and merge the stats into `session`."""
+    if session is None:
+        yield
+        return
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # Another profiler already owns this thread (or, on 3.12+, the process)
+        yield
+        return
+    try:
+        yield
+    finally:
+        profile.disable()
+        session.add(profile)
+
+
+def profiled_stream(iterator):
+    """Profile generating a streaming response body as part of the request.
+
+    A StreamingResponse body is produced after the endpoint has returned (one
+    chunk per threadpool call), so the endpoint's own profile doesn't cover it.
+    Endpoints wrap their sync body iterator with this; the session stays open
+    until the body is exhausted or closed. Without a session the iterator is
+    returned as is.
+    """
+    session = _SESSION.get()
+    if session is None:
+        return iterator
+    session.acquire()
+    return _profile_chunks(iter(iterator), session)
+
+
+def _profile_chunks(iterator, session):
+    # One profiler enabled around each next(), in whichever worker thread runs
+    # it; jobs the body submits join the session as they would from the endpoint
+    profile = cProfile.Profile()
+    used = False
+    try:
+        while True:
+            token = _SESSION.set(session)
+            try:
+                profile.enable()
+                enabled = used = True
+            except ValueError:
+                enabled = False
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                if enabled:
+                    profile.disable()
+                _SESSION.reset(token)
+            yield chunk
+    finally:
+        if used:
+            session.add(profile)
+        session.release()
+
+
+def profiled(fn):
+    """Wrap a sync endpoint so it is profiled when its request has a session."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        session = _SESSION.get()
+        if session is None:
+            return fn(*args, **kwargs)
+        with profile_thread(session):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """APIRoute whose sync endpoints run under the request's profiling session.
+
+    Sync endpoints execute in a worker thread, out of reach of a middleware's
+    profiler, so the profiling has to happen inside the endpoint call. Async
+    endpoints share the event loop thread with other requests and are left alone.
+    Streaming bodies are generated after the endpoint returns; endpoints wrap
+    them with `profiled_stream` to include them.
+    """
+
+    def __init__(self, path, endpoint, **kwargs):
+        if PROFILING_ENABLED and not inspect.iscoroutinefunction(endpoint):
+            endpoint = profiled(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def list_profiles():
+    """Summaries of stored profiles, newest first."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    summaries = []
+    for name in os.listdir(PROFILE_DIR):
+        if name.endswith(".json"):
+            try:
+                with open(os.path.join(PROFILE_DIR, name)) as f:
+                    summary = json.load(f)
+            except (OSError, ValueError):
+                continue
+            summaries.append({k: summary.get(k) for k in ("id", "label", "created", "wall_seconds", "total_seconds")})
+    return sorted(summaries, key=lambda s: s["id"], reverse=True)
+
+
+def profile_path(profile_id, ext=".pstats"):
+    """Path of a stored profile file, or None (ids are validated, not trusted)."""
+    if not profile_id or not all(c.isalnum() or c == "-" for c in profile_id):
+        return None
+    path = os.path.join(PROFILE_DIR, profile_id + ext)
+    return path if os.path.exists(path) else None
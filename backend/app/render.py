@@ -0,0 +1,573 @@
+import hashlib
+from html import escape
+
+# Page templates. Everything here is built once at import time (or once per
+# variant, see `scan_page`); per-request work is limited to formatting rows.
+
+HOME_HEAD = """
+    <html>
+    <head>
+        <title>NSE Quant Tool API</title>
+        <style>
+            body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; margin: 0; padding: 20px; background-color: #f4f4f9; }
+            .container { max-width: 900px; margin: 0 auto; background: white; padding: 30px; border-radius: 8px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
+            h1 { color: #2c3e50; border-bottom: 2px solid #eee; padding-bottom: 15px; margin-top: 0; }
+            ul { list-style: none; padding: 0; }
+            li { background: #fff; border-bottom: 1px solid #f0f0f0; padding: 15px 0; }
+            li:last-child { border-bottom: none; }
+            a { font-weight: 600; color: #3498db; text-decoration: none; font-size: 1.1em; }
+            a:hover { color: #2980b9; text-decoration: underline; }
+            .meta { font-size: 0.85em; color: #95a5a6; margin-bottom: 5px; text-transform: uppercase; letter-spacing: 0.5px; }
+            .desc { color: #555; margin-top: 5px; line-height: 1.5; }
+            .header-links { margin-bottom: 20px; color: #666; }
+            .header-links a { font-size: 1em; color: #2c3e50; text-decoration: underline; }
+            .search-box { margin-bottom: 20px; }
+            .search-box input { width: 100%; padding: 10px; font-size: 16px; border: 1px solid #ddd; border-radius: 4px; box-sizing: border-box; }
+            .tag-group { margin-bottom: 20px; }
+            .tag-title { background-color: #e9ecef; padding: 10px; border-radius: 4px; margin-bottom: 10px; color: #495057; font-size: 1.2em; cursor: pointer; display: flex; justify-content: space-between; align-items: center; }
+            .tag-title:hover { background-color: #dee2e6; }
+            .tag-title::after { content: '▼'; font-size: 0.8em; transition: transform 0.3s; }
+            .tag-group.collapsed .tag-title::after { transform: rotate(-90deg); }
+            .tag-group.collapsed ul { display: none; }
+            .endpoint-row { display: flex; align-items: center; }
+            .copy-btn { margin-left: 10px; background: #fff; border: 1px solid #ccc; border-radius: 3px; cursor: pointer; font-size: 0.75em; padding: 2px 6px; color: #555; transition: all 0.2s; }
+            .copy-btn:hover { background-color: #eee; border-color: #bbb; color: #333; }
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <h1>NSE Quant Tool API</h1>
+            <div class="header-links">
+                See also: <a href="/docs" target="_blank">Swagger UI</a> | <a href="/redoc" target="_blank">ReDoc</a>
+            </div>
+            <div class="search-box">
+                <input type="text" id="endpointSearch" placeholder="Search endpoints..." onkeyup="filterEndpoints()">
+            </div>
+            <div id="endpointList">
+    """
+
+HOME_GROUP = """
+        <div class="tag-group">
+            <h3 class="tag-title">{tag}</h3>
+            <ul>
+        """
+
+HOME_ITEM = """
+            <li>
+                <div class="meta">{name}</div>
+                <div class="endpoint-row">
+                    <a href="{path}" target="_blank">{path}</a>
+                    <button class="copy-btn" onclick="copyToClipboard(this, '{path}')">Copy URL</button>
+                </div>
+                <div class="desc">{desc}</div>
+            </li>"""
+
+HOME_GROUP_END = "</ul></div>"
+
+HOME_TAIL = """
+            </div>
+        </div>
+        <script>
+            document.addEventListener('DOMContentLoaded', () => {
+                const titles = document.querySelectorAll('.tag-title');
+                titles.forEach(title => {
+                    title.addEventListener('click', () => {
+                        title.parentElement.classList.toggle('collapsed');
+                    });
+                });
+            });
+
+            function copyToClipboard(btn, path) {
+                const fullUrl = window.location.origin + path;
+                navigator.clipboard.writeText(fullUrl).then(() => {
+                    const originalText = btn.textContent;
+                    btn.textContent = 'Copied!';
+                    setTimeout(() => { btn.textContent = originalText; }, 1500);
+                }).catch(err => {
+                    console.error('Failed to copy: ', err);
+                });
+            }
+
+            function filterEndpoints() {
+                var input, filter, container, groups, i, j, ul, li, a, meta, txtValue, groupVisible;
+                input = document.getElementById('endpointSearch');
+                filter = input.value.toUpperCase();
+                container = document.getElementById("endpointList");
+                groups = container.getElementsByClassName('tag-group');
+
+                for (i = 0; i < groups.length; i++) {
+                    ul = groups[i].getElementsByTagName('ul')[0];
+                    li = ul.getElementsByTagName('li');
+                    groupVisible = false;
+
+                    for (j = 0; j < li.length; j++) {
+                        a = li[j].getElementsByTagName("a")[0];
+                        meta = li[j].getElementsByClassName("meta")[0];
+                        txtValue = (a.textContent || a.innerText) + " " + (meta.textContent || meta.innerText);
+                        if (txtValue.toUpperCase().indexOf(filter) > -1) {
+                            li[j].style.display = "";
+                            groupVisible = true;
+                        } else {
+                            li[j].style.display = "none";
+                        }
+                    }
+                    groups[i].style.display = groupVisible ? "" : "none";
+                    if (filter && groupVisible) {
+                        groups[i].classList.remove('collapsed');
+                    }
+                }
+            }
+        </script>
+    </body>
+    </html>
+    """
+
+SCAN_PAGE = """
+        <!doctype html>
+        <html>
+        <head>
+            <meta charset="utf-8">
+            <title>NSE Scan Results</title>
+            <style>
+                body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; padding: 20px; background-color: #f4f4f9; color: #333; }
+                h2 { color: #2c3e50; margin-top: 0; margin-bottom: 20px; }
+                .controls { margin-bottom: 20px; background: white; padding: 15px; border-radius: 8px; box-shadow: 0 2px 5px rgba(0,0,0,0.05); display: flex; align-items: center; gap: 15px; flex-wrap: wrap; }
+                select, button { padding: 8px 12px; border: 1px solid #ddd; border-radius: 4px; font-size: 14px; }
+                select { min-width: 200px; }
+                button { background-color: #3498db; color: white; border: none; cursor: pointer; transition: background 0.2s; }
+                button:hover { background-color: #2980b9; }
+                table { border-collapse: collapse; width: 100%; max-width: 1200px; background: white; border-radius: 8px; overflow: hidden; box-shadow: 0 2px 5px rgba(0,0,0,0.05); }
+                th, td { border-bottom: 1px solid #eee; padding: 12px 15px; text-align: left; }
+                th { background: #f8f9fa; font-weight: 600; color: #2c3e50; cursor: pointer; user-select: none; }
+                th:hover { background: #e9ecef; }
+                tr:last-child td { border-bottom: none; }
+                tr:hover { background-color: #f1f1f1; }
+                .sort-indicator { margin-left: 6px; font-size: 0.8em; color: #999; }
+                #progressInfo { color: #666; font-style: italic; margin-left: auto; }
+                .positive { color: #27ae60; font-weight: 500; }
+                .negative { color: #c0392b; font-weight: 500; }
+                .spinner {
+                    border: 3px solid #f3f3f3;
+                    border-top: 3px solid #3498db;
+                    border-radius: 50%;
+                    width: 16px;
+                    height: 16px;
+                    animation: spin 1s linear infinite;
+                    display: none;
+                    vertical-align: middle;
+                    margin-left: 10px;
+                }
+                @keyframes spin { 0% { transform: rotate(0deg); } 100% { transform: rotate(360deg); } }
+            </style>
+        </head>
+        <body>
+            <h2>NSE Scan</h2>
+            <div class="controls">
+                <label>Index: <select id="indexSelect"><option value="" disabled selected>Loading...</option></select></label>
+                <label style="display: flex; align-items: center; gap: 5px; cursor: pointer;">
+                    <input type="checkbox" id="liveCheck"> Live (intraday)
+                </label>
+                <label>Min Return %: <input type="number" id="minReturnInput" placeholder="0" style="width: 60px; padding: 8px 12px; border: 1px solid #ddd; border-radius: 4px;"></label>
+                <button id="refreshBtn">Refresh</button>
+                <button id="exportBtn">Export CSV</button>
+                <div id="loadingSpinner" class="spinner"></div>
+                <span id="progressInfo"></span>
+            </div>
+            <table id="resultsTable">
+                <thead>
+                    <tr>
+                        <th onclick="sortTable('resultsTable', 0)">Index<span class="sort-indicator"></span></th>
+                        <th onclick="sortTable('resultsTable', 1)">Symbol<span class="sort-indicator"></span></th>
+                        <th onclick="sortTable('resultsTable', 2)">Last Price (INR)<span class="sort-indicator"></span></th>
+                        <th onclick="sortTable('resultsTable', 3)">Momentum Return (%)<span class="sort-indicator"></span></th>
+                        <th onclick="sortTable('resultsTable', 4)">Mean Reversion Return (%)<span class="sort-indicator"></span></th>
+                    </tr>
+                </thead>
+                <tbody>
+                </tbody>
+            </table>
+
+            <script>window.DEFAULT_LIVE = __DEFAULT_LIVE__;</script>
+            <script>
+                (async function() {
+                    let INDEXES = {};
+                    let loadingCount = 0;
+                    const spinner = document.getElementById('loadingSpinner');
+
+                    function updateSpinner() {
+                        spinner.style.display = loadingCount > 0 ? 'inline-block' : 'none';
+                    }
+
+                    async function fetchIndexes() {
+                        loadingCount++;
+                        updateSpinner();
+                        try {
+                            const response = await fetch('/api/indexes');
+                            if (!response.ok) throw new Error('Failed to fetch indexes');
+                            INDEXES = await response.json();
+                            populateDropdown();
+                        } catch (error) {
+                            console.error('Error fetching indexes:', error);
+                            document.getElementById('progressInfo').textContent = 'Error loading indexes. Please check console.';
+                        } finally {
+                            loadingCount--;
+                            updateSpinner();
+                        }
+                    }
+
+                    function populateDropdown() {
+                        const indexSelect = document.getElementById('indexSelect');
+                        indexSelect.innerHTML = ''; // Clear loading option
+                        
+                        const keys = Object.keys(INDEXES).sort();
+                        
+                        // Add "All Indexes" option
+                        const totalCount = keys.reduce((acc, key) => acc + (INDEXES[key] ? INDEXES[key].length : 0), 0);
+                        const allOpt = document.createElement('option');
+                        allOpt.value = 'ALL';
+                        allOpt.textContent = `All Indexes (${totalCount})`;
+                        indexSelect.appendChild(allOpt);
+
+                        if (keys.length === 0) {
+                            const opt = document.createElement('option');
+                            opt.textContent = "No indexes found";
+                            indexSelect.appendChild(opt);
+                            return;
+                        }
+
+                        keys.forEach(name => {
+                            const opt = document.createElement('option');
+                            opt.value = name;
+                            const count = INDEXES[name] ? INDEXES[name].length : 0;
+                            opt.textContent = `${name} (${count})`;
+                            indexSelect.appendChild(opt);
+                        });
+
+                        // Select the first real index by default if available
+                        if (keys.length > 0) {
+                            indexSelect.value = keys[0];
+                            loadScanResults(document.getElementById('liveCheck').checked);
+                        }
+                    }
+
+                    function getColorClass(v) {
+                        if (v === null || isNaN(v)) return '';
+                        return v >= 0 ? 'positive' : 'negative';
+                    }
+
+                    function renderTable(data) {
+                        const tbody = document.getElementById('resultsTable').tBodies[0];
+                        tbody.innerHTML = '';
+                        data.forEach(r => {
+                            const tr = document.createElement('tr');
+                            const last = r.last_price;
+                            const m = r.momentum_return;
+                            const mr = r.mean_rev_return;
+                            
+                            const lastStr = last !== null && last !== undefined ? last.toFixed(2) : '-';
+                            const mStr = m !== null && m !== undefined ? m.toFixed(2) : '-';
+                            const mrStr = mr !== null && mr !== undefined ? mr.toFixed(2) : '-';
+                            
+                            const mClass = getColorClass(m);
+                            const mrClass = getColorClass(mr);
+
+                            tr.innerHTML = `
+                                <td>${r.index || ''}</td>
+                                <td>${r.symbol}</td>
+                                <td data-value="${last || ''}">${lastStr}</td>
+                                <td data-value="${m || ''}" class="${mClass}">${mStr}</td>
+                                <td data-value="${mr || ''}" class="${mrClass}">${mrStr}</td>
+                            `;
+                            tbody.appendChild(tr);
+                        });
+                    }
+
+                    function exportCSV(filename = 'scan.csv') {
+                        const table = document.getElementById('resultsTable');
+                        const rows = Array.from(table.querySelectorAll('tr'));
+                        const csvRows = rows.map(r => Array.from(r.cells).map(c => '"' + c.textContent.replace(/"/g, '""') + '"').join(',')).join('\\n');
+                        const blob = new Blob([csvRows], { type: 'text/csv' });
+                        const url = URL.createObjectURL(blob);
+                        const a = document.createElement('a'); a.href = url; a.download = filename; a.click(); URL.revokeObjectURL(url);
+                    }
+
+                    async function loadScanResults(live=false) {
+                        const progressEl = document.getElementById('progressInfo');
+                        const tbody = document.getElementById('resultsTable').tBodies[0];
+                        tbody.innerHTML = '';
+                        
+                        const indexSelect = document.getElementById('indexSelect');
+                        const selectedIndex = indexSelect.value;
+                        const minReturn = document.getElementById('minReturnInput').value;
+                        
+                        if (!selectedIndex) return;
+
+                        let names = [];
+                        if (selectedIndex === 'ALL') {
+                            names = Object.keys(INDEXES || {});
+                        } else {
+                            names = [selectedIndex];
+                        }
+                        
+                        if (!names.length) { progressEl.textContent = 'No indexes defined'; return; }
+                        
+                        progressEl.textContent = 'Scanning ' + names.length + ' index(es)...';
+                        loadingCount++;
+                        updateSpinner();
+                        
+                        try {
+                            const promises = names.map(async name => {
+                                try {
+                                    let url = '/api/scan?index=' + encodeURIComponent(name) + '&live=' + (live ? '1' : '0');
+                                    if (minReturn !== '') {
+                                        url += '&min_return=' + encodeURIComponent(minReturn);
+                                    }
+                                    const res = await fetch(url, { headers: { 'Accept': 'application/json' } });
+                                    if (!res.ok) throw new Error('Network response was not ok');
+                                    const data = await res.json();
+                                    return { name, results: data };
+                                } catch (e) {
+                                    console.error('Error scanning ' + name, e);
+                                    return { name, results: [] };
+                                }
+                            });
+                            
+                            const all = await Promise.all(promises);
+                            const rows = [];
+                            all.forEach(a => { (a.results || []).forEach(r => rows.push(Object.assign({ index: a.name }, r))); });
+                            
+                            renderTable(rows);
+                            progressEl.textContent = 'Loaded ' + rows.length + ' rows.';
+                        } catch (e) {
+                            progressEl.textContent = 'Error during scan.';
+                            console.error(e);
+                        } finally {
+                            loadingCount--;
+                            updateSpinner();
+                        }
+                    }
+
+                    function sortTable(tableId, colIndex) {
+                        const table = document.getElementById(tableId);
+                        const tbody = table.tBodies[0];
+                        const rows = Array.from(tbody.rows);
+                        const th = table.tHead.rows[0].cells[colIndex];
+                        const indicator = th.querySelector('.sort-indicator');
+                        const current = th.dataset.order === 'asc' ? 'asc' : (th.dataset.order === 'desc' ? 'desc' : null);
+                        const newOrder = current === 'asc' ? 'desc' : 'asc';
+                        
+                        Array.from(table.tHead.rows[0].cells).forEach(cell => { 
+                            cell.dataset.order = ''; 
+                            const ind = cell.querySelector('.sort-indicator'); 
+                            if (ind) ind.textContent = ''; 
+                        });
+                        
+                        th.dataset.order = newOrder;
+                        if (indicator) indicator.textContent = newOrder === 'asc' ? '▲' : '▼';
+                        
+                        rows.sort((a, b) => {
+                            const aCell = a.cells[colIndex];
+                            const bCell = b.cells[colIndex];
+                            const aVal = aCell.dataset.value !== undefined && aCell.dataset.value !== '' ? parseFloat(aCell.dataset.value) : null;
+                            const bVal = bCell.dataset.value !== undefined && bCell.dataset.value !== '' ? parseFloat(bCell.dataset.value) : null;
+                            
+                            if (aVal !== null && bVal !== null && !isNaN(aVal) && !isNaN(bVal)) {
+                                return newOrder === 'asc' ? aVal - bVal : bVal - aVal;
+                            }
+                            const aText = aCell.textContent.trim();
+                            const bText = bCell.textContent.trim();
+                            return newOrder === 'asc' ? aText.localeCompare(bText) : bText.localeCompare(aText);
+                        });
+                        
+                        rows.forEach(r => tbody.appendChild(r));
+                    }
+
+                    // wire controls
+                    try { if (window.DEFAULT_LIVE) document.getElementById('liveCheck').checked = true; } catch (e) {}
+                    
+                    document.getElementById('indexSelect').addEventListener('change', () => {
+                        const live = document.getElementById('liveCheck').checked; loadScanResults(live);
+                    });
+                    document.getElementById('refreshBtn').addEventListener('click', () => {
+                        const live = document.getElementById('liveCheck').checked; loadScanResults(live);
+                    });
+                    document.getElementById('exportBtn').addEventListener('click', () => exportCSV());
+
+                    // Initial load
+                    fetchIndexes();
+                })();
+            </script>
+
+        </body>
+        </html>
+        """
+
+SCAN_TABLE_HEAD = """
+        <html>
+        <head>
+            <title>Scan Results - {title}</title>
+            <style>
+                body {{ font-family: Arial, sans-serif; margin: 20px; }}
+                table {{ border-collapse: collapse; width: 100%; }}
+                th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
+                th {{ background-color: #f4f4f4; }}
+                tr:nth-child(even) {{ background-color: #f9f9f9; }}
+            </style>
+        </head>
+        <body>
+            <h2>Scan Results for {title}</h2>
+            <table>
+                <thead>
+                    <tr>
+                        <th>Symbol</th>
+                        <th>Last Price</th>
+                        <th>Momentum Return</th>
+                        <th>Mean Rev Return</th>
+                    </tr>
+                </thead>
+                <tbody>
+        """
+
+SCAN_TABLE_ROW = """
+                    <tr>
+                        <td>{symbol}</td>
+                        <td>{last}</td>
+                        <td>{mom}</td>
+                        <td>{mr}</td>
+                    </tr>"""
+
+ANALYZE_TABLE_HEAD = """
+        <html>
+        <head>
+            <title>{title}</title>
+            <style>
+                body {{ font-family: 'Segoe UI', sans-serif; margin: 20px; background: #f4f4f9; }}
+                h2 {{ color: #2c3e50; }}
+                table {{ border-collapse: collapse; width: 100%; background: white; box-shadow: 0 1px 3px rgba(0,0,0,0.1); }}
+                th, td {{ border: 1px solid #ddd; padding: 10px; text-align: left; font-size: 14px; }}
+                th {{ background-color: #f8f9fa; font-weight: 600; }}
+                tr:nth-child(even) {{ background-color: #f9f9f9; }}
+                .rec-Strong {{ color: green; font-weight: bold; }}
+                .rec-Avoid {{ color: red; }}
+            </style>
+        </head>
+        <body>
+            <h2>{title}</h2>
+            <table>
+                <thead>
+                    <tr>
+                        <th>Symbol</th>
+                        <th>Price</th>
+                        <th>Recommendation</th>
+                        <th>Mom Signal</th>
+                        <th>Mom Return %</th>
+                        <th>Mom Sharpe</th>
+                        <th>Rev Signal</th>
+                        <th>Rev Return %</th>
+                        <th>Rev Win Rate %</th>
+                    </tr>
+                </thead>
+                <tbody>
+        """
+
+ANALYZE_TABLE_ROW = """
+                    <tr>
+                        <td>{symbol}</td>
+                        <td>{price}</td>
+                        <td class="{rec_class}">{rec}</td>
+                        <td>{mom_signal}</td>
+                        <td>{mom_return}</td>
+                        <td>{mom_sharpe}</td>
+                        <td>{rev_signal}</td>
+                        <td>{rev_return}</td>
+                        <td>{rev_win_rate}</td>
+                    </tr>"""
+
+TABLE_TAIL = """
+                </tbody>
+            </table>
+        </body>
+        </html>
+        """
+
+
+def _num(v):
+    return f"{v:.2f}" if v is not None else "-"
+
+
+def etag_for(body):
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def render_home(routes):
+    """Render the endpoint index for `routes`. Returns (body bytes, etag)."""
+    routes_by_tag = {}
+    for route in routes:
+        if hasattr(route, "methods") and "GET" in route.methods:
+            tags = getattr(route, "tags", [])
+            if not tags:
+                tags = ["General"]
+            for tag in tags:
+                routes_by_tag.setdefault(tag, []).append(route)
+
+    parts = [HOME_HEAD]
+    for tag in sorted(routes_by_tag.keys()):
+        parts.append(HOME_GROUP.format(tag=escape(str(tag))))
+        for route in routes_by_tag[tag]:
+            parts.append(HOME_ITEM.format(
+                name=escape(getattr(route, "name", "Unnamed")),
+                path=escape(getattr(route, "path", "")),
+                desc=escape(getattr(route, "description", None) or "No description available."),
+            ))
+        parts.append(HOME_GROUP_END)
+    parts.append(HOME_TAIL)
+
+    body = "".join(parts).encode("utf-8")
+    return body, etag_for(body)
+
+
+_SCAN_PAGES = {}
+
+
+def scan_page(default_live=False):
+    """The interactive scan page, built once per variant. Returns (body bytes, etag)."""
+    page = _SCAN_PAGES.get(default_live)
+    if page is None:
+        body = SCAN_PAGE.replace("__DEFAULT_LIVE__", "true" if default_live else "false").encode("utf-8")
+        page = _SCAN_PAGES[default_live] = (body, etag_for(body))
+    return page
+
+
+def stream_scan_table(title, rows):
+    """Yield the scan results page chunk by chunk as `rows` are produced."""
+    yield SCAN_TABLE_HEAD.format(title=escape(str(title)))
+    for row in rows:
+        yield SCAN_TABLE_ROW.format(
+            symbol=escape(str(row.get('symbol'))),
+            last=_num(row.get('last_price')),
+            mom=_num(row.get('momentum_return')),
+            mr=_num(row.get('mean_rev_return')),
+        )
+    yield TABLE_TAIL
+
+
+def stream_analyze_table(title, rows):
+    """Yield the analysis page chunk by chunk as `rows` are produced."""
+    yield ANALYZE_TABLE_HEAD.format(title=escape(str(title)))
+    for r in rows:
+        mom = r.get('momentum', {})
+        rev = r.get('mean_reversion', {})
+        rec = r.get('recommendation', '')
+        yield ANALYZE_TABLE_ROW.format(
+            symbol=escape(str(r.get('symbol'))),
+            price=_num(r.get('last_price')),
+            rec_class='rec-Strong' if 'Strong' in rec else ('rec-Avoid' if 'Avoid' in rec else ''),
+            rec=rec,
+            mom_signal=mom.get('signal'),
+            mom_return=_num(mom.get('return_pct')),
+            mom_sharpe=_num(mom.get('sharpe')),
+            rev_signal=rev.get('signal'),
+            rev_return=_num(rev.get('return_pct')),
+            rev_win_rate=_num(rev.get('win_rate_pct')),
+        )
+    yield TABLE_TAIL
@@ -0,0 +1,150 @@
+import random
+import threading
+import time
+
+
+class ProviderError(Exception):
+    """A data provider failed (network, timeout, rate limit), as opposed to having no data."""
+
+
+class CircuitOpenError(ProviderError):
+    """Raised instead of calling a provider whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Fail fast while a provider is degraded.
+
+    After `threshold` consecutive failures the breaker opens and calls are
+    refused for `reset_after` seconds. Then one trial call is let through
+    (half-open): success closes the breaker, failure opens it again.
+    """
+
+    def __init__(self, name, threshold=5, reset_after=30.0):
+        self.name = name
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now):
+        if self._opened_at is None:
+            return "closed"
+        if now - self._opened_at >= self.reset_after:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self._state(time.monotonic())
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def release(self):
+        """End a call that neither proved nor disproved provider health."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+    def status(self):
+        with self._lock:
+            return {
+                "provider": self.name,
+                "state": self._state(time.monotonic()),
+                "consecutive_failures": self._failures,
+            }
+
+
+class NegativeCache:
+    """Remember keys that returned no data for `ttl` seconds."""
+
+    def __init__(self, ttl=300.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._expires = {}
+
+    def add(self, key):
+        with self._lock:
+            self._expires[key] = time.monotonic() + self.ttl
+            if len(self._expires) > 10000:
+                self._purge(time.monotonic())
+
+    def __contains__(self, key):
+        with self._lock:
+            expires = self._expires.get(key)
+            if expires is None:
+                return False
+            if expires <= time.monotonic():
+                del self._expires[key]
+                return False
+            return True
+
+    def _purge(self, now):
+        for key in [k for k, t in self._expires.items() if t <= now]:
+            del self._expires[key]
+
+    def __len__(self):
+        with self._lock:
+            self._purge(time.monotonic())
+            return len(self._expires)
+
+
+def call_with_retries(fn, breaker, retries=2, backoff=0.5, max_backoff=5.0, check=None):
+    """Call `fn()` through `breaker`, retrying ProviderError with exponential backoff.
+
+    Retries are abandoned as soon as the breaker opens, so a bad provider
+    minute costs one short burst of attempts rather than a full retry cycle
+    per symbol. Any other exception from `fn` is an answer from the provider
+    (e.g. "no data"): it counts as a success and propagates immediately.
+
+    - check: optional fn() called before each attempt, outside the breaker,
+      so that what it raises (e.g. the caller's job timing out) never takes
+      or settles a half-open trial
+    """
+    attempt = 0
+    while True:
+        if check is not None:
+            check()
+        if not breaker.allow():
+            raise CircuitOpenError(f"{breaker.name} circuit open")
+        try:
+            result = fn()
+        except ProviderError:
+            breaker.record_failure()
+            if attempt >= retries:
+                raise
+        except Exception:
+            breaker.record_success()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        else:
+            breaker.record_success()
+            return result
+
+        delay = min(max_backoff, backoff * (2 ** attempt))
+        time.sleep(delay * (0.5 + random.random() / 2))
+        attempt += 1
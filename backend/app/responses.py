@@ -0,0 +1,130 @@
+import gzip
+import json
+import datetime
+import math
+
+import numpy as np
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed; compression costs more than it saves
+COMPRESS_MIN_BYTES = 1024
+
+
+def _default(obj):
+    # Values the encoders don't know natively: NumPy scalars/arrays, pandas timestamps
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _finite(obj):
+    # json.dumps writes NaN/Infinity literals (invalid JSON); map them to None
+    # like orjson does, converting NumPy values on the way
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _finite(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(v) for v in obj]
+    if isinstance(obj, (np.generic, np.ndarray)):
+        return _finite(obj.tolist() if isinstance(obj, np.ndarray) else obj.item())
+    return obj
+
+
+def dumps(content):
+    """Serialise `content` to compact JSON bytes, NaN/inf as null."""
+    if orjson is not None:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(
+        _finite(content), default=_default, separators=(",", ":"), allow_nan=False,
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (when installed) instead of json.dumps."""
+
+    def render(self, content):
+        return dumps(content)
+
+
+def _flatten(row, prefix=""):
+    flat = {}
+    for key, value in row.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{name}."))
+        else:
+            flat[name] = value
+    return flat
+
+
+def to_columns(rows):
+    """Turn a list of (nested) dicts into {"columns": [...], "rows": [[...]]}.
+
+    Nested keys are flattened with dots, e.g. "momentum.sharpe". Columns keep
+    first-seen order; missing values are null.
+    """
+    flat_rows = [_flatten(r) for r in rows]
+    columns = {}
+    for r in flat_rows:
+        for key in r:
+            columns.setdefault(key, None)
+    columns = list(columns)
+    return {"columns": columns, "rows": [[r.get(c) for c in columns] for r in flat_rows]}
+
+
+def _accepted_encodings(header):
+    accepted = set()
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        if token and params not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(token.lower())
+    return accepted
+
+
+def json_response(request, content, status_code=200, shape=None):
+    """Encode `content` once and compress it as the client's Accept-Encoding allows.
+
+    Returning a Response directly also skips FastAPI's jsonable_encoder pass.
+    `shape="columns"` sends row lists (or a dict's "results" list) as
+    columns + rows instead of one object per row.
+    """
+    if shape == "columns":
+        if isinstance(content, list):
+            content = to_columns(content)
+        elif isinstance(content, dict) and isinstance(content.get("results"), list):
+            content = {**content, "results": to_columns(content["results"])}
+
+    body = dumps(content)
+    headers = {"Vary": "Accept-Encoding"}
+    if len(body) >= COMPRESS_MIN_BYTES:
+        accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            body = brotli.compress(body, quality=4)
+            headers["Content-Encoding"] = "br"
+        elif "gzip" in accepted:
+            body = gzip.compress(body, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+
+    return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
@@ -0,0 +1,350 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from .cache import ShardedCache
+from .data import fetch_bars, fetch_close_matrix
+from .robustness import periods_per_year
+from .singleflight import SingleFlight
+from .universe import get_universe
+try:
+    from config import SECTORS, RISK_WINDOW, RISK_MAX_WINDOW, RISK_CACHE_MAX_ENTRIES
+except ImportError:
+    try:
+        from ..config import SECTORS, RISK_WINDOW, RISK_MAX_WINDOW, RISK_CACHE_MAX_ENTRIES
+    except ImportError:
+        from backend.config import SECTORS, RISK_WINDOW, RISK_MAX_WINDOW, RISK_CACHE_MAX_ENTRIES
+
+# History fetched per interval to build a model; must comfortably exceed the largest window
+RISK_PERIODS = {"1d": "2y", "5m": "5d"}
+# Recent history fetched to advance an existing model. It has to reach back to
+# the model's last bar; when it doesn't (e.g. first 5m call of a new session)
+# the model is rebuilt from RISK_PERIODS.
+RISK_UPDATE_PERIODS = {"1d": "1mo", "5m": "1d"}
+_FREQS = {"1d": "1D", "5m": "5m"}
+EQUAL_WEIGHT = "equal-weight"
+
+
+class RollingCovariance:
+    """Pairwise rolling covariance/correlation over the last `window` rows.
+
+    Keeps running sums per pair (i, j) over rows where both are present:
+    sum x_i, sum x_i^2 (masked by j), sum x_i x_j and the pair count. Adding a
+    row and dropping the one leaving the window are both O(n^2), so a new bar
+    never rescans history. NaNs are handled like pandas' pairwise-complete
+    `cov()`/`corr()`. The sums are rebuilt from the ring buffer once per
+    `window` pushes to stop floating-point drift from accumulating.
+    """
+
+    __slots__ = ("window", "buf", "pos", "count", "pushes", "sx", "sxx", "sxy", "cnt")
+
+    def __init__(self, window, n):
+        self.window = window
+        self.buf = np.full((window, n), np.nan)
+        self.pos = 0          # next slot to write
+        self.count = 0        # rows currently in the window
+        self.pushes = 0
+        self.sx = np.zeros((n, n))
+        self.sxx = np.zeros((n, n))
+        self.sxy = np.zeros((n, n))
+        self.cnt = np.zeros((n, n))
+
+    @classmethod
+    def from_rows(cls, rows, window):
+        """Vectorised build from a (T, n) matrix; only the last `window` rows count."""
+        rows = np.asarray(rows, dtype=np.float64)
+        model = cls(window, rows.shape[1])
+        tail = rows[-window:]
+        model.count = len(tail)
+        model.buf[:model.count] = tail
+        model.pos = model.count % window
+        model._rebuild()
+        return model
+
+    def _rebuild(self):
+        rows = self.buf[:self.count] if self.count < self.window else self.buf
+        mask = np.isfinite(rows).astype(np.float64)
+        x = np.where(mask > 0, rows, 0.0)
+        self.sx = x.T @ mask
+        self.sxx = (x * x).T @ mask
+        self.sxy = x.T @ x
+        self.cnt = mask.T @ mask
+
+    def _apply(self, row, sign):
+        mask = np.isfinite(row).astype(np.float64)
+        x = np.where(mask > 0, row, 0.0)
+        self.sx += sign * np.outer(x, mask)
+        self.sxx += sign * np.outer(x * x, mask)
+        self.sxy += sign * np.outer(x, x)
+        self.cnt += sign * np.outer(mask, mask)
+
+    def push(self, row):
+        row = np.asarray(row, dtype=np.float64)
+        if self.count == self.window:
+            self._apply(self.buf[self.pos], -1.0)
+        else:
+            self.count += 1
+        self.buf[self.pos] = row
+        self.pos = (self.pos + 1) % self.window
+        self.pushes += 1
+        if self.pushes % self.window == 0:
+            self._rebuild()
+        else:
+            self._apply(row, 1.0)
+
+    def replace_last(self, row):
+        """Revise the newest row in place (e.g. today's still-forming daily bar)."""
+        if not self.count:
+            return self.push(row)
+        last = (self.pos - 1) % self.window
+        row = np.asarray(row, dtype=np.float64)
+        self._apply(self.buf[last], -1.0)
+        self.buf[last] = row
+        self._apply(row, 1.0)
+
+    def copy(self):
+        other = RollingCovariance.__new__(RollingCovariance)
+        for name in self.__slots__:
+            value = getattr(self, name)
+            setattr(other, name, value.copy() if isinstance(value, np.ndarray) else value)
+        return other
+
+    def cov(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out = (self.sxy - self.sx * self.sx.T / self.cnt) / (self.cnt - 1)
+        out[self.cnt < 2] = np.nan
+        return out
+
+    def corr(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Variance of i over the rows shared with j
+            var = (self.sxx - self.sx * self.sx / self.cnt) / (self.cnt - 1)
+            out = self.cov() / np.sqrt(var * var.T)
+        return np.clip(out, -1.0, 1.0)
+
+
+def _returns(closes, prev):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return closes / prev - 1
+
+
+class RiskModel:
+    """Rolling risk state for one (index, interval).
+
+    Columns are the index constituents followed by the benchmark. With an
+    equal-weight benchmark the last column is the mean constituent return.
+    The last `capacity` return rows are kept, plus one RollingCovariance per
+    window asked for, built from those rows on first use. `advance` feeds
+    only bars newer than the last one seen; the last bar is re-applied when
+    its close changed since (an intraday daily bar).
+    """
+
+    __slots__ = ("symbols", "benchmark", "columns", "rows", "windows", "last_ts", "prev_close", "last_close")
+
+    def __init__(self, symbols, benchmark, columns, rows, windows, last_ts, prev_close, last_close):
+        self.symbols = symbols
+        self.benchmark = benchmark
+        self.columns = columns
+        self.rows = rows
+        self.windows = windows
+        self.last_ts = last_ts
+        self.prev_close = prev_close
+        self.last_close = last_close
+
+    @classmethod
+    def build(cls, closes, benchmark, capacity=RISK_MAX_WINDOW):
+        values = closes.to_numpy(dtype=np.float64)
+        rows = _returns(values[1:], values[:-1])
+        if benchmark == EQUAL_WEIGHT:
+            rows = _with_equal_weight(rows)
+        return cls(
+            tuple(closes.columns[:len(closes.columns) - (benchmark != EQUAL_WEIGHT)]),
+            benchmark,
+            tuple(closes.columns),
+            rows[-capacity:],
+            {},
+            closes.index[-1],
+            values[-2] if len(values) > 1 else np.full(values.shape[1], np.nan),
+            values[-1],
+        )
+
+    def rolling(self, window):
+        """The RollingCovariance for `window`, built from the kept rows on first use."""
+        model = self.windows.get(window)
+        if model is None:
+            model = self.windows[window] = RollingCovariance.from_rows(self.rows, window)
+        return model
+
+    def copy(self):
+        return RiskModel(self.symbols, self.benchmark, self.columns, self.rows,
+                         {w: r.copy() for w, r in self.windows.items()},
+                         self.last_ts, self.prev_close, self.last_close)
+
+    def _row(self, closes, prev):
+        row = _returns(closes, prev)
+        return _with_equal_weight(row[None, :])[0] if self.benchmark == EQUAL_WEIGHT else row
+
+    def can_advance(self, closes, benchmark):
+        """Whether `closes` (recent bars only) continue this model."""
+        return benchmark == self.benchmark and tuple(closes.columns) == self.columns \
+            and self.last_ts in closes.index
+
+    def _recent(self, closes):
+        # Bars from last_ts on, gaps at the start filled with the closes we already know
+        recent = closes[closes.index >= self.last_ts].to_numpy(dtype=np.float64)
+        recent[0] = np.where(np.isnan(recent[0]), self.last_close, recent[0])
+        return pd.DataFrame(recent).ffill().to_numpy(), closes.index[closes.index >= self.last_ts]
+
+    def is_current(self, closes):
+        recent, index = self._recent(closes)
+        return len(index) == 1 and np.array_equal(recent[0], self.last_close, equal_nan=True)
+
+    def advance(self, closes):
+        """Apply the revised last bar (if any) and every bar newer than `last_ts`."""
+        recent, index = self._recent(closes)
+        rows = self.rows.copy()
+        if not np.array_equal(recent[0], self.last_close, equal_nan=True):
+            row = self._row(recent[0], self.prev_close)
+            if len(rows):
+                rows[-1] = row
+            for model in self.windows.values():
+                model.replace_last(row)
+            self.last_close = recent[0]
+
+        new = []
+        for ts, values in zip(index[1:], recent[1:]):
+            row = self._row(values, self.last_close)
+            new.append(row)
+            for model in self.windows.values():
+                model.push(row)
+            self.prev_close, self.last_close, self.last_ts = self.last_close, values, ts
+        if new:
+            rows = np.vstack([rows, np.asarray(new)])[-RISK_MAX_WINDOW:]
+        self.rows = rows
+
+
+def _with_equal_weight(rows):
+    with warnings.catch_warnings():
+        # All-NaN rows (nothing traded yet) average to NaN, which is what we want
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean = np.nanmean(rows, axis=1)
+    return np.column_stack([rows, mean])
+
+
+def _clean(values):
+    # NaN/inf -> None so the result is valid JSON with either serializer
+    arr = np.asarray(values, dtype=np.float64)
+    out = arr.astype(object)
+    out[~np.isfinite(arr)] = None
+    return out.tolist()
+
+
+def _load_closes(index, symbols, interval, period):
+    closes = fetch_close_matrix(symbols, period=period, interval=interval)
+    if closes.empty:
+        return closes, EQUAL_WEIGHT
+
+    ticker = get_universe().benchmark(index)
+    bench = fetch_bars(ticker, period=period, interval=interval) if ticker else None
+    if bench is None or bench.empty:
+        return closes, EQUAL_WEIGHT
+    series = bench.close_series().reindex(closes.index).ffill()
+    return pd.concat([closes, series.rename(ticker)], axis=1), ticker
+
+
+def summarize(model, window, index, interval):
+    """Correlation/covariance matrices, betas and sector aggregates from a model."""
+    n = len(model.symbols)
+    rolling = model.rolling(window)
+    cov_all = rolling.cov()
+    corr_all = rolling.corr()
+    cov, corr = cov_all[:n, :n], corr_all[:n, :n]
+    ann = periods_per_year(_FREQS[interval])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        beta = cov_all[:n, n] / cov_all[n, n]
+        vol = np.sqrt(np.diag(cov) * ann) * 100
+
+    sectors = sorted({SECTORS.get(s, "Other") for s in model.symbols})
+    member = np.array([[SECTORS.get(s, "Other") == sec for sec in sectors] for s in model.symbols], dtype=np.float64)
+    weights = member / member.sum(axis=0)
+    # Equal-weight sector baskets: Cov(A, B) = w_A' S w_B
+    sector_cov = weights.T @ np.nan_to_num(cov) @ weights
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sd = np.sqrt(np.diag(sector_cov))
+        sector_corr = sector_cov / np.outer(sd, sd)
+
+    sector_rows = {}
+    off_diag = ~np.eye(n, dtype=bool)
+    for k, sec in enumerate(sectors):
+        idx = member[:, k] > 0
+        pair = corr[np.ix_(idx, idx)][off_diag[np.ix_(idx, idx)]]
+        pair = pair[np.isfinite(pair)]
+        sector_beta = beta[idx][np.isfinite(beta[idx])]
+        sector_rows[sec] = {
+            "symbols": [s for s, m in zip(model.symbols, idx) if m],
+            "avg_beta": float(sector_beta.mean()) if sector_beta.size else None,
+            "avg_correlation": float(pair.mean()) if pair.size else None,
+            "volatility_pct": _clean([sd[k] * np.sqrt(ann) * 100])[0],
+        }
+
+    return {
+        "index": index,
+        "interval": interval,
+        "window": window,
+        "bars": int(rolling.count),
+        "as_of": model.last_ts.isoformat(),
+        "benchmark": model.benchmark,
+        "symbols": list(model.symbols),
+        "correlation": _clean(corr),
+        "covariance": _clean(cov),
+        "volatility_pct": dict(zip(model.symbols, _clean(vol))),
+        "beta": dict(zip(model.symbols, _clean(beta))),
+        "sectors": sector_rows,
+        "sector_correlation": {"sectors": sectors, "matrix": _clean(sector_corr)},
+    }
+
+
+# (index, interval, window) -> (requested symbols, RiskModel). Each window has
+# its own model, so concurrent requests for different windows never replace
+# each other's; models are copied before advancing, so a published model is
+# never mutated.
+_MODELS = ShardedCache(n_shards=4, max_entries=RISK_CACHE_MAX_ENTRIES)
+_FLIGHTS = SingleFlight()
+
+
+def _risk_matrix(index, symbols, window, interval):
+    key = (index, interval, window)
+    symbols = tuple(symbols)
+    cached, model = _MODELS.get(key, (None, None))
+    if model is not None and cached == symbols:
+        # Only the recent bars are fetched to bring a cached model up to date
+        closes, benchmark = _load_closes(index, symbols, interval, RISK_UPDATE_PERIODS[interval])
+        if not closes.empty and model.can_advance(closes, benchmark):
+            if not model.is_current(closes):
+                model = model.copy()
+                model.advance(closes)
+                model.rolling(window)
+                _MODELS.set(key, (symbols, model))
+            return summarize(model, window, index, interval)
+
+    closes, benchmark = _load_closes(index, symbols, interval, RISK_PERIODS[interval])
+    if len(closes) < 3:
+        return None
+    model = RiskModel.build(closes, benchmark)
+    model.rolling(window)
+    _MODELS.set(key, (symbols, model))
+    return summarize(model, window, index, interval)
+
+
+def risk_matrix(index, symbols, window=RISK_WINDOW, interval="1d"):
+    """Rolling risk view of an index; None when there isn't enough data.
+
+    The rolling state is cached per (index, interval, window). Later calls fetch only
+    recent bars and feed the model the ones that arrived since the previous
+    call; the full history is fetched again only when the model can't be
+    continued (new constituents, or a gap longer than the update period).
+    """
+    key = ("risk", index, tuple(symbols), window, interval)
+    return _FLIGHTS.do(key, _risk_matrix, index, symbols, window, interval)
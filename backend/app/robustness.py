@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import vectorbt as vbt
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+PERCENTILES = (5, 50, 95)
+
+
+def periods_per_year(freq):
+    """Bars per year for `freq` ("1D", "5m"), by vectorbt's own convention.
+
+    vectorbt annualises with `settings.returns["year_freq"]` (365 days by
+    default), so using the same factor keeps bootstrap Sharpe ratios on the
+    scale of `Portfolio.sharpe_ratio()`.
+    """
+    return pd.Timedelta(vbt.settings.returns["year_freq"]) / pd.Timedelta(freq or "1D")
+
+
+def block_bootstrap_indices(rng, n_samples, length, block):
+    """(n_samples, length) index matrix of moving-block bootstrap resamples.
+
+    Each row is built from random blocks of `block` consecutive bars, which
+    keeps short-range autocorrelation (volatility clustering) intact.
+    """
+    block = max(1, min(block, length))
+    n_blocks = -(-length // block)
+    starts = rng.integers(0, length - block + 1, size=(n_samples, n_blocks))
+    idx = starts[:, :, None] + np.arange(block)
+    return idx.reshape(n_samples, n_blocks * block)[:, :length]
+
+
+def _max_drawdown_numpy(returns):
+    equity = np.cumprod(1 + returns, axis=1)
+    peaks = np.maximum.accumulate(equity, axis=1)
+    return (equity / peaks - 1).min(axis=1)
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _max_drawdown_nb(returns):
+        # One pass per row, no (n, T) temporaries
+        n, t = returns.shape
+        out = np.empty(n)
+        for i in range(n):
+            equity = 1.0
+            peak = 1.0
+            worst = 0.0
+            for j in range(t):
+                equity *= 1.0 + returns[i, j]
+                if equity > peak:
+                    peak = equity
+                dd = equity / peak - 1.0
+                if dd < worst:
+                    worst = dd
+            out[i] = worst
+        return out
+
+    def max_drawdowns(returns):
+        return _max_drawdown_nb(np.ascontiguousarray(returns, dtype=np.float64))
+else:
+    max_drawdowns = _max_drawdown_numpy
+
+
+def _summary(values):
+    values = values[np.isfinite(values)]
+    if not values.size:
+        return None
+    pct = np.percentile(values, PERCENTILES)
+    return {f"p{p}": float(v) for p, v in zip(PERCENTILES, pct)}
+
+
+def bootstrap_returns(returns, freq="1D", n_samples=1000, block=5, seed=None):
+    """Confidence intervals for Sharpe, total return and max drawdown.
+
+    `returns` are per-bar strategy returns (e.g. `Portfolio.returns()`).
+    All resamples are evaluated at once on a (n_samples, bars) matrix.
+    Returns None when there are too few bars to resample.
+    """
+    r = np.asarray(returns, dtype=np.float64)
+    r = r[np.isfinite(r)]
+    if r.size < 2:
+        return None
+
+    rng = np.random.default_rng(seed)
+    sample = r[block_bootstrap_indices(rng, n_samples, r.size, block)]
+
+    total = np.prod(1 + sample, axis=1) - 1
+    std = sample.std(axis=1, ddof=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = sample.mean(axis=1) / std * np.sqrt(periods_per_year(freq))
+    drawdown = max_drawdowns(sample)
+
+    return {
+        "samples": n_samples,
+        "block": block,
+        "sharpe": _summary(sharpe),
+        "return_pct": _summary(total * 100),
+        "max_dd_pct": _summary(drawdown * 100),
+        "prob_sharpe_gt_1": float(np.mean(sharpe > 1)),
+        "prob_return_gt_0": float(np.mean(total > 0)),
+    }
@@ -1,87 +1,158 @@
-from .data import fetch_data
-from .backtest import run_backtest, run_analysis
-try:
-    from config import NSE_SYMBOLS
-except ImportError:
-    try:
-        from ..config import NSE_SYMBOLS
-    except ImportError:
-        from backend.config import NSE_SYMBOLS
-
-
-def scan_market(symbols=None, live=False):
-    """Scan a list of symbols and return metrics.
+from .data import fetch_bars, fetch_close_matrix
+from .backtest import run_backtest, run_analysis, run_portfolio_backtest, run_strategy_matrix
+from .costs import resolve_costs
+from .jobs import TaskCancelled, TaskTimeout, check_task
+from .singleflight import SingleFlight
+from .universe import default_symbols
 
-    - symbols: optional iterable of symbol strings (defaults to `NSE_SYMBOLS`)
-    - live: if True, fetch shorter-period intraday data for latest prices
+
+# Concurrent identical scans (and per-symbol work shared between indexes, e.g.
+# HDFCBANK in both NIFTY BANK and NIFTY 50) are computed once and shared.
+# Job control stays per caller: a waiting job task still stops at its own
+# deadline or cancellation, and when the computing task is stopped by its
+# job, the waiters compute the symbol themselves rather than fail with it.
+_FLIGHTS = SingleFlight(check=check_task, retry_on=(TaskTimeout, TaskCancelled))
+
+
+def _costs_key(cost_kwargs):
+    return tuple(sorted(cost_kwargs.items()))
+
+
+def _robustness_key(robustness):
+    return tuple(sorted(robustness.items())) if robustness is not None else None
+
+
+def _fetch_bars(symbol, live):
+    if live:
+        return fetch_bars(symbol, period="1d", interval="5m"), "5m"
+    return fetch_bars(symbol), "1D"
+
+
+def _scan_symbol(symbol, live, cost_kwargs):
+    bars, _ = _fetch_bars(symbol, live)
+    if bars.empty:
+        print(f"No data for {symbol}")
+        return None
+    check_task()
+
+    metrics = run_backtest(bars, costs=cost_kwargs)
+    return {
+        "symbol": symbol,
+        "last_price": bars.last_close,
+        **metrics
+    }
+
+
+def scan_symbol(symbol, live=False, cost_kwargs=None):
+    """Backtest one symbol; concurrent identical requests share one computation."""
+    cost_kwargs = cost_kwargs or {}
+    key = ("scan", symbol, live, "5m" if live else "1d", _costs_key(cost_kwargs))
+    return _FLIGHTS.do(key, _scan_symbol, symbol, live, cost_kwargs)
+
+
+def _analyze_symbol(symbol, live, cost_kwargs, robustness):
+    bars, freq = _fetch_bars(symbol, live)
+    if bars.empty:
+        return None
+    check_task()
+
+    analysis = run_analysis(bars, freq=freq, costs=cost_kwargs, robustness=robustness)
+    return {"symbol": symbol, "last_price": bars.last_close, **analysis}
+
+
+def analyze_symbol(symbol, live=False, cost_kwargs=None, robustness=None):
+    """Analyse one symbol; concurrent identical requests share one computation.
+
+    - robustness: optional bootstrap settings, see `run_analysis`
     """
-    symbols = symbols or NSE_SYMBOLS
-    results = []
+    cost_kwargs = cost_kwargs or {}
+    key = ("analyze", symbol, live, "5m" if live else "1d", _costs_key(cost_kwargs), _robustness_key(robustness))
+    return _FLIGHTS.do(key, _analyze_symbol, symbol, live, cost_kwargs, robustness)
+
 
+def _iter_many(fn, symbols, live, cost_kwargs, label, **kwargs):
     for symbol in symbols:
         try:
-            if live:
-                data = fetch_data(symbol, period="1d", interval="5m")
-            else:
-                data = fetch_data(symbol)
-
-            if data is None or data.empty:
-                print(f"No data for {symbol}")
-                continue
-
-            metrics = run_backtest(data)
-
-            last_price = None
-            try:
-                arr = data["Close"].to_numpy()
-                if arr.size:
-                    val = arr[-1]
-                    if hasattr(val, 'item'):
-                        last_price = float(val.item())
-                    else:
-                        last_price = float(val)
-                else:
-                    last_price = None
-            except Exception:
-                last_price = None
-
-            results.append({
-                "symbol": symbol,
-                "last_price": last_price,
-                **metrics
-            })
+            row = fn(symbol, live=live, cost_kwargs=cost_kwargs, **kwargs)
+            if row is not None:
+                yield row
         except Exception as e:
-            print(f"Error scanning {symbol}: {e}")
+            print(f"Error {label} {symbol}: {e}")
 
-    return results
 
+def _scan_many(fn, symbols, live, cost_kwargs, label, **kwargs):
+    return list(_iter_many(fn, symbols, live, cost_kwargs, label, **kwargs))
 
-def scan_analysis(symbols=None, live=False):
-    symbols = symbols or NSE_SYMBOLS
-    results = []
 
-    for symbol in symbols:
-        try:
-            if live:
-                data = fetch_data(symbol, period="1d", interval="5m")
-                freq = "5m"
-            else:
-                data = fetch_data(symbol)
-                freq = "1D"
-
-            if data is None or data.empty:
-                continue
-
-            analysis = run_analysis(data, freq=freq)
-            last_price = None
-            if not data["Close"].empty:
-                arr = data["Close"].to_numpy()
-                if arr.size > 0:
-                    val = arr[-1]
-                    last_price = float(val.item()) if hasattr(val, 'item') else float(val)
-
-            results.append({"symbol": symbol, "last_price": last_price, **analysis})
-        except Exception as e:
-            print(f"Error analyzing {symbol}: {e}")
+def scan_market(symbols=None, live=False, costs=None):
+    """Scan a list of symbols and return metrics.
+
+    - symbols: optional iterable of symbol strings (defaults to the first index in the index file)
+    - live: if True, fetch shorter-period intraday data for latest prices
+    - costs: cost model name from `COST_MODELS` (default depends on `live`)
+
+    Concurrent calls with the same arguments await one in-flight scan and
+    share its result list; treat it as read-only.
+    """
+    symbols = tuple(symbols or default_symbols())
+    cost_kwargs = resolve_costs(costs, live=live)
+    key = ("scan_market", symbols, live, "5m" if live else "1d", _costs_key(cost_kwargs))
+    return _FLIGHTS.do(key, _scan_many, scan_symbol, symbols, live, cost_kwargs, "scanning")
 
-    return results
+
+def scan_analysis(symbols=None, live=False, costs=None, robustness=None):
+    symbols = tuple(symbols or default_symbols())
+    cost_kwargs = resolve_costs(costs, live=live)
+    key = ("scan_analysis", symbols, live, "5m" if live else "1d", _costs_key(cost_kwargs), _robustness_key(robustness))
+    return _FLIGHTS.do(key, _scan_many, analyze_symbol, symbols, live, cost_kwargs, "analyzing", robustness=robustness)
+
+
+def iter_scan_market(symbols=None, live=False, costs=None):
+    """Like `scan_market`, but yield each row as soon as it is computed."""
+    cost_kwargs = resolve_costs(costs, live=live)
+    return _iter_many(scan_symbol, symbols or default_symbols(), live, cost_kwargs, "scanning")
+
+
+def iter_scan_analysis(symbols=None, live=False, costs=None, robustness=None):
+    """Like `scan_analysis`, but yield each row as soon as it is computed."""
+    cost_kwargs = resolve_costs(costs, live=live)
+    return _iter_many(analyze_symbol, symbols or default_symbols(), live, cost_kwargs, "analyzing", robustness=robustness)
+
+
+def scan_portfolio(symbols=None, live=False, strategy="momentum", costs=None, membership=None):
+    """Backtest `strategy` over all symbols as one cash-sharing portfolio.
+
+    - membership: optional fn(dates, symbols) -> bool array of index
+      membership per bar, so symbols only trade while they were constituents
+    """
+    symbols = symbols or default_symbols()
+    cost_kwargs = resolve_costs(costs, live=live)
+    if live:
+        close = fetch_close_matrix(symbols, period="1d", interval="5m")
+        freq = "5m"
+    else:
+        close = fetch_close_matrix(symbols)
+        freq = "1D"
+
+    if close.empty:
+        return None
+
+    mask = membership(close.index, close.columns) if membership is not None else None
+    return run_portfolio_backtest(close, strategy=strategy, freq=freq, costs=cost_kwargs, membership=mask)
+
+
+def scan_strategies(symbols=None, live=False, strategies=None, costs=None):
+    """Metrics for every (symbol, strategy) pair from one stacked simulation."""
+    symbols = symbols or default_symbols()
+    cost_kwargs = resolve_costs(costs, live=live)
+    if live:
+        close = fetch_close_matrix(symbols, period="1d", interval="5m")
+        freq = "5m"
+    else:
+        close = fetch_close_matrix(symbols)
+        freq = "1D"
+
+    if close.empty:
+        return {}
+
+    return run_strategy_matrix(close, strategies=strategies, freq=freq, costs=cost_kwargs)
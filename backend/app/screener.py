@@ -0,0 +1,139 @@
+import bisect
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Screenable metrics and where to find them in scan / analysis result rows.
+# A path is a tuple of nested keys; the first path present in a row wins.
+SCREENER_METRICS = {
+    "return": (("momentum_return",), ("momentum", "return_pct")),
+    "mean_rev_return": (("mean_rev_return",), ("mean_reversion", "return_pct")),
+    "sharpe": (("momentum", "sharpe"),),
+    "rsi": (("rsi",),),
+    "ma_spread": (("ma_spread_pct",),),
+}
+_METRIC_NAMES = list(SCREENER_METRICS)
+_METRIC_COL = {name: i for i, name in enumerate(_METRIC_NAMES)}
+
+_LOCK = threading.Lock()
+# (index name, interval, cost model) -> {"symbols": [...], "pos": {symbol: row},
+#     "values": (capacity, k) array whose first len(symbols) rows are used,
+#     "sorted": per metric, a sorted list of its non-NaN values, "updated": iso ts}
+# Books are kept apart per interval and cost model, so percentiles never mix
+# daily with intraday returns or returns net of different costs.
+_BOOKS = {}
+
+
+def _extract(row, paths):
+    for path in paths:
+        val = row
+        for key in path:
+            if not isinstance(val, dict) or key not in val:
+                val = None
+                break
+            val = val[key]
+        if val is not None:
+            return float(val)
+    return np.nan
+
+
+def _percentile(ordered, value):
+    # Percentile rank in [0, 100] of `value` among `ordered` (ties share the lowest rank)
+    if np.isnan(value):
+        return None
+    n = len(ordered)
+    return bisect.bisect_left(ordered, value) * 100.0 / (n - 1) if n > 1 else 100.0
+
+
+def update_screener(index, rows, interval="1d", costs=None):
+    """Merge freshly scanned/analysed rows for `index` into its ranking book.
+
+    Only the given symbols' metrics are touched; metrics absent from a row
+    (e.g. Sharpe in a plain scan) keep their previous value. Ranks are
+    maintained incrementally: each changed value is moved within its
+    metric's sorted list (a bisect plus one list shift), so neither an
+    update nor a query re-sorts the book. Storage grows geometrically.
+    """
+    if not index or not rows:
+        return
+    key = (index, interval, costs)
+    with _LOCK:
+        book = _BOOKS.get(key)
+        if book is None:
+            book = {
+                "symbols": [], "pos": {}, "values": np.full((16, len(_METRIC_NAMES)), np.nan),
+                "sorted": [[] for _ in _METRIC_NAMES], "updated": None,
+            }
+            _BOOKS[key] = book
+
+        for sym in dict.fromkeys(r["symbol"] for r in rows if r.get("symbol")):
+            if sym in book["pos"]:
+                continue
+            book["pos"][sym] = len(book["symbols"])
+            book["symbols"].append(sym)
+            if len(book["symbols"]) > len(book["values"]):
+                grown = np.full((2 * len(book["values"]), len(_METRIC_NAMES)), np.nan)
+                grown[:len(book["values"])] = book["values"]
+                book["values"] = grown
+
+        values = book["values"]
+        for row in rows:
+            i = book["pos"].get(row.get("symbol"))
+            if i is None:
+                continue
+            for name, paths in SCREENER_METRICS.items():
+                v = _extract(row, paths)
+                if np.isnan(v):
+                    continue
+                j = _METRIC_COL[name]
+                ordered = book["sorted"][j]
+                old = values[i, j]
+                if not np.isnan(old):
+                    del ordered[bisect.bisect_left(ordered, old)]
+                bisect.insort(ordered, v)
+                values[i, j] = v
+
+        book["updated"] = datetime.now(timezone.utc).astimezone().isoformat()
+
+
+def screen(index, metric="return", n=10, order="top", interval="1d", costs=None):
+    """Return the top (or bottom) `n` symbols of `index` by `metric`.
+
+    Selection uses `np.argpartition`, so it is O(N) in the universe size;
+    only the selected `n` rows are sorted, and only their percentiles are
+    looked up (a bisect each in the maintained sorted values).
+    """
+    if metric not in _METRIC_COL:
+        raise ValueError(f"Unknown metric '{metric}'. Choose from {_METRIC_NAMES}")
+
+    header = {"index": index, "interval": interval, "costs": costs, "metric": metric}
+    with _LOCK:
+        book = _BOOKS.get((index, interval, costs))
+        if book is None or not book["symbols"]:
+            return {**header, "updated": None, "results": []}
+        symbols, values, updated = book["symbols"], book["values"][:len(book["symbols"])], book["updated"]
+
+        col = values[:, _METRIC_COL[metric]]
+        valid = np.flatnonzero(~np.isnan(col))
+        keyed = col[valid] if order == "bottom" else -col[valid]
+        k = min(max(int(n), 0), len(valid))
+        if k == 0:
+            picked = valid[:0]
+        else:
+            part = np.argpartition(keyed, k - 1)[:k] if k < len(valid) else np.arange(len(valid))
+            picked = valid[part[np.argsort(keyed[part], kind="stable")]]
+
+        results = []
+        for i in picked:
+            percentiles = {
+                name: _percentile(book["sorted"][j], values[i, j]) for j, name in enumerate(_METRIC_NAMES)
+            }
+            results.append({
+                "symbol": symbols[i],
+                "value": float(col[i]),
+                "percentile": percentiles[metric],
+                "percentiles": percentiles,
+            })
+
+    return {**header, "updated": updated, "results": results}
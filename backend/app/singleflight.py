@@ -0,0 +1,73 @@
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it is
+    in flight block until it finishes and receive the same result (or the same
+    exception). Nothing is cached afterwards - the next call after completion
+    runs again. Shared results must be treated as read-only by callers.
+
+    - check: optional fn() called every `poll` seconds while a caller waits
+      for another's execution; whatever it raises ends that caller's wait
+      (e.g. the waiter's own job deadline or cancellation)
+    - retry_on: exception types that belong to the executing caller rather
+      than to the work (e.g. its job timing out). Waiters that see one run
+      the call again themselves instead of inheriting it.
+    """
+
+    def __init__(self, check=None, retry_on=(), poll=0.05):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._check = check
+        self._retry_on = tuple(retry_on)
+        self._poll = poll
+
+    def do(self, key, fn, *args, **kwargs):
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = _Call()
+                    self._calls[key] = call
+
+            if leader:
+                break
+            self._wait(call)
+            if call.error is None:
+                return call.result
+            if not isinstance(call.error, self._retry_on):
+                raise call.error
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def _wait(self, call):
+        if self._check is None:
+            call.done.wait()
+            return
+        while not call.done.wait(self._poll):
+            self._check()
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
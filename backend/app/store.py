@@ -0,0 +1,90 @@
+import os
+import datetime
+
+import pandas as pd
+try:
+    from config import BAR_STORE_DIR, BAR_STORE_MAX_AGE_DAYS
+except ImportError:
+    try:
+        from ..config import BAR_STORE_DIR, BAR_STORE_MAX_AGE_DAYS
+    except ImportError:
+        from backend.config import BAR_STORE_DIR, BAR_STORE_MAX_AGE_DAYS
+
+# Local bar store: one Parquet file per symbol and interval.
+#
+#   <BAR_STORE_DIR>/<interval>/<SYMBOL>.parquet      adjusted bars, read by fetch_data
+#   <BAR_STORE_DIR>/raw/<interval>/<SYMBOL>.parquet  unadjusted bars as ingested
+#
+# Frames use the same layout as the providers: a DatetimeIndex and
+# Open/High/Low/Close/Volume columns.
+
+BAR_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def _path(symbol, interval, raw=False, root=None):
+    root = root or BAR_STORE_DIR
+    parts = [root, "raw", interval] if raw else [root, interval]
+    # Tickers like M&M.NS are fine on disk; only path separators need escaping
+    return os.path.join(*parts, symbol.replace("/", "_") + ".parquet")
+
+
+def read_bars(symbol, interval="1d", raw=False, root=None):
+    """Stored bars for `symbol`, or None when the store has none."""
+    path = _path(symbol, interval, raw=raw, root=root)
+    if not (root or BAR_STORE_DIR) or not os.path.exists(path):
+        return None
+    return pd.read_parquet(path)
+
+
+def write_bars(symbol, bars, interval="1d", raw=False, root=None):
+    """Replace the stored bars for `symbol` (written atomically)."""
+    path = _path(symbol, interval, raw=raw, root=root)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    bars.to_parquet(tmp)
+    os.replace(tmp, path)
+
+
+def append_bars(symbol, bars, interval="1d", raw=False, root=None):
+    """Merge `bars` into the stored series; new rows win on duplicate timestamps."""
+    existing = read_bars(symbol, interval, raw=raw, root=root)
+    if existing is not None and not existing.empty:
+        bars = pd.concat([existing, bars])
+        bars = bars[~bars.index.duplicated(keep="last")]
+    write_bars(symbol, bars.sort_index(), interval, raw=raw, root=root)
+
+
+def _period_start(period, end):
+    # yfinance-style periods: 5d, 1mo, 6mo, 1y, 10y, ytd, max
+    if period in (None, "max"):
+        return None
+    if period == "ytd":
+        return pd.Timestamp(end.year, 1, 1)
+    for suffix, unit in (("mo", "months"), ("d", "days"), ("y", "years")):
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return end - pd.DateOffset(**{unit: int(period[:-len(suffix)])})
+    return None
+
+
+def load_period(symbol, period="6mo", interval="1d", offline=False):
+    """Stored bars covering `period` up to today, or None if absent or stale.
+
+    The store is considered stale when its last bar is older than
+    BAR_STORE_MAX_AGE_DAYS (None disables the check, e.g. for research runs
+    on a frozen history); callers then fall back to the network provider.
+    With `offline=True` staleness is ignored and `period` ends at the last
+    stored bar instead of today.
+    """
+    bars = read_bars(symbol, interval)
+    if bars is None or bars.empty:
+        return None
+
+    today = pd.Timestamp(datetime.date.today())
+    last = bars.index[-1]
+    if offline:
+        today = last.normalize()
+    elif BAR_STORE_MAX_AGE_DAYS is not None and (today - last).days > BAR_STORE_MAX_AGE_DAYS:
+        return None
+
+    start = _period_start(period, today)
+    return bars if start is None else bars[bars.index >= start]
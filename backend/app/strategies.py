@@ -1,14 +1,114 @@
+import numpy as np
+import pandas as pd
 import vectorbt as vbt
 
+# Indicator outputs carry extra column levels (window, etc.) when `close` is a
+# DataFrame, so signals are computed as arrays and re-wrapped onto `close`.
+
+
+def _ma_cross(close, fast=10, slow=30):
+    fast_ma = vbt.MA.run(close, fast).ma.to_numpy()  # type: ignore
+    slow_ma = vbt.MA.run(close, slow).ma.to_numpy()  # type: ignore
+    return fast_ma > slow_ma, fast_ma < slow_ma
+
+
+def _rsi_band(close, window=14, lower=30, upper=55):
+    rsi = vbt.RSI.run(close, window).rsi.to_numpy()  # type: ignore
+    return rsi < lower, rsi > upper
+
+
+def _bollinger(close, window=20, alpha=2):
+    # Buy a close below the lower band, exit once price is back above the mean
+    bb = vbt.BBANDS.run(close, window, alpha=alpha)  # type: ignore
+    price = np.asarray(close, dtype=np.float64)
+    return price < bb.lower.to_numpy(), price > bb.middle.to_numpy()
+
+
+def _macd(close, fast=12, slow=26, signal=9):
+    macd = vbt.MACD.run(close, fast, slow, signal)  # type: ignore
+    line, sig = macd.macd.to_numpy(), macd.signal.to_numpy()
+    return line > sig, line < sig
+
+
+def _breakout(close, window=20):
+    # Donchian breakout on closes: enter above the prior N-bar high, exit below the prior N-bar low
+    frame = pd.DataFrame(close)
+    upper = frame.rolling(window).max().shift(1).to_numpy()
+    lower = frame.rolling(window).min().shift(1).to_numpy()
+    price = frame.to_numpy()
+    if np.ndim(close) == 1:
+        upper, lower, price = upper[:, 0], lower[:, 0], price[:, 0]
+    return price > upper, price < lower
+
+
+# Rule builders: fn(close, **params) -> (entries, exits) boolean arrays shaped like close
+INDICATORS = {
+    "ma_cross": _ma_cross,
+    "rsi_band": _rsi_band,
+    "bollinger": _bollinger,
+    "macd": _macd,
+    "breakout": _breakout,
+}
+
+# Registered strategies: name -> {"indicator": <INDICATORS key>, "params": {...}}
+STRATEGIES = {}
+
+
+def register_strategy(name, indicator, **params):
+    """Declare a strategy as an indicator rule plus its parameters."""
+    if indicator not in INDICATORS:
+        raise ValueError(f"Unknown indicator '{indicator}'. Choose from {list(INDICATORS)}")
+    STRATEGIES[name] = {"indicator": indicator, "params": params}
+
+
+register_strategy("momentum", "ma_cross", fast=10, slow=30)
+register_strategy("mean_reversion", "rsi_band", window=14, lower=30, upper=55)
+register_strategy("bollinger", "bollinger", window=20, alpha=2)
+register_strategy("macd", "macd", fast=12, slow=26, signal=9)
+register_strategy("breakout", "breakout", window=20)
+
+
+def strategy_signals(name, close):
+    """Entries/exits for a registered strategy, wrapped like `close`."""
+    spec = STRATEGIES[name]
+    entries, exits = INDICATORS[spec["indicator"]](close, **spec["params"])
+    return close.vbt.wrapper.wrap(entries), close.vbt.wrapper.wrap(exits)
+
+
+def stacked_signals(close, names):
+    """Evaluate several strategies over a close matrix as one stacked tensor.
+
+    Returns (close, entries, exits) DataFrames whose columns are a
+    (strategy, symbol) MultiIndex, ready for a single simulation.
+    """
+    entries, exits = [], []
+    for name in names:
+        spec = STRATEGIES[name]
+        e, x = INDICATORS[spec["indicator"]](close, **spec["params"])
+        entries.append(e)
+        exits.append(x)
+
+    columns = pd.MultiIndex.from_product([list(names), close.columns], names=["strategy", "symbol"])
+    tiled = np.tile(close.to_numpy(), (1, len(names)))
+    return (
+        pd.DataFrame(tiled, index=close.index, columns=columns),
+        pd.DataFrame(np.hstack(entries), index=close.index, columns=columns),
+        pd.DataFrame(np.hstack(exits), index=close.index, columns=columns),
+    )
+
+
 def momentum_strategy(close):
-    fast = vbt.MA.run(close, 10).ma  # type: ignore
-    slow = vbt.MA.run(close, 30).ma  # type: ignore
-    entries = fast > slow
-    exits = fast < slow
-    return entries, exits
+    return strategy_signals("momentum", close)
 
 def mean_reversion_strategy(close):
-    rsi = vbt.RSI.run(close, 14).rsi  # type: ignore
-    entries = rsi < 30
-    exits = rsi > 55
-    return entries, exits
+    return strategy_signals("mean_reversion", close)
+
+def latest_indicators(close):
+    """Last-bar RSI(14) and MA(10)/MA(30) spread in percent, for screening."""
+    fast = vbt.MA.run(close, 10).ma.to_numpy()  # type: ignore
+    slow = vbt.MA.run(close, 30).ma.to_numpy()  # type: ignore
+    rsi = vbt.RSI.run(close, 14).rsi.to_numpy()  # type: ignore
+    if not len(rsi):
+        return None, None
+    spread = (fast[-1] / slow[-1] - 1) * 100 if slow[-1] else None
+    return rsi[-1], spread
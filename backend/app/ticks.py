@@ -0,0 +1,375 @@
+import collections
+import concurrent.futures
+import csv
+import datetime
+import json
+import os
+import threading
+import time
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from .bars import Bars
+from .store import _period_start
+try:
+    from config import LIVE_BAR_CAPACITY, LIVE_FEED_STALE_SECONDS, LIVE_BACKFILL_WORKERS
+except ImportError:
+    try:
+        from ..config import LIVE_BAR_CAPACITY, LIVE_FEED_STALE_SECONDS, LIVE_BACKFILL_WORKERS
+    except ImportError:
+        from backend.config import LIVE_BAR_CAPACITY, LIVE_FEED_STALE_SECONDS, LIVE_BACKFILL_WORKERS
+
+# One trade/quote update: `ts` in epoch seconds, `volume` the quantity traded
+# since the previous tick of the symbol (not the cumulative day volume).
+Tick = collections.namedtuple("Tick", "symbol ts price volume")
+
+INTERVAL_SECONDS = {"1m": 60, "5m": 300}
+MARKET_TZ = "Asia/Kolkata"
+IST = ZoneInfo(MARKET_TZ)
+
+
+class BarRing:
+    """Fixed-capacity ring of OHLCV bars for one symbol and interval.
+
+    Ticks update the newest bar in place or open the next one, overwriting
+    the oldest once the ring is full, so memory per symbol is constant.
+    Buckets are aligned to the epoch, which for 1m/5m also aligns them to the
+    09:15 IST session open. Ticks for a bar older than the newest are dropped.
+    """
+
+    __slots__ = ("step", "capacity", "start", "open", "high", "low", "close", "volume", "head", "size", "lock")
+
+    def __init__(self, step_seconds, capacity):
+        self.step = int(step_seconds) * 1_000_000_000
+        self.capacity = capacity
+        self.start = np.zeros(capacity, dtype=np.int64)
+        self.open = np.full(capacity, np.nan)
+        self.high = np.full(capacity, np.nan)
+        self.low = np.full(capacity, np.nan)
+        self.close = np.full(capacity, np.nan)
+        self.volume = np.zeros(capacity)
+        self.head = -1
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def _open_bar(self, bucket, o, h, l, c, v):
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        i = self.head
+        self.start[i], self.open[i], self.high[i], self.low[i], self.close[i], self.volume[i] = bucket, o, h, l, c, v
+
+    def update(self, ts_ns, price, qty):
+        bucket = ts_ns - ts_ns % self.step
+        with self.lock:
+            i = self.head
+            if self.size and bucket == self.start[i]:
+                if price > self.high[i]:
+                    self.high[i] = price
+                if price < self.low[i]:
+                    self.low[i] = price
+                self.close[i] = price
+                self.volume[i] += qty
+            elif not self.size or bucket > self.start[i]:
+                self._open_bar(bucket, price, price, price, price, qty)
+
+    def seed(self, bars):
+        """Backfill the ring from historical `Bars`, behind any bars built from ticks.
+
+        Only history older than the oldest existing bar is used (a bar that
+        ticks have started keeps its tick values), and only as much of it as
+        still fits in the ring.
+        """
+        index = bars.index if bars.index.tz is not None else bars.index.tz_localize(MARKET_TZ)
+        stamps = index.as_unit("ns").asi8
+        with self.lock:
+            order = self._order()
+            first = self.start[order[0]] if self.size else None
+            rows = []
+            for k in range(len(stamps)):
+                bucket = stamps[k] - stamps[k] % self.step
+                if first is not None and bucket >= first:
+                    break
+                if rows and bucket <= rows[-1][0]:
+                    continue
+                volume = bars.volume[k]
+                rows.append((bucket, bars.open[k], bars.high[k], bars.low[k], bars.close[k],
+                             0.0 if np.isnan(volume) else volume))
+            room = self.capacity - self.size
+            if not rows or not room:
+                return
+            fields = (self.start, self.open, self.high, self.low, self.close, self.volume)
+            live = list(zip(*(field[order].tolist() for field in fields)))
+            self.head, self.size = -1, 0
+            for row in rows[-room:] + live:
+                self._open_bar(*row)
+
+    def _order(self):
+        # Slot indices oldest -> newest
+        return (np.arange(self.head - self.size + 1, self.head + 1)) % self.capacity
+
+    def to_bars(self, symbol=None):
+        with self.lock:
+            if not self.size:
+                return Bars.no_data(symbol)
+            order = self._order()
+            index = pd.DatetimeIndex(self.start[order], tz="UTC").tz_convert(MARKET_TZ)
+            return Bars(
+                index,
+                self.open[order], self.high[order], self.low[order], self.close[order], self.volume[order],
+                symbol=symbol,
+            )
+
+
+class LiveFeed:
+    """Aggregates ticks from a `TickSource` into in-memory 1m/5m bars per symbol.
+
+    The source runs on its own thread. `bars()` answers from memory while
+    the feed is active (ticks arrived within `stale_after` seconds), and
+    returns None otherwise so callers fall back to the network providers.
+    """
+
+    def __init__(self, capacity=LIVE_BAR_CAPACITY, stale_after=LIVE_FEED_STALE_SECONDS):
+        self.capacity = dict(capacity)
+        self.stale_after = stale_after
+        self._rings = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._source = None
+        self._last_tick = None
+        self._ticks = 0
+
+    def _ring(self, symbol, interval):
+        ring = self._rings.get((symbol, interval))
+        if ring is None:
+            with self._lock:
+                ring = self._rings.setdefault(
+                    (symbol, interval), BarRing(INTERVAL_SECONDS[interval], self.capacity[interval]),
+                )
+        return ring
+
+    def on_tick(self, tick):
+        ts_ns = int(tick.ts * 1_000_000_000)
+        for interval in self.capacity:
+            self._ring(tick.symbol, interval).update(ts_ns, float(tick.price), float(tick.volume or 0.0))
+        self._last_tick = time.monotonic()
+        self._ticks += 1
+
+    @property
+    def active(self):
+        return (
+            self._thread is not None and self._thread.is_alive()
+            and self._last_tick is not None
+            and time.monotonic() - self._last_tick <= self.stale_after
+        )
+
+    def bars(self, symbol, interval="5m", period=None):
+        """In-memory bars for `symbol`, or None when the feed can't answer."""
+        if interval not in self.capacity or not self.active:
+            return None
+        ring = self._rings.get((symbol, interval))
+        if ring is None:
+            return None
+        bars = ring.to_bars(symbol)
+        if bars.empty or period is None:
+            return bars
+        # Same convention as the providers: "1d" is today's session, "5d" the last 5 days
+        last_day = bars.index[-1].normalize()
+        start = _period_start(period, last_day + pd.Timedelta(days=1))
+        if start is None:
+            return bars
+        if start.tzinfo is None:
+            start = start.tz_localize(MARKET_TZ)  # "ytd" gives a naive Jan 1
+        keep = int(bars.index.searchsorted(start))
+        return Bars(bars.index[keep:], bars.open[keep:], bars.high[keep:], bars.low[keep:],
+                    bars.close[keep:], bars.volume[keep:], symbol=symbol)
+
+    def start(self, source, backfill=None):
+        """Run `source` on a daemon thread.
+
+        - backfill: optional fn(symbol, period, interval) -> DataFrame used once
+          per subscribed symbol to preload recent bars, so indicators have
+          history. It runs on its own thread pool while ticks already flow,
+          so no ticks are missed during the downloads (see `BarRing.seed`).
+        """
+        if self._thread is not None and self._thread.is_alive():
+            raise RuntimeError("Live feed already running")
+        self._stop.clear()
+        self._source = source
+
+        def run():
+            try:
+                source.run(self.on_tick, self._stop)
+            except Exception as e:
+                print(f"Live feed source stopped: {e}")
+
+        self._thread = threading.Thread(target=run, name="live-feed", daemon=True)
+        self._thread.start()
+        if backfill is not None:
+            threading.Thread(
+                target=self._backfill, args=(source.symbols, backfill), name="live-feed-backfill", daemon=True,
+            ).start()
+
+    def _backfill(self, symbols, backfill, workers=LIVE_BACKFILL_WORKERS):
+        def seed(symbol, interval):
+            if self._stop.is_set():
+                return
+            try:
+                frame = backfill(symbol, period="5d", interval=interval)
+                self._ring(symbol, interval).seed(Bars.from_frame(frame, symbol=symbol))
+            except Exception as e:
+                print(f"Live feed backfill failed for {symbol} {interval}: {e}")
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="live-backfill") as pool:
+            for symbol in symbols:
+                for interval in self.capacity:
+                    pool.submit(seed, symbol, interval)
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self):
+        return {
+            "source": type(self._source).__name__ if self._source is not None else None,
+            "active": self.active,
+            "symbols": len({symbol for symbol, _ in list(self._rings)}),
+            "ticks": self._ticks,
+            "seconds_since_last_tick": (
+                time.monotonic() - self._last_tick if self._last_tick is not None else None
+            ),
+            "intervals": list(self.capacity),
+        }
+
+
+# --- Tick sources ---
+
+class TickSource:
+    """Produces ticks. `run(emit, stop)` blocks, calling `emit(Tick)` until `stop` is set."""
+
+    symbols = ()
+
+    def run(self, emit, stop):
+        raise NotImplementedError
+
+
+def _to_epoch(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime.datetime):
+        ts = pd.Timestamp(value)
+    else:
+        text = str(value).strip()
+        try:
+            return float(text)
+        except ValueError:
+            ts = pd.Timestamp(text)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize(MARKET_TZ)
+    return ts.timestamp()
+
+
+class ReplayTickSource(TickSource):
+    """Replays a recorded tick file: CSV or JSONL with symbol, ts, price, volume.
+
+    `ts` is epoch seconds or an ISO timestamp (naive = IST). With `speed=0`
+    ticks are emitted as fast as possible; otherwise the recorded gaps are
+    replayed `speed` times faster than real time.
+    """
+
+    def __init__(self, path, speed=0.0):
+        self.path = path
+        self.speed = speed
+        self.symbols = ()
+
+    def _records(self):
+        with open(self.path, newline="") as f:
+            if self.path.lower().endswith((".jsonl", ".json")):
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+            else:
+                yield from csv.DictReader(f)
+
+    def run(self, emit, stop):
+        previous = None
+        for record in self._records():
+            if stop.is_set():
+                return
+            tick = Tick(
+                record["symbol"].strip(),
+                _to_epoch(record["ts"]),
+                float(record["price"]),
+                float(record.get("volume") or 0.0),
+            )
+            if self.speed and previous is not None and tick.ts > previous:
+                stop.wait((tick.ts - previous) / self.speed)
+            previous = tick.ts
+            emit(tick)
+        # Keep the feed "running" after the file ends; staleness still applies
+        stop.wait()
+
+
+class KiteTickerSource(TickSource):
+    """Zerodha Kite WebSocket ticks (full mode) for `symbols` ("TCS.NS" style)."""
+
+    def __init__(self, symbols, api_key=None, access_token=None):
+        self.symbols = tuple(symbols)
+        self.api_key = api_key or os.getenv("KITE_API_KEY")
+        self.access_token = access_token or os.getenv("KITE_ACCESS_TOKEN")
+
+    def run(self, emit, stop):
+        from kiteconnect import KiteConnect, KiteTicker
+
+        kite = KiteConnect(api_key=self.api_key)
+        kite.set_access_token(self.access_token)
+        tokens = {i["tradingsymbol"]: i["instrument_token"] for i in kite.instruments("NSE")}
+        by_token = {tokens[s.replace(".NS", "")]: s for s in self.symbols if s.replace(".NS", "") in tokens}
+        last_volume = {}
+
+        def on_ticks(ws, ticks):
+            for t in ticks:
+                symbol = by_token.get(t.get("instrument_token"))
+                if symbol is None or t.get("last_price") is None:
+                    continue
+                # Kite reports cumulative day volume; convert to per-tick quantity
+                cumulative = t.get("volume_traded")
+                prev = last_volume.get(symbol)
+                if cumulative is None or prev is None:
+                    qty = 0.0
+                elif cumulative >= prev:
+                    qty = float(cumulative - prev)
+                else:
+                    qty = float(cumulative)  # counter reset: new session
+                if cumulative is not None:
+                    last_volume[symbol] = cumulative
+                ts = t.get("exchange_timestamp") or t.get("last_trade_time") or datetime.datetime.now(IST)
+                emit(Tick(symbol, _to_epoch(ts), float(t["last_price"]), qty))
+
+        def on_connect(ws, response):
+            ws.subscribe(list(by_token))
+            ws.set_mode(ws.MODE_FULL, list(by_token))
+
+        kws = KiteTicker(self.api_key, self.access_token)
+        kws.on_ticks = on_ticks
+        kws.on_connect = on_connect
+        kws.connect(threaded=True)
+        stop.wait()
+        kws.close()
+
+
+def source_from_config(spec, symbols):
+    """Build a source from LIVE_FEED_SOURCE: "kite" or "replay:<path>[@speed]"."""
+    if spec == "kite":
+        return KiteTickerSource(symbols)
+    if spec.startswith("replay:"):
+        path, _, speed = spec[len("replay:"):].partition("@")
+        source = ReplayTickSource(path, speed=float(speed) if speed else 0.0)
+        source.symbols = tuple(symbols)
+        return source
+    raise ValueError(f"Unknown LIVE_FEED_SOURCE '{spec}'")
+
+
+# Process-wide feed; fetch_data/fetch_bars consult it for intraday intervals
+LIVE_FEED = LiveFeed()
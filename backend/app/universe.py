@@ -0,0 +1,256 @@
+import bisect
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+try:
+    from config import INDEX_FILE, INDEX_RELOAD_SECONDS
+except ImportError:
+    try:
+        from ..config import INDEX_FILE, INDEX_RELOAD_SECONDS
+    except ImportError:
+        from backend.config import INDEX_FILE, INDEX_RELOAD_SECONDS
+
+# Effective dates are kept as int64 nanoseconds; these bound open intervals
+_MIN = np.iinfo(np.int64).min
+_MAX = np.iinfo(np.int64).max
+
+
+def _ns(value):
+    if value is None:
+        return None
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert(None)
+    return int(ts.normalize().value)
+
+
+def parse_as_of(value):
+    """`as_of` query value ("2023-06-30") -> ns timestamp, None for today; ValueError if invalid."""
+    if value in (None, ""):
+        return None
+    try:
+        return _ns(value)
+    except (ValueError, TypeError, OverflowError):
+        raise ValueError(f"Invalid as_of date '{value}' (expected YYYY-MM-DD)")
+
+
+class IndexUniverse:
+    """Index definitions with point-in-time membership.
+
+    Every symbol gets a bit position. For each index, the dates where its
+    membership changes split time into epochs, and each epoch stores the
+    members as an int bitmap plus the decoded symbol tuple, all computed at
+    load. Bit positions are global, so decoding walks each index's symbols in
+    file order rather than bit order. So `members(name, as_of)` is a bisect over that index's change dates,
+    a symbol/index membership test is a shift-and-mask, and unions and
+    intersections across indexes are single OR/AND operations.
+    Instances are immutable; reloading builds a new one.
+    """
+
+    def __init__(self, definitions, path=None, mtime=None):
+        self.path = path
+        self.mtime = mtime
+        self.symbols = []
+        self._ids = {}
+        self._names = []
+        self._lookup = {}
+        self._benchmarks = {}
+        self._starts = {}
+        self._bitmaps = {}
+        self._order = {}
+        self._members = {}
+
+        for name, spec in definitions.items():
+            if not isinstance(spec, dict) or not isinstance(spec.get("members"), list):
+                raise ValueError(f"Index '{name}' needs a 'members' list")
+            intervals = []
+            for member in spec["members"]:
+                if isinstance(member, str):
+                    symbol, start, end = member, None, None
+                else:
+                    symbol, start, end = member["symbol"], member.get("from"), member.get("to")
+                start, end = _ns(start), _ns(end)
+                if start is not None and end is not None and end <= start:
+                    raise ValueError(f"Index '{name}': '{symbol}' has 'to' before 'from'")
+                intervals.append((self._id(symbol.strip()), _MIN if start is None else start, _MAX if end is None else end))
+            self._add_index(name, spec, intervals)
+
+    def _id(self, symbol):
+        if symbol not in self._ids:
+            self._ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return self._ids[symbol]
+
+    def _add_index(self, name, spec, intervals):
+        for key in [name, *spec.get("aliases", [])]:
+            if key.lower() in self._lookup:
+                raise ValueError(f"Index name or alias '{key}' is defined twice")
+            self._lookup[key.lower()] = name
+        self._names.append(name)
+        if spec.get("benchmark"):
+            self._benchmarks[name] = spec["benchmark"]
+
+        self._order[name] = list(dict.fromkeys(sid for sid, _, _ in intervals))
+        starts = sorted({_MIN} | {s for _, s, _ in intervals} | {e for _, _, e in intervals if e != _MAX})
+        bitmaps, members = [], []
+        for t in starts:
+            bitmap = 0
+            for sid, s, e in intervals:
+                if s <= t < e:
+                    bitmap |= 1 << sid
+            bitmaps.append(bitmap)
+            members.append(self._decode(bitmap, [name]))
+        self._starts[name] = starts
+        self._bitmaps[name] = bitmaps
+        self._members[name] = members
+
+    def _decode(self, bitmap, names):
+        # Set symbols in the order the indexes list them, first index first
+        order = dict.fromkeys(sid for name in names for sid in self._order[name])
+        return tuple(self.symbols[sid] for sid in order if bitmap >> sid & 1)
+
+    def _epoch(self, name, as_of):
+        t = _ns(pd.Timestamp.now()) if as_of is None else as_of
+        return bisect.bisect_right(self._starts[name], t) - 1
+
+    # Names
+
+    def names(self):
+        return list(self._names)
+
+    def default(self):
+        return self._names[0] if self._names else None
+
+    def resolve(self, name):
+        """Canonical index name for a name or alias (case-insensitive), or None."""
+        return self._lookup.get(name.lower()) if name else None
+
+    def benchmark(self, name):
+        return self._benchmarks.get(name)
+
+    # Membership (`name` must be canonical, `as_of` from parse_as_of)
+
+    def bitmap(self, name, as_of=None):
+        return self._bitmaps[name][self._epoch(name, as_of)]
+
+    def members(self, name, as_of=None):
+        return self._members[name][self._epoch(name, as_of)]
+
+    def is_member(self, symbol, name, as_of=None):
+        sid = self._ids.get(symbol)
+        return sid is not None and bool(self.bitmap(name, as_of) >> sid & 1)
+
+    def union(self, names, as_of=None):
+        names = list(names)
+        bitmap = 0
+        for name in names:
+            bitmap |= self.bitmap(name, as_of)
+        return self._decode(bitmap, names)
+
+    def intersection(self, names, as_of=None):
+        names = list(names)
+        if not names:
+            return ()
+        bitmap = self.bitmap(names[0], as_of)
+        for name in names[1:]:
+            bitmap &= self.bitmap(name, as_of)
+        return self._decode(bitmap, names[:1])
+
+    def indexes_of(self, symbol, as_of=None):
+        sid = self._ids.get(symbol)
+        if sid is None:
+            return []
+        return [name for name in self._names if self.bitmap(name, as_of) >> sid & 1]
+
+    def members_between(self, name, start=None, end=None):
+        """Everyone who was a member at any time in [start, end] (start None = ever, end None = today)."""
+        first = 0 if start is None else max(self._epoch(name, start), 0)
+        last = self._epoch(name, end)
+        bitmap = 0
+        for b in self._bitmaps[name][first:last + 1]:
+            bitmap |= b
+        return self._decode(bitmap, [name])
+
+    def membership_mask(self, name, dates, symbols):
+        """(len(dates), len(symbols)) bool array: was symbol j in the index on dates[i]?"""
+        index = pd.DatetimeIndex(dates)
+        if index.tz is not None:
+            index = index.tz_convert(None)
+        stamps = index.normalize().as_unit("ns").asi8
+        epochs = np.searchsorted(np.asarray(self._starts[name], dtype=np.int64), stamps, side="right") - 1
+        ids = [self._ids.get(s) for s in symbols]
+        table = np.array(
+            [[sid is not None and bool(b >> sid & 1) for sid in ids] for b in self._bitmaps[name]],
+            dtype=bool,
+        ).reshape(len(self._bitmaps[name]), len(ids))
+        return table[np.maximum(epochs, 0)]
+
+    def to_dict(self, as_of=None):
+        return {name: list(self.members(name, as_of)) for name in self._names}
+
+
+def load_universe(path=INDEX_FILE):
+    """Parse an index file; raises ValueError (or OSError) when it is unusable."""
+    mtime = os.path.getmtime(path)
+    with open(path) as f:
+        try:
+            data = json.load(f)
+        except ValueError as e:
+            raise ValueError(f"{path}: invalid JSON ({e})")
+    definitions = data.get("indexes") if isinstance(data, dict) else None
+    if not isinstance(definitions, dict):
+        raise ValueError(f"{path}: expected an object with an 'indexes' mapping")
+    return IndexUniverse(definitions, path=path, mtime=mtime)
+
+
+_LOCK = threading.Lock()
+_CURRENT = None
+_CHECKED = 0.0
+# mtime of an index file that failed to load, so it is reported once, not on every check
+_FAILED_MTIME = None
+
+
+def reload_universe(path=INDEX_FILE):
+    """Load `path` now and make it current; the previous universe stays on error."""
+    global _CURRENT, _CHECKED
+    universe = load_universe(path)
+    with _LOCK:
+        _CURRENT = universe
+        _CHECKED = time.monotonic()
+    print(f"Loaded {len(universe.names())} indexes from {path}: {universe.names()}")
+    return universe
+
+
+def get_universe():
+    """The current index universe, reloaded when INDEX_FILE has changed.
+
+    The file's mtime is checked at most every INDEX_RELOAD_SECONDS; callers
+    always get a complete, immutable universe (a failed reload keeps the old one).
+    """
+    global _CHECKED, _FAILED_MTIME
+    universe = _CURRENT
+    now = time.monotonic()
+    if universe is not None and now - _CHECKED < INDEX_RELOAD_SECONDS:
+        return universe
+    _CHECKED = now
+    mtime = None
+    try:
+        mtime = os.path.getmtime(INDEX_FILE)
+        if universe is None or (mtime != universe.mtime and mtime != _FAILED_MTIME):
+            return reload_universe(INDEX_FILE)
+    except (OSError, ValueError) as e:
+        if universe is None:
+            raise
+        _FAILED_MTIME = mtime
+        print(f"Index file not reloaded, keeping the previous indexes: {e}")
+    return universe
+
+
+def default_symbols():
+    """Current members of the first index in the file (the default universe)."""
+    universe = get_universe()
+    return list(universe.members(universe.default())) if universe.default() else []
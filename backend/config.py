@@ -1,97 +1,176 @@
+import os
+
+# Index definitions live in INDEX_FILE (JSON), loaded by app/universe.py and
+# reloaded automatically when the file changes (checked at most every
+# INDEX_RELOAD_SECONDS). Each index has its members, optional aliases (e.g.
+# "NSE 50" for "NIFTY 50") and an optional benchmark ticker used for beta.
+# Members are plain symbols, or {"symbol", "from", "to"} with effective dates
+# (`to` exclusive) so scans and backtests as of a past date see the
+# constituents of that date rather than today's survivors.
+#
 # NOTE: The '.NS' suffix is required for Yahoo Finance to identify NSE stocks.
-# If you switch to a direct NSE data provider (like nselib), you may need to 
-# remove these suffixes or update this list to just ["ADANIENT", "ADANIPORTS", ...]
+# If you switch to a direct NSE data provider (like nselib), you may need to
+# remove these suffixes or update the symbols to just ["ADANIENT", "ADANIPORTS", ...]
 # For Zerodha Kite (USE_ZERODHA=true), the code automatically strips '.NS'.
+INDEX_FILE = os.getenv("INDEX_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "indexes.json"))
+INDEX_RELOAD_SECONDS = 5
+
+# Transaction cost models for NSE cash equity, applied inside the vectorbt
+# simulations. Percentages are of traded value; `brokerage_flat` is INR per order.
+# Select with `costs=<name>` on the API; "none" disables costs.
+COST_MODELS = {
+    "none": {},
+    "delivery": {
+        "brokerage_pct": 0.0,
+        "brokerage_flat": 0.0,
+        "stt_buy_pct": 0.1,
+        "stt_sell_pct": 0.1,
+        "exchange_pct": 0.00297,
+        "sebi_pct": 0.0001,
+        "gst_pct": 18.0,
+        "stamp_buy_pct": 0.015,
+        "slippage_bps": 5.0,
+    },
+    "intraday": {
+        "brokerage_pct": 0.03,
+        "brokerage_flat": 0.0,
+        "stt_buy_pct": 0.0,
+        "stt_sell_pct": 0.025,
+        "exchange_pct": 0.00297,
+        "sebi_pct": 0.0001,
+        "gst_pct": 18.0,
+        "stamp_buy_pct": 0.003,
+        "slippage_bps": 5.0,
+    },
+}
+
+# Cost model used when a request doesn't pick one: daily scans are delivery
+# trades, live (5m) scans are intraday.
+DEFAULT_COST_MODEL = "delivery"
+DEFAULT_LIVE_COST_MODEL = "intraday"
+
+# Background scan result cache (/api/scan-start, /api/scan-results): at most
+# this many index/param entries, each kept for at most this many seconds once
+# its scan has finished.
+SCAN_CACHE_MAX_ENTRIES = 64
+SCAN_CACHE_TTL_SECONDS = 6 * 60 * 60
+
+# Background job manager: total worker threads shared by all scans/jobs (a
+# request's `max_workers` is capped by this), per-symbol task timeout, and how
+# many finished jobs to remember for /api/jobs.
+MAX_SCAN_WORKERS = 8
+SYMBOL_TIMEOUT_SECONDS = 60
+JOB_HISTORY = 100
+
+# Market data fetch resilience: per-call timeout, retries with exponential
+# backoff (base delay doubles each attempt), per-provider circuit breaker, and
+# how long a symbol that returned no data is skipped.
+FETCH_TIMEOUT_SECONDS = 10
+FETCH_RETRIES = 2
+FETCH_BACKOFF_SECONDS = 0.5
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_SECONDS = 30
+NEGATIVE_CACHE_TTL_SECONDS = 300
+
+# Local Parquet bar store populated by `python -m app.bhavcopy` and read by
+# fetch_data before going to the network. Daily bars older than
+# BAR_STORE_MAX_AGE_DAYS at their last row are treated as stale (None = never).
+BAR_STORE_DIR = os.getenv("BAR_STORE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "bars"))
+BAR_STORE_MAX_AGE_DAYS = 5
 
-NSE_SYMBOLS = [
-    "ADANIENT.NS",
-    "ADANIPORTS.NS",
-    "AMBUJACEM.NS",
-    "ASIANPAINT.NS",
-    "AUROPHARMA.NS",
-    "AXISBANK.NS",
-    "BAJAJ-AUTO.NS",
-    "BAJFINANCE.NS",
-    "BAJAJFINSV.NS",
-    "BHARTIARTL.NS",
-    "BPCL.NS",
-    "BRITANNIA.NS",
-    "CIPLA.NS",
-    "COALINDIA.NS",
-    "DIVISLAB.NS",
-    "DRREDDY.NS",
-    "EICHERMOT.NS",
-    "GRASIM.NS",
-    "HCLTECH.NS",
-    "HDFCBANK.NS",
-    "HDFCLIFE.NS",
-    "HEROMOTOCO.NS",
-    "HINDALCO.NS",
-    "HINDUNILVR.NS",
-    "HINDPETRO.NS",
-    "HINDZINC.NS",
-    "ICICIBANK.NS",
-    "INDUSINDBK.NS",
-    "INFY.NS",
-    "JSWSTEEL.NS",
-    "KOTAKBANK.NS",
-    "LT.NS",
-    "M&M.NS",
-    "MARUTI.NS",
-    "NESTLEIND.NS",
-    "NTPC.NS",
-    "ONGC.NS",
-    "POWERGRID.NS",
-    "RELIANCE.NS",
-    "SBIN.NS",
-    "SUNPHARMA.NS",
-    "TATACHEM.NS",
-    "TATACONSUM.NS",
-    "TATASTEEL.NS",
-    "TECHM.NS",
-    "TCS.NS",
-    "ULTRACEMCO.NS",
-    "WIPRO.NS",
-]
+# Upper bound on bootstrap resamples per symbol for /api/analyze?robustness=1
+MAX_BOOTSTRAP_SAMPLES = 10000
 
-# Mapping of human-friendly index names to symbol lists. Add more indexes here as needed.
-NIFTY_BANK = [
-    "HDFCBANK.NS",
-    "ICICIBANK.NS",
-    "AXISBANK.NS",
-    "KOTAKBANK.NS",
-    "SBIN.NS",
-    "INDUSINDBK.NS",
-]
+# Risk matrix (/api/risk): the sector of each symbol for sector aggregation.
+# Beta is measured against the index's benchmark from INDEX_FILE (indexes
+# without one, or whose benchmark fetch fails, use the equal-weight average of
+# their constituents).
+SECTORS = {
+    "ADANIENT.NS": "Metals & Mining",
+    "ADANIPORTS.NS": "Services",
+    "AMBUJACEM.NS": "Construction Materials",
+    "ASIANPAINT.NS": "Consumer Durables",
+    "AUROPHARMA.NS": "Healthcare",
+    "AXISBANK.NS": "Financial Services",
+    "BAJAJ-AUTO.NS": "Automobile",
+    "BAJFINANCE.NS": "Financial Services",
+    "BAJAJFINSV.NS": "Financial Services",
+    "BHARTIARTL.NS": "Telecommunication",
+    "BPCL.NS": "Oil & Gas",
+    "BRITANNIA.NS": "FMCG",
+    "CIPLA.NS": "Healthcare",
+    "COALINDIA.NS": "Oil & Gas",
+    "DIVISLAB.NS": "Healthcare",
+    "DRREDDY.NS": "Healthcare",
+    "EICHERMOT.NS": "Automobile",
+    "GRASIM.NS": "Construction Materials",
+    "HCLTECH.NS": "IT",
+    "HDFCBANK.NS": "Financial Services",
+    "HDFCLIFE.NS": "Financial Services",
+    "HEROMOTOCO.NS": "Automobile",
+    "HINDALCO.NS": "Metals & Mining",
+    "HINDUNILVR.NS": "FMCG",
+    "HINDPETRO.NS": "Oil & Gas",
+    "HINDZINC.NS": "Metals & Mining",
+    "ICICIBANK.NS": "Financial Services",
+    "INDUSINDBK.NS": "Financial Services",
+    "INFY.NS": "IT",
+    "JSWSTEEL.NS": "Metals & Mining",
+    "KOTAKBANK.NS": "Financial Services",
+    "LT.NS": "Construction",
+    "M&M.NS": "Automobile",
+    "MARUTI.NS": "Automobile",
+    "NESTLEIND.NS": "FMCG",
+    "NTPC.NS": "Power",
+    "ONGC.NS": "Oil & Gas",
+    "POWERGRID.NS": "Power",
+    "RELIANCE.NS": "Oil & Gas",
+    "SBIN.NS": "Financial Services",
+    "SUNPHARMA.NS": "Healthcare",
+    "TATACHEM.NS": "Chemicals",
+    "TATACONSUM.NS": "FMCG",
+    "TATASTEEL.NS": "Metals & Mining",
+    "TECHM.NS": "IT",
+    "TCS.NS": "IT",
+    "ULTRACEMCO.NS": "Construction Materials",
+    "WIPRO.NS": "IT",
+}
 
-NIFTY_IT = [
-    "TCS.NS",
-    "INFY.NS",
-    "WIPRO.NS",
-    "HCLTECH.NS",
-    "TECHM.NS",
-]
+# Rolling window (bars) used when /api/risk is called without `window`, the
+# accepted range, and how many (index, window, interval) models are kept.
+RISK_WINDOW = 60
+RISK_MAX_WINDOW = 500
+RISK_CACHE_MAX_ENTRIES = 32
 
-NIFTY_AUTO = [
-    "MARUTI.NS",
-    "BAJAJ-AUTO.NS",
-    "M&M.NS",
-    "EICHERMOT.NS",
-    "HEROMOTOCO.NS",
-]
+# Alert rules (/api/alert-rules): how often rules are re-evaluated against newly
+# arrived bars, how many fired alerts are kept for /api/alerts, and an optional
+# webhook every alert is POSTed to. Rules can set their own webhook only if it
+# starts with one of the comma-separated ALERT_WEBHOOK_ALLOWLIST prefixes
+# (e.g. "https://hooks.slack.com/services/"); with no allowlist they can't.
+ALERT_POLL_SECONDS = 60
+ALERT_HISTORY = 500
+ALERT_WEBHOOK_URL = os.getenv("ALERT_WEBHOOK_URL")
+ALERT_WEBHOOK_ALLOWLIST = [u.strip() for u in os.getenv("ALERT_WEBHOOK_ALLOWLIST", "").split(",") if u.strip()]
+ALERT_WEBHOOK_TIMEOUT_SECONDS = 5
 
-NIFTY_FMCG = [
-    "HINDUNILVR.NS",
-    "BRITANNIA.NS",
-    "NESTLEIND.NS",
-    "TATACONSUM.NS",
-]
+# On-demand profiling: with PROFILING_ENABLED=true any API request can add
+# `profile=1` to be run under cProfile (including the job threads it starts).
+# Profiles are written to PROFILE_DIR as <id>.pstats plus a JSON summary of the
+# dominant vectorbt/pandas/numpy calls; only the newest PROFILE_KEEP are kept.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED") == "true"
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "profiles"))
+PROFILE_KEEP = 50
+PROFILE_TOP_N = 20
 
-INDEXES = {
-    "NSE 50": NSE_SYMBOLS,
-    "NIFTY 50": NSE_SYMBOLS,
-    "NIFTY BANK": NIFTY_BANK,
-    "NIFTY IT": NIFTY_IT,
-    "NIFTY AUTO": NIFTY_AUTO,
-    "NIFTY FMCG": NIFTY_FMCG,
-}
\ No newline at end of file
+# Live tick feed: when set, ticks are aggregated in memory into 1m/5m bars and
+# live (5m) scans read those instead of downloading the day's bars per refresh.
+#   LIVE_FEED_SOURCE=kite               Kite WebSocket (KITE_API_KEY, KITE_ACCESS_TOKEN)
+#   LIVE_FEED_SOURCE=replay:ticks.csv   replay a recorded tick file (tests, demos)
+# Ring buffers keep LIVE_BAR_CAPACITY bars per symbol and interval; the feed
+# counts as down when no tick arrived for LIVE_FEED_STALE_SECONDS, and scans
+# then fall back to the network providers. Recent history is backfilled with
+# LIVE_BACKFILL_WORKERS parallel downloads while the ticks are already flowing.
+LIVE_FEED_SOURCE = os.getenv("LIVE_FEED_SOURCE")
+LIVE_BAR_CAPACITY = {"1m": 1500, "5m": 750}
+LIVE_FEED_STALE_SECONDS = 120
+LIVE_BACKFILL_WORKERS = 8
@@ -1,469 +1,196 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi import Query
 from typing import Optional
 try:
-    from .app.scanner import scan_market, scan_analysis
+    from .app.scanner import (
+        scan_market, scan_analysis, scan_portfolio, scan_strategies,
+        iter_scan_market, iter_scan_analysis, scan_symbol, analyze_symbol,
+    )
 except ImportError:
-    from app.scanner import scan_market, scan_analysis
+    from app.scanner import (
+        scan_market, scan_analysis, scan_portfolio, scan_strategies,
+        iter_scan_market, iter_scan_analysis, scan_symbol, analyze_symbol,
+    )
 try:
-    from .config import INDEXES
+    from .app.screener import update_screener, screen
 except ImportError:
-    from config import INDEXES
+    from app.screener import update_screener, screen
+try:
+    from .app.render import render_home, scan_page, stream_scan_table, stream_analyze_table
+except ImportError:
+    from app.render import render_home, scan_page, stream_scan_table, stream_analyze_table
+try:
+    from .app.responses import FastJSONResponse, json_response, dumps
+except ImportError:
+    from app.responses import FastJSONResponse, json_response, dumps
+try:
+    from .app.cache import ShardedCache
+except ImportError:
+    from app.cache import ShardedCache
+try:
+    from .app.data import provider_status, fetch_data
+except ImportError:
+    from app.data import provider_status, fetch_data
+try:
+    from .app.ticks import LIVE_FEED, source_from_config
+except ImportError:
+    from app.ticks import LIVE_FEED, source_from_config
+try:
+    from .app.costs import cost_model_name, resolve_costs
+except ImportError:
+    from app.costs import cost_model_name, resolve_costs
+try:
+    from .app.jobs import JOB_MANAGER, BULK, run_interactive
+except ImportError:
+    from app.jobs import JOB_MANAGER, BULK, run_interactive
+try:
+    from .app.alerts import ALERT_ENGINE, resolve_symbols
+except ImportError:
+    from app.alerts import ALERT_ENGINE, resolve_symbols
+try:
+    from .app.profiling import ProfiledRoute, request_session, profiled_stream, list_profiles, profile_path
+except ImportError:
+    from app.profiling import ProfiledRoute, request_session, profiled_stream, list_profiles, profile_path
+try:
+    from .app.risk import risk_matrix
+except ImportError:
+    from app.risk import risk_matrix
+try:
+    from .app.strategies import STRATEGIES
+except ImportError:
+    from app.strategies import STRATEGIES
+try:
+    from .app.universe import get_universe, parse_as_of, reload_universe
+except ImportError:
+    from app.universe import get_universe, parse_as_of, reload_universe
+try:
+    from .config import COST_MODELS, SCAN_CACHE_MAX_ENTRIES, SCAN_CACHE_TTL_SECONDS, SYMBOL_TIMEOUT_SECONDS, MAX_BOOTSTRAP_SAMPLES, RISK_WINDOW, RISK_MAX_WINDOW, PROFILING_ENABLED, LIVE_FEED_SOURCE
+except ImportError:
+    from config import COST_MODELS, SCAN_CACHE_MAX_ENTRIES, SCAN_CACHE_TTL_SECONDS, SYMBOL_TIMEOUT_SECONDS, MAX_BOOTSTRAP_SAMPLES, RISK_WINDOW, RISK_MAX_WINDOW, PROFILING_ENABLED, LIVE_FEED_SOURCE
 import json
 
+import bisect
+import contextlib
 import asyncio
-import concurrent.futures
-import threading
+import itertools
 from datetime import datetime, timezone
 
-# Simple in-memory cache/manager for scan results and status
-SCAN_CACHE = {}
-CACHE_LOCK = threading.Lock()
-
-# Validate INDEXES on startup
-if not INDEXES:
-    print("WARNING: INDEXES is empty or not loaded correctly from config.py")
-else:
-    print(f"Loaded {len(INDEXES)} indexes: {list(INDEXES.keys())}")
+# In-memory cache of background scan progress/results, keyed by (index name,
+# as_of) so a scan of past constituents never replaces today's (see _scan_key).
+# Entries are immutable snapshots replaced on each update (see ShardedCache);
+# running scans are never evicted.
+SCAN_CACHE = ShardedCache(
+    max_entries=SCAN_CACHE_MAX_ENTRIES,
+    ttl=SCAN_CACHE_TTL_SECONDS,
+    can_evict=lambda entry: not entry.get('running'),
+)
+# Monotonic sequence numbers for result updates, shared by all scans so a
+# client's `since` is never reused after a scan restarts. next() on a count is
+# atomic under the GIL.
+_RESULT_SEQ = itertools.count(1)
+
+# Load the index universe on startup (INDEX_FILE); it reloads itself when the file changes
+try:
+    if not get_universe().names():
+        print("WARNING: no indexes defined in the index file")
+except (OSError, ValueError) as e:
+    print(f"WARNING: index file could not be loaded: {e}")
 
-app = FastAPI()
 
+def _resolve_index(index, as_of=None):
+    """(canonical name, member symbols) for an index name or alias, default index if None.
 
-@app.get("/", response_class=HTMLResponse)
-def home(request: Request):
-    html_content = """
-    <html>
-    <head>
-        <title>NSE Quant Tool API</title>
-        <style>
-            body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; margin: 0; padding: 20px; background-color: #f4f4f9; }
-            .container { max-width: 900px; margin: 0 auto; background: white; padding: 30px; border-radius: 8px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
-            h1 { color: #2c3e50; border-bottom: 2px solid #eee; padding-bottom: 15px; margin-top: 0; }
-            ul { list-style: none; padding: 0; }
-            li { background: #fff; border-bottom: 1px solid #f0f0f0; padding: 15px 0; }
-            li:last-child { border-bottom: none; }
-            a { font-weight: 600; color: #3498db; text-decoration: none; font-size: 1.1em; }
-            a:hover { color: #2980b9; text-decoration: underline; }
-            .meta { font-size: 0.85em; color: #95a5a6; margin-bottom: 5px; text-transform: uppercase; letter-spacing: 0.5px; }
-            .desc { color: #555; margin-top: 5px; line-height: 1.5; }
-            .header-links { margin-bottom: 20px; color: #666; }
-            .header-links a { font-size: 1em; color: #2c3e50; text-decoration: underline; }
-            .search-box { margin-bottom: 20px; }
-            .search-box input { width: 100%; padding: 10px; font-size: 16px; border: 1px solid #ddd; border-radius: 4px; box-sizing: border-box; }
-            .tag-group { margin-bottom: 20px; }
-            .tag-title { background-color: #e9ecef; padding: 10px; border-radius: 4px; margin-bottom: 10px; color: #495057; font-size: 1.2em; cursor: pointer; display: flex; justify-content: space-between; align-items: center; }
-            .tag-title:hover { background-color: #dee2e6; }
-            .tag-title::after { content: '▼'; font-size: 0.8em; transition: transform 0.3s; }
-            .tag-group.collapsed .tag-title::after { transform: rotate(-90deg); }
-            .tag-group.collapsed ul { display: none; }
-            .endpoint-row { display: flex; align-items: center; }
-            .copy-btn { margin-left: 10px; background: #fff; border: 1px solid #ccc; border-radius: 3px; cursor: pointer; font-size: 0.75em; padding: 2px 6px; color: #555; transition: all 0.2s; }
-            .copy-btn:hover { background-color: #eee; border-color: #bbb; color: #333; }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <h1>NSE Quant Tool API</h1>
-            <div class="header-links">
-                See also: <a href="/docs" target="_blank">Swagger UI</a> | <a href="/redoc" target="_blank">ReDoc</a>
-            </div>
-            <div class="search-box">
-                <input type="text" id="endpointSearch" placeholder="Search endpoints..." onkeyup="filterEndpoints()">
-            </div>
-            <div id="endpointList">
+    Members are as of `as_of` (YYYY-MM-DD, default today) and None when the
+    index is unknown. Raises ValueError for a malformed `as_of`.
     """
-    routes_by_tag = {}
-    for route in request.app.routes:
-        if hasattr(route, "methods") and "GET" in route.methods:
-            tags = getattr(route, "tags", [])
-            if not tags:
-                tags = ["General"]
-            for tag in tags:
-                if tag not in routes_by_tag:
-                    routes_by_tag[tag] = []
-                routes_by_tag[tag].append(route)
-
-    for tag in sorted(routes_by_tag.keys()):
-        html_content += f"""
-        <div class="tag-group">
-            <h3 class="tag-title">{tag}</h3>
-            <ul>
-        """
-        for route in routes_by_tag[tag]:
-            desc = getattr(route, "description", None) or "No description available."
-            path = getattr(route, "path", "")
-            html_content += f"""
-            <li>
-                <div class="meta">{getattr(route, "name", "Unnamed")}</div>
-                <div class="endpoint-row">
-                    <a href="{path}" target="_blank">{path}</a>
-                    <button class="copy-btn" onclick="copyToClipboard(this, '{path}')">Copy URL</button>
-                </div>
-                <div class="desc">{desc}</div>
-            </li>"""
-        html_content += "</ul></div>"
-
-    html_content += """
-            </div>
-        </div>
-        <script>
-            document.addEventListener('DOMContentLoaded', () => {
-                const titles = document.querySelectorAll('.tag-title');
-                titles.forEach(title => {
-                    title.addEventListener('click', () => {
-                        title.parentElement.classList.toggle('collapsed');
-                    });
-                });
-            });
-
-            function copyToClipboard(btn, path) {
-                const fullUrl = window.location.origin + path;
-                navigator.clipboard.writeText(fullUrl).then(() => {
-                    const originalText = btn.textContent;
-                    btn.textContent = 'Copied!';
-                    setTimeout(() => { btn.textContent = originalText; }, 1500);
-                }).catch(err => {
-                    console.error('Failed to copy: ', err);
-                });
-            }
-
-            function filterEndpoints() {
-                var input, filter, container, groups, i, j, ul, li, a, meta, txtValue, groupVisible;
-                input = document.getElementById('endpointSearch');
-                filter = input.value.toUpperCase();
-                container = document.getElementById("endpointList");
-                groups = container.getElementsByClassName('tag-group');
-
-                for (i = 0; i < groups.length; i++) {
-                    ul = groups[i].getElementsByTagName('ul')[0];
-                    li = ul.getElementsByTagName('li');
-                    groupVisible = false;
-
-                    for (j = 0; j < li.length; j++) {
-                        a = li[j].getElementsByTagName("a")[0];
-                        meta = li[j].getElementsByClassName("meta")[0];
-                        txtValue = (a.textContent || a.innerText) + " " + (meta.textContent || meta.innerText);
-                        if (txtValue.toUpperCase().indexOf(filter) > -1) {
-                            li[j].style.display = "";
-                            groupVisible = true;
-                        } else {
-                            li[j].style.display = "none";
-                        }
-                    }
-                    groups[i].style.display = groupVisible ? "" : "none";
-                    if (filter && groupVisible) {
-                        groups[i].classList.remove('collapsed');
-                    }
-                }
-            }
-        </script>
-    </body>
-    </html>
-    """
-    return HTMLResponse(content=html_content)
+    universe = get_universe()
+    name = universe.default() if index is None else universe.resolve(index)
+    if name is None:
+        return index, None
+    return name, list(universe.members(name, parse_as_of(as_of)))
 
 
-def _render_scan_page(default_live=False):
-    # Render interactive page; fetch INDEXES via API to ensure latest data
-    default_live_js = 'true' if default_live else 'false'
-    html = """
-        <!doctype html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <title>NSE Scan Results</title>
-            <style>
-                body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; padding: 20px; background-color: #f4f4f9; color: #333; }
-                h2 { color: #2c3e50; margin-top: 0; margin-bottom: 20px; }
-                .controls { margin-bottom: 20px; background: white; padding: 15px; border-radius: 8px; box-shadow: 0 2px 5px rgba(0,0,0,0.05); display: flex; align-items: center; gap: 15px; flex-wrap: wrap; }
-                select, button { padding: 8px 12px; border: 1px solid #ddd; border-radius: 4px; font-size: 14px; }
-                select { min-width: 200px; }
-                button { background-color: #3498db; color: white; border: none; cursor: pointer; transition: background 0.2s; }
-                button:hover { background-color: #2980b9; }
-                table { border-collapse: collapse; width: 100%; max-width: 1200px; background: white; border-radius: 8px; overflow: hidden; box-shadow: 0 2px 5px rgba(0,0,0,0.05); }
-                th, td { border-bottom: 1px solid #eee; padding: 12px 15px; text-align: left; }
-                th { background: #f8f9fa; font-weight: 600; color: #2c3e50; cursor: pointer; user-select: none; }
-                th:hover { background: #e9ecef; }
-                tr:last-child td { border-bottom: none; }
-                tr:hover { background-color: #f1f1f1; }
-                .sort-indicator { margin-left: 6px; font-size: 0.8em; color: #999; }
-                #progressInfo { color: #666; font-style: italic; margin-left: auto; }
-                .positive { color: #27ae60; font-weight: 500; }
-                .negative { color: #c0392b; font-weight: 500; }
-                .spinner {
-                    border: 3px solid #f3f3f3;
-                    border-top: 3px solid #3498db;
-                    border-radius: 50%;
-                    width: 16px;
-                    height: 16px;
-                    animation: spin 1s linear infinite;
-                    display: none;
-                    vertical-align: middle;
-                    margin-left: 10px;
-                }
-                @keyframes spin { 0% { transform: rotate(0deg); } 100% { transform: rotate(360deg); } }
-            </style>
-        </head>
-        <body>
-            <h2>NSE Scan</h2>
-            <div class="controls">
-                <label>Index: <select id="indexSelect"><option value="" disabled selected>Loading...</option></select></label>
-                <label style="display: flex; align-items: center; gap: 5px; cursor: pointer;">
-                    <input type="checkbox" id="liveCheck"> Live (intraday)
-                </label>
-                <label>Min Return %: <input type="number" id="minReturnInput" placeholder="0" style="width: 60px; padding: 8px 12px; border: 1px solid #ddd; border-radius: 4px;"></label>
-                <button id="refreshBtn">Refresh</button>
-                <button id="exportBtn">Export CSV</button>
-                <div id="loadingSpinner" class="spinner"></div>
-                <span id="progressInfo"></span>
-            </div>
-            <table id="resultsTable">
-                <thead>
-                    <tr>
-                        <th onclick="sortTable('resultsTable', 0)">Index<span class="sort-indicator"></span></th>
-                        <th onclick="sortTable('resultsTable', 1)">Symbol<span class="sort-indicator"></span></th>
-                        <th onclick="sortTable('resultsTable', 2)">Last Price (INR)<span class="sort-indicator"></span></th>
-                        <th onclick="sortTable('resultsTable', 3)">Momentum Return (%)<span class="sort-indicator"></span></th>
-                        <th onclick="sortTable('resultsTable', 4)">Mean Reversion Return (%)<span class="sort-indicator"></span></th>
-                    </tr>
-                </thead>
-                <tbody>
-                </tbody>
-            </table>
+def _scan_key(index, as_of=None):
+    """SCAN_CACHE key for a canonical index name; ValueError for a malformed `as_of`."""
+    return index, parse_as_of(as_of)
 
-            <script>window.DEFAULT_LIVE = __DEFAULT_LIVE_PLACEHOLDER__;</script>
-            <script>
-                (async function() {
-                    let INDEXES = {};
-                    let loadingCount = 0;
-                    const spinner = document.getElementById('loadingSpinner');
-
-                    function updateSpinner() {
-                        spinner.style.display = loadingCount > 0 ? 'inline-block' : 'none';
-                    }
-
-                    async function fetchIndexes() {
-                        loadingCount++;
-                        updateSpinner();
-                        try {
-                            const response = await fetch('/api/indexes');
-                            if (!response.ok) throw new Error('Failed to fetch indexes');
-                            INDEXES = await response.json();
-                            populateDropdown();
-                        } catch (error) {
-                            console.error('Error fetching indexes:', error);
-                            document.getElementById('progressInfo').textContent = 'Error loading indexes. Please check console.';
-                        } finally {
-                            loadingCount--;
-                            updateSpinner();
-                        }
-                    }
-
-                    function populateDropdown() {
-                        const indexSelect = document.getElementById('indexSelect');
-                        indexSelect.innerHTML = ''; // Clear loading option
-                        
-                        const keys = Object.keys(INDEXES).sort();
-                        
-                        // Add "All Indexes" option
-                        const totalCount = keys.reduce((acc, key) => acc + (INDEXES[key] ? INDEXES[key].length : 0), 0);
-                        const allOpt = document.createElement('option');
-                        allOpt.value = 'ALL';
-                        allOpt.textContent = `All Indexes (${totalCount})`;
-                        indexSelect.appendChild(allOpt);
-
-                        if (keys.length === 0) {
-                            const opt = document.createElement('option');
-                            opt.textContent = "No indexes found";
-                            indexSelect.appendChild(opt);
-                            return;
-                        }
-
-                        keys.forEach(name => {
-                            const opt = document.createElement('option');
-                            opt.value = name;
-                            const count = INDEXES[name] ? INDEXES[name].length : 0;
-                            opt.textContent = `${name} (${count})`;
-                            indexSelect.appendChild(opt);
-                        });
-
-                        // Select the first real index by default if available
-                        if (keys.length > 0) {
-                            indexSelect.value = keys[0];
-                            loadScanResults(document.getElementById('liveCheck').checked);
-                        }
-                    }
-
-                    function getColorClass(v) {
-                        if (v === null || isNaN(v)) return '';
-                        return v >= 0 ? 'positive' : 'negative';
-                    }
-
-                    function renderTable(data) {
-                        const tbody = document.getElementById('resultsTable').tBodies[0];
-                        tbody.innerHTML = '';
-                        data.forEach(r => {
-                            const tr = document.createElement('tr');
-                            const last = r.last_price;
-                            const m = r.momentum_return;
-                            const mr = r.mean_rev_return;
-                            
-                            const lastStr = last !== null && last !== undefined ? last.toFixed(2) : '-';
-                            const mStr = m !== null && m !== undefined ? m.toFixed(2) : '-';
-                            const mrStr = mr !== null && mr !== undefined ? mr.toFixed(2) : '-';
-                            
-                            const mClass = getColorClass(m);
-                            const mrClass = getColorClass(mr);
-
-                            tr.innerHTML = `
-                                <td>${r.index || ''}</td>
-                                <td>${r.symbol}</td>
-                                <td data-value="${last || ''}">${lastStr}</td>
-                                <td data-value="${m || ''}" class="${mClass}">${mStr}</td>
-                                <td data-value="${mr || ''}" class="${mrClass}">${mrStr}</td>
-                            `;
-                            tbody.appendChild(tr);
-                        });
-                    }
-
-                    function exportCSV(filename = 'scan.csv') {
-                        const table = document.getElementById('resultsTable');
-                        const rows = Array.from(table.querySelectorAll('tr'));
-                        const csvRows = rows.map(r => Array.from(r.cells).map(c => '"' + c.textContent.replace(/"/g, '""') + '"').join(',')).join('\\n');
-                        const blob = new Blob([csvRows], { type: 'text/csv' });
-                        const url = URL.createObjectURL(blob);
-                        const a = document.createElement('a'); a.href = url; a.download = filename; a.click(); URL.revokeObjectURL(url);
-                    }
-
-                    async function loadScanResults(live=false) {
-                        const progressEl = document.getElementById('progressInfo');
-                        const tbody = document.getElementById('resultsTable').tBodies[0];
-                        tbody.innerHTML = '';
-                        
-                        const indexSelect = document.getElementById('indexSelect');
-                        const selectedIndex = indexSelect.value;
-                        const minReturn = document.getElementById('minReturnInput').value;
-                        
-                        if (!selectedIndex) return;
-
-                        let names = [];
-                        if (selectedIndex === 'ALL') {
-                            names = Object.keys(INDEXES || {});
-                        } else {
-                            names = [selectedIndex];
-                        }
-                        
-                        if (!names.length) { progressEl.textContent = 'No indexes defined'; return; }
-                        
-                        progressEl.textContent = 'Scanning ' + names.length + ' index(es)...';
-                        loadingCount++;
-                        updateSpinner();
-                        
-                        try {
-                            const promises = names.map(async name => {
-                                try {
-                                    let url = '/api/scan?index=' + encodeURIComponent(name) + '&live=' + (live ? '1' : '0');
-                                    if (minReturn !== '') {
-                                        url += '&min_return=' + encodeURIComponent(minReturn);
-                                    }
-                                    const res = await fetch(url, { headers: { 'Accept': 'application/json' } });
-                                    if (!res.ok) throw new Error('Network response was not ok');
-                                    const data = await res.json();
-                                    return { name, results: data };
-                                } catch (e) {
-                                    console.error('Error scanning ' + name, e);
-                                    return { name, results: [] };
-                                }
-                            });
-                            
-                            const all = await Promise.all(promises);
-                            const rows = [];
-                            all.forEach(a => { (a.results || []).forEach(r => rows.push(Object.assign({ index: a.name }, r))); });
-                            
-                            renderTable(rows);
-                            progressEl.textContent = 'Loaded ' + rows.length + ' rows.';
-                        } catch (e) {
-                            progressEl.textContent = 'Error during scan.';
-                            console.error(e);
-                        } finally {
-                            loadingCount--;
-                            updateSpinner();
-                        }
-                    }
-
-                    function sortTable(tableId, colIndex) {
-                        const table = document.getElementById(tableId);
-                        const tbody = table.tBodies[0];
-                        const rows = Array.from(tbody.rows);
-                        const th = table.tHead.rows[0].cells[colIndex];
-                        const indicator = th.querySelector('.sort-indicator');
-                        const current = th.dataset.order === 'asc' ? 'asc' : (th.dataset.order === 'desc' ? 'desc' : null);
-                        const newOrder = current === 'asc' ? 'desc' : 'asc';
-                        
-                        Array.from(table.tHead.rows[0].cells).forEach(cell => { 
-                            cell.dataset.order = ''; 
-                            const ind = cell.querySelector('.sort-indicator'); 
-                            if (ind) ind.textContent = ''; 
-                        });
-                        
-                        th.dataset.order = newOrder;
-                        if (indicator) indicator.textContent = newOrder === 'asc' ? '▲' : '▼';
-                        
-                        rows.sort((a, b) => {
-                            const aCell = a.cells[colIndex];
-                            const bCell = b.cells[colIndex];
-                            const aVal = aCell.dataset.value !== undefined && aCell.dataset.value !== '' ? parseFloat(aCell.dataset.value) : null;
-                            const bVal = bCell.dataset.value !== undefined && bCell.dataset.value !== '' ? parseFloat(bCell.dataset.value) : null;
-                            
-                            if (aVal !== null && bVal !== null && !isNaN(aVal) && !isNaN(bVal)) {
-                                return newOrder === 'asc' ? aVal - bVal : bVal - aVal;
-                            }
-                            const aText = aCell.textContent.trim();
-                            const bText = bCell.textContent.trim();
-                            return newOrder === 'asc' ? aText.localeCompare(bText) : bText.localeCompare(aText);
-                        });
-                        
-                        rows.forEach(r => tbody.appendChild(r));
-                    }
-
-                    // wire controls
-                    try { if (window.DEFAULT_LIVE) document.getElementById('liveCheck').checked = true; } catch (e) {}
-                    
-                    document.getElementById('indexSelect').addEventListener('change', () => {
-                        const live = document.getElementById('liveCheck').checked; loadScanResults(live);
-                    });
-                    document.getElementById('refreshBtn').addEventListener('click', () => {
-                        const live = document.getElementById('liveCheck').checked; loadScanResults(live);
-                    });
-                    document.getElementById('exportBtn').addEventListener('click', () => exportCSV());
-
-                    // Initial load
-                    fetchIndexes();
-                })();
-            </script>
 
-        </body>
-        </html>
-        """
+def _rank(index, rows, live, costs=None, as_of=None):
+    # The screener ranks today's constituents: scans of past ones (as_of) stay out.
+    # Books are per interval and cost model (the interval's default when None).
+    if parse_as_of(as_of) is None:
+        update_screener(index, rows, interval='5m' if live else '1d', costs=cost_model_name(costs, bool(live)))
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # Start the live tick feed for every configured symbol (LIVE_FEED_SOURCE)
+    if LIVE_FEED_SOURCE:
+        universe = get_universe()
+        symbols = list(universe.union(universe.names()))
+        try:
+            LIVE_FEED.start(source_from_config(LIVE_FEED_SOURCE, symbols), backfill=fetch_data)
+            print(f"Live feed started ({LIVE_FEED_SOURCE}) for {len(symbols)} symbols")
+        except Exception as e:
+            print(f"Live feed not started: {e}")
+    yield
+    LIVE_FEED.stop()
 
-    html = html.replace("__DEFAULT_LIVE_PLACEHOLDER__", default_live_js)
-    return HTMLResponse(content=html)
 
+app = FastAPI(default_response_class=FastJSONResponse, lifespan=lifespan)
 
-@app.get("/scan", response_class=HTMLResponse)
-def scan():
-    response = _render_scan_page(default_live=False)
-    response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
+
+async def profile_requests(request: Request, call_next):
+    # Opt-in cProfile of one request (and any jobs it starts)
+    if request.query_params.get('profile') not in ('1', 'true'):
+        return await call_next(request)
+    label = f"{request.method} {request.url.path}" + (f"?{request.url.query}" if request.url.query else "")
+    with request_session(label) as session:
+        response = await call_next(request)
+    response.headers['X-Profile-Id'] = session.id
     return response
 
 
+# Only with PROFILING_ENABLED: an HTTP middleware runs on every request and
+# relays each response body through an extra stream, so it isn't installed otherwise.
+# Sync endpoints profile themselves when their request asks for it (?profile=1).
+if PROFILING_ENABLED:
+    app.router.route_class = ProfiledRoute
+    app.middleware("http")(profile_requests)
+
+
+# Static page shells are rendered once and revalidated by ETag
+STATIC_CACHE_CONTROL = "public, max-age=300"
+_HOME_PAGE = None
+
+
+def _static_page(request, page):
+    body, etag = page
+    headers = {"ETag": etag, "Cache-Control": STATIC_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(content=body, headers=headers)
+
+
+@app.get("/", response_class=HTMLResponse)
+def home(request: Request):
+    # Routes are fixed once the app is set up, so the index is rendered once
+    global _HOME_PAGE
+    if _HOME_PAGE is None:
+        _HOME_PAGE = render_home(request.app.routes)
+    return _static_page(request, _HOME_PAGE)
+
+
+@app.get("/scan", response_class=HTMLResponse)
+def scan(request: Request):
+    return _static_page(request, scan_page(default_live=False))
+
+
 @app.get("/scan-live", response_class=HTMLResponse)
-def scan_live():
+def scan_live(request: Request):
     # Render the same interactive page but default to live mode
-    response = _render_scan_page(default_live=True)
-    response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
-    return response
+    return _static_page(request, scan_page(default_live=True))
 
 
 @app.get('/api/scan')
@@ -472,7 +199,10 @@ def api_scan(
     index: Optional[str] = Query(None),
     live: Optional[int] = Query(0),
     format: Optional[str] = Query(None),
-    min_return: Optional[float] = Query(None)
+    min_return: Optional[float] = Query(None),
+    costs: Optional[str] = Query(None),
+    shape: Optional[str] = Query(None),
+    as_of: Optional[str] = Query(None)
 ):
     # Auto-detect browser request to serve HTML by default
     if format is None:
@@ -480,74 +210,42 @@ def api_scan(
         if 'text/html' in accept and 'application/json' not in accept:
             format = 'html'
 
-    if not INDEXES:
-        return [] if format != 'html' else HTMLResponse("No indexes configured.")
+    if costs is not None and costs not in COST_MODELS:
+        return JSONResponse({'error': f"Unknown cost model '{costs}'"}, status_code=400)
 
-    # index: display name from INDEXES keys
-    if index is None:
-        # default to first index
-        index = next(iter(INDEXES.keys()))
-
-    symbols = INDEXES.get(index)
+    # index: name or alias from the index file (default: its first index);
+    # as_of picks the constituents on that date
+    try:
+        index, symbols = _resolve_index(index, as_of)
+    except ValueError as e:
+        return JSONResponse({'error': str(e)}, status_code=400)
     if symbols is None:
         return [] if format != 'html' else HTMLResponse(f"Index '{index}' not found.")
 
-    results = scan_market(symbols=symbols, live=bool(live))
-
-    if min_return is not None:
-        results = [
-            r for r in results
-            if (r.get('momentum_return') is not None and r['momentum_return'] >= min_return) or
-               (r.get('mean_rev_return') is not None and r['mean_rev_return'] >= min_return)
-        ]
+    def passes(r):
+        return min_return is None or \
+            (r.get('momentum_return') is not None and r['momentum_return'] >= min_return) or \
+            (r.get('mean_rev_return') is not None and r['mean_rev_return'] >= min_return)
 
     if format == 'html':
-        html_content = f"""
-        <html>
-        <head>
-            <title>Scan Results - {index}</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 20px; }}
-                table {{ border-collapse: collapse; width: 100%; }}
-                th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
-                th {{ background-color: #f4f4f4; }}
-                tr:nth-child(even) {{ background-color: #f9f9f9; }}
-            </style>
-        </head>
-        <body>
-            <h2>Scan Results for {index}</h2>
-            <table>
-                <thead>
-                    <tr>
-                        <th>Symbol</th>
-                        <th>Last Price</th>
-                        <th>Momentum Return</th>
-                        <th>Mean Rev Return</th>
-                    </tr>
-                </thead>
-                <tbody>
-        """
-        for row in results:
-            last = row.get('last_price')
-            mom = row.get('momentum_return')
-            mr = row.get('mean_rev_return')
-            html_content += f"""
-                    <tr>
-                        <td>{row.get('symbol')}</td>
-                        <td>{f"{last:.2f}" if last is not None else "-"}</td>
-                        <td>{f"{mom:.2f}" if mom is not None else "-"}</td>
-                        <td>{f"{mr:.2f}" if mr is not None else "-"}</td>
-                    </tr>
-            """
-        html_content += """
-                </tbody>
-            </table>
-        </body>
-        </html>
-        """
-        return HTMLResponse(content=html_content)
+        # Stream rows to the browser as each symbol finishes
+        def rows():
+            done = []
+            for r in iter_scan_market(symbols=symbols, live=bool(live), costs=costs):
+                done.append(r)
+                if passes(r):
+                    yield r
+            _rank(index, done, live, costs, as_of)
+
+        return StreamingResponse(profiled_stream(stream_scan_table(index, rows())), media_type="text/html")
+
+    results = scan_market(symbols=symbols, live=bool(live), costs=costs)
+    _rank(index, results, live, costs, as_of)
+
+    if min_return is not None:
+        results = [r for r in results if passes(r)]
 
-    return results
+    return json_response(request, results, shape=shape)
 
 
 @app.get('/api/analyze')
@@ -557,7 +255,15 @@ def api_analyze(
     symbol: Optional[str] = Query(None),
     live: Optional[int] = Query(0),
     format: Optional[str] = Query(None),
-    recommendation: Optional[str] = Query(None)
+    recommendation: Optional[str] = Query(None),
+    portfolio: Optional[int] = Query(0),
+    strategy: Optional[str] = Query("momentum"),
+    costs: Optional[str] = Query(None),
+    shape: Optional[str] = Query(None),
+    robustness: Optional[int] = Query(0),
+    samples: Optional[int] = Query(1000),
+    block: Optional[int] = Query(5),
+    as_of: Optional[str] = Query(None)
 ):
     # Auto-detect browser request to serve HTML by default
     if format is None:
@@ -565,172 +271,504 @@ def api_analyze(
         if 'text/html' in accept and 'application/json' not in accept:
             format = 'html'
 
+    if costs is not None and costs not in COST_MODELS:
+        return JSONResponse({'error': f"Unknown cost model '{costs}'"}, status_code=400)
+
+    # Bootstrap confidence intervals for each strategy's Sharpe/return/drawdown
+    bootstrap = None
+    if robustness:
+        if not (1 <= samples <= MAX_BOOTSTRAP_SAMPLES) or block < 1:
+            return JSONResponse({'error': f"samples must be 1..{MAX_BOOTSTRAP_SAMPLES} and block >= 1"}, status_code=400)
+        bootstrap = {'n_samples': int(samples), 'block': int(block)}
+
     symbols = []
     title = "Analysis"
+    membership = None
     if symbol:
         symbols = [symbol]
         title = f"Analysis - {symbol}"
     else:
-        if index is None and INDEXES:
-            index = next(iter(INDEXES.keys()))
-        if index and index in INDEXES:
-            symbols = INDEXES[index]
-            title = f"Analysis - {index}"
-        else:
+        try:
+            index, symbols = _resolve_index(index, as_of)
+        except ValueError as e:
+            return JSONResponse({'error': str(e)}, status_code=400)
+        if not symbols:
             return [] if format != 'html' else HTMLResponse("No symbols found.")
+        title = f"Analysis - {index}"
+        if portfolio:
+            # Survivorship-free backtest: every symbol that was a member up to
+            # as_of, only allowed to hold positions while it was in the index
+            universe = get_universe()
+            symbols = list(universe.members_between(index, end=parse_as_of(as_of)))
+            membership = lambda dates, columns: universe.membership_mask(index, dates, columns)
+
+    if portfolio:
+        return _api_portfolio(request, symbols, title, bool(live), strategy, costs, format, membership)
 
-    results = scan_analysis(symbols=symbols, live=bool(live))
+    rec_lower = recommendation.lower() if recommendation else None
 
-    if recommendation:
-        rec_lower = recommendation.lower()
+    if symbol:
+        # Single-symbol lookups are interactive: they run ahead of bulk scans
+        # on the shared job pool instead of competing with them
+        cost_kwargs = resolve_costs(costs, live=bool(live))
+        rows = run_interactive(
+            f"analyze:{symbol}", symbols,
+            lambda s: analyze_symbol(s, live=bool(live), cost_kwargs=cost_kwargs, robustness=bootstrap),
+            timeout=SYMBOL_TIMEOUT_SECONDS,
+        )
+        results = [r for r in rows if r is not None]
+        if rec_lower:
+            results = [r for r in results if rec_lower in r.get('recommendation', '').lower()]
+        if format == 'html':
+            return StreamingResponse(profiled_stream(stream_analyze_table(title, results)), media_type="text/html")
+        return json_response(request, results, shape=shape)
+
+    if format == 'html':
+        def rows():
+            done = []
+            for r in iter_scan_analysis(symbols=symbols, live=bool(live), costs=costs, robustness=bootstrap):
+                done.append(r)
+                if rec_lower is None or rec_lower in r.get('recommendation', '').lower():
+                    yield r
+            _rank(index, done, live, costs, as_of)
+
+        return StreamingResponse(profiled_stream(stream_analyze_table(title, rows())), media_type="text/html")
+
+    results = scan_analysis(symbols=symbols, live=bool(live), costs=costs, robustness=bootstrap)
+    _rank(index, results, live, costs, as_of)
+
+    if rec_lower:
         results = [r for r in results if rec_lower in r.get('recommendation', '').lower()]
 
+    return json_response(request, results, shape=shape)
+
+
+def _api_portfolio(request, symbols, title, live, strategy, costs, format, membership=None):
+    # Portfolio mode: all constituents simulated together with shared cash
+    if strategy not in STRATEGIES:
+        return JSONResponse({'error': f"Unknown strategy '{strategy}'"}, status_code=400)
+
+    result = scan_portfolio(symbols=symbols, live=live, strategy=strategy, costs=costs, membership=membership)
+    if result is None:
+        return {} if format != 'html' else HTMLResponse("No data for portfolio.")
+
     if format == 'html':
+        def fmt(v):
+            return f"{v:.2f}" if v is not None else "-"
+
+        rows = "".join(
+            f"<tr><td>{c['symbol']}</td><td>{fmt(c['pnl'])}</td>"
+            f"<td>{fmt(c['contribution_pct'])}</td></tr>"
+            for c in result['contributions']
+        )
         html_content = f"""
         <html>
         <head>
-            <title>{title}</title>
+            <title>Portfolio {title}</title>
             <style>
                 body {{ font-family: 'Segoe UI', sans-serif; margin: 20px; background: #f4f4f9; }}
                 h2 {{ color: #2c3e50; }}
-                table {{ border-collapse: collapse; width: 100%; background: white; box-shadow: 0 1px 3px rgba(0,0,0,0.1); }}
+                table {{ border-collapse: collapse; width: 100%; background: white; box-shadow: 0 1px 3px rgba(0,0,0,0.1); margin-bottom: 20px; }}
                 th, td {{ border: 1px solid #ddd; padding: 10px; text-align: left; font-size: 14px; }}
                 th {{ background-color: #f8f9fa; font-weight: 600; }}
-                tr:nth-child(even) {{ background-color: #f9f9f9; }}
-                .rec-Strong {{ color: green; font-weight: bold; }}
-                .rec-Avoid {{ color: red; }}
             </style>
         </head>
         <body>
-            <h2>{title}</h2>
+            <h2>Portfolio {title} ({result['strategy']})</h2>
             <table>
-                <thead>
-                    <tr>
-                        <th>Symbol</th>
-                        <th>Price</th>
-                        <th>Recommendation</th>
-                        <th>Mom Signal</th>
-                        <th>Mom Return %</th>
-                        <th>Mom Sharpe</th>
-                        <th>Rev Signal</th>
-                        <th>Rev Return %</th>
-                        <th>Rev Win Rate %</th>
-                    </tr>
-                </thead>
-                <tbody>
+                <tr><th>Symbols</th><th>Final Value</th><th>Return %</th><th>Sharpe</th><th>Max DD %</th><th>Turnover</th></tr>
+                <tr><td>{result['symbols']}</td><td>{fmt(result['final_value'])}</td><td>{fmt(result['return_pct'])}</td>
+                    <td>{fmt(result['sharpe'])}</td><td>{fmt(result['max_dd_pct'])}</td><td>{fmt(result['turnover'])}</td></tr>
+            </table>
+            <table>
+                <thead><tr><th>Symbol</th><th>PnL (INR)</th><th>Contribution %</th></tr></thead>
+                <tbody>{rows}</tbody>
+            </table>
+        </body>
+        </html>
         """
-        for r in results:
-            mom = r.get('momentum', {})
-            rev = r.get('mean_reversion', {})
-            rec = r.get('recommendation', '')
-            rec_class = 'rec-Strong' if 'Strong' in rec else ('rec-Avoid' if 'Avoid' in rec else '')
-            
-            html_content += f"""
-                    <tr>
-                        <td>{r.get('symbol')}</td>
-                        <td>{r.get('last_price', 0):.2f}</td>
-                        <td class="{rec_class}">{rec}</td>
-                        <td>{mom.get('signal')}</td>
-                        <td>{mom.get('metrics', {}).get('return_pct', 0):.2f}</td>
-                        <td>{mom.get('metrics', {}).get('sharpe', 0):.2f}</td>
-                        <td>{rev.get('signal')}</td>
-                        <td>{rev.get('metrics', {}).get('return_pct', 0):.2f}</td>
-                        <td>{rev.get('metrics', {}).get('win_rate_pct', 0):.2f}</td>
-                    </tr>
-            """
-        html_content += "</tbody></table></body></html>"
         return HTMLResponse(content=html_content)
 
-    return results
+    return json_response(request, result)
 
 
 @app.get('/api/indexes')
-def api_indexes():
-    # Return available index definitions (display name -> list of symbols)
-    return INDEXES
-
-
-def _start_background_scan_blocking(index_name, symbols, live, max_workers=5):
-    key = index_name
-    with CACHE_LOCK:
-        SCAN_CACHE[key] = {
-            'running': True,
-            'progress': 0,
-            'total': len(symbols),
-            'results': [],
-            'last_updated': None,
-        }
+def api_indexes(request: Request, as_of: Optional[str] = Query(None)):
+    # Return available index definitions (display name -> list of symbols),
+    # with the constituents on `as_of` (default today)
+    try:
+        return json_response(request, get_universe().to_dict(parse_as_of(as_of)))
+    except ValueError as e:
+        return JSONResponse({'error': str(e)}, status_code=400)
 
-    def worker(sym):
+
+@app.post('/api/indexes/reload')
+def api_indexes_reload():
+    # Re-read INDEX_FILE now instead of waiting for the mtime check
+    try:
+        universe = reload_universe()
+    except (OSError, ValueError) as e:
+        return JSONResponse({'reloaded': False, 'error': str(e)}, status_code=400)
+    return {'reloaded': True, 'indexes': universe.names(), 'symbols': len(universe.symbols)}
+
+
+@app.get('/api/strategies')
+def api_strategies():
+    # Registered strategies: name -> indicator rule and parameters
+    return STRATEGIES
+
+
+@app.get('/api/strategy-matrix')
+def api_strategy_matrix(
+    request: Request,
+    index: Optional[str] = Query(None),
+    symbol: Optional[str] = Query(None),
+    strategies: Optional[str] = Query(None),
+    live: Optional[int] = Query(0),
+    costs: Optional[str] = Query(None),
+    as_of: Optional[str] = Query(None)
+):
+    # Per-symbol x per-strategy metrics from one stacked simulation
+    if symbol:
+        symbols = [symbol]
+    else:
         try:
-            if live:
-                data = __import__('app.data', fromlist=['']).fetch_data(sym, period='1d', interval='5m')
-            else:
-                data = __import__('app.data', fromlist=['']).fetch_data(sym)
-            if data is None or data.empty:
-                return {'symbol': sym, 'last_price': None, 'momentum_return': None, 'mean_rev_return': None}
-            metrics = __import__('app.backtest', fromlist=['']).run_backtest(data)
-            arr = data['Close'].to_numpy()
-            last_price = float(arr[-1]) if arr.size else None
-            return { 'symbol': sym, 'last_price': last_price, **metrics }
-        except Exception as e:
-            return { 'symbol': sym, 'last_price': None, 'momentum_return': None, 'mean_rev_return': None }
-
-    # use ThreadPoolExecutor to limit parallelism
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as ex:
-        futures = { ex.submit(worker, s): s for s in symbols }
-        for fut in concurrent.futures.as_completed(futures):
-            res = fut.result()
-            with CACHE_LOCK:
-                entry = SCAN_CACHE.get(key)
-                if entry is not None:
-                    entry['results'].append(res)
-                    entry['progress'] = entry.get('progress', 0) + 1
-                    entry['last_updated'] = datetime.now(timezone.utc).astimezone().isoformat()
-
-    with CACHE_LOCK:
-        entry = SCAN_CACHE.get(key)
-        if entry is not None:
-            entry['running'] = False
+            index, symbols = _resolve_index(index, as_of)
+        except ValueError as e:
+            return JSONResponse({'error': str(e)}, status_code=400)
+        if symbols is None:
+            return JSONResponse({'error': f"Index '{index}' not found"}, status_code=400)
 
+    names = [n.strip() for n in strategies.split(',') if n.strip()] if strategies else None
+    unknown = [n for n in names or [] if n not in STRATEGIES]
+    if unknown:
+        return JSONResponse({'error': f"Unknown strategies {unknown}"}, status_code=400)
+    if costs is not None and costs not in COST_MODELS:
+        return JSONResponse({'error': f"Unknown cost model '{costs}'"}, status_code=400)
 
-@app.get('/api/scan-start')
-def api_scan_start(index: Optional[str] = Query(None), live: Optional[int] = Query(0), max_workers: Optional[int] = Query(5)):
-    if index is None:
-        index = next(iter(INDEXES.keys()))
-    symbols = INDEXES.get(index)
+    matrix = scan_strategies(symbols=symbols, live=bool(live), strategies=names, costs=costs)
+    return json_response(request, matrix)
+
+
+@app.get('/api/screener')
+def api_screener(
+    request: Request,
+    index: Optional[str] = Query(None),
+    metric: Optional[str] = Query('return'),
+    n: Optional[int] = Query(10),
+    order: Optional[str] = Query('top'),
+    live: Optional[int] = Query(0),
+    costs: Optional[str] = Query(None)
+):
+    # Answer top-N / bottom-N from ranks maintained as scans complete
+    # (live=1 ranks the intraday scans, costs= the scans run with that cost
+    # model; each combination is ranked apart from the others)
+    index = _resolve_index(index)[0]
+    if order not in ('top', 'bottom'):
+        return JSONResponse({'error': "order must be 'top' or 'bottom'"}, status_code=400)
+    try:
+        result = screen(index, metric=metric, n=n, order=order, interval='5m' if live else '1d',
+                        costs=cost_model_name(costs, bool(live)))
+    except ValueError as e:
+        return JSONResponse({'error': str(e)}, status_code=400)
+    return json_response(request, result)
+
+
+@app.get('/api/risk')
+def api_risk(
+    request: Request,
+    index: Optional[str] = Query(None),
+    window: Optional[int] = Query(RISK_WINDOW),
+    live: Optional[int] = Query(0)
+):
+    # Rolling correlation/covariance, beta to the index benchmark and sector
+    # aggregates; the rolling state is cached and advanced bar by bar
+    index, symbols = _resolve_index(index)
     if symbols is None:
-        return JSONResponse([], status_code=400)
+        return JSONResponse({'error': f"Index '{index}' not found"}, status_code=400)
+    if not (2 <= window <= RISK_MAX_WINDOW):
+        return JSONResponse({'error': f"window must be 2..{RISK_MAX_WINDOW}"}, status_code=400)
+
+    result = risk_matrix(index, symbols, window=window, interval='5m' if live else '1d')
+    if result is None:
+        return JSONResponse({'error': f"Not enough data for '{index}'"}, status_code=404)
+    return json_response(request, result)
+
+
+def _new_scan_entry(symbols):
+    start_seq = next(_RESULT_SEQ)
+    return {
+        'running': True,
+        'progress': 0,
+        'total': len(symbols),
+        # Append-only change log of (seq, symbol, row), shared between
+        # snapshots; each snapshot only reads its first `log_len` items, so
+        # `since` queries bisect to the new tail without copying the log
+        'log_seqs': [],
+        'log_symbols': [],
+        'log_rows': [],
+        'log_len': 0,
+        'start_seq': start_seq,
+        'seq': start_seq,
+        'last_updated': None,
+    }
+
+
+def _start_background_scan(index_name, symbols, live, max_workers=5, costs=None, as_of=None):
+    """Run an index scan as a bulk-priority job, recording rows in SCAN_CACHE."""
+    key = _scan_key(index_name, as_of)
+    cost_kwargs = resolve_costs(costs, live=live)
+    claimed = SCAN_CACHE.get(key)
+    own_seq = claimed['start_seq'] if claimed else None
+
+    def worker(sym):
+        return scan_symbol(sym, live=live, cost_kwargs=cost_kwargs)
+
+    def record(entry, res):
+        # Ignore the entry if it was replaced by a newer scan of the same index
+        if entry is None or entry['start_seq'] != own_seq:
+            return entry
+        seq = next(_RESULT_SEQ)
+        entry['log_seqs'].append(seq)
+        entry['log_symbols'].append(res['symbol'])
+        entry['log_rows'].append(res)
+        return {
+            **entry,
+            'log_len': len(entry['log_seqs']),
+            'seq': seq,
+            'progress': entry.get('progress', 0) + 1,
+            'last_updated': datetime.now(timezone.utc).astimezone().isoformat(),
+        }
+
+    def on_result(sym, res, error):
+        # Failed, timed-out and no-data symbols still count towards progress
+        if error is not None or res is None:
+            res = {'symbol': sym, 'last_price': None, 'momentum_return': None, 'mean_rev_return': None}
+        else:
+            _rank(index_name, [res], live, costs, as_of)
+        SCAN_CACHE.update(key, lambda entry: record(entry, res))
+
+    def on_done(job):
+        SCAN_CACHE.update(key, lambda entry: {**entry, 'running': False, 'state': job.state} if entry and entry['start_seq'] == own_seq else entry)
 
-    key = index
-    with CACHE_LOCK:
-        existing = SCAN_CACHE.get(key)
-        if existing and existing.get('running'):
-            return {'started': False, 'message': 'Scan already running'}
+    return JOB_MANAGER.submit(
+        f"scan:{index_name}" + (f"@{as_of}" if key[1] is not None else ""), symbols, worker,
+        priority=BULK,
+        max_parallel=max_workers,
+        timeout=SYMBOL_TIMEOUT_SECONDS,
+        on_result=on_result,
+        on_done=on_done,
+    )
 
-    loop = asyncio.get_event_loop()
-    # run blocking scan in default executor so it doesn't block event loop
-    loop.run_in_executor(None, _start_background_scan_blocking, index, symbols, bool(live), int(max_workers)) # type: ignore
-    return {'started': True}
+
+@app.get('/api/scan-start')
+def api_scan_start(index: Optional[str] = Query(None), live: Optional[int] = Query(0), max_workers: Optional[int] = Query(5), costs: Optional[str] = Query(None), as_of: Optional[str] = Query(None)):
+    try:
+        index, symbols = _resolve_index(index, as_of)
+    except ValueError as e:
+        return JSONResponse({'error': str(e)}, status_code=400)
+    if symbols is None:
+        return JSONResponse([], status_code=400)
+    if costs is not None and costs not in COST_MODELS:
+        return JSONResponse({'error': f"Unknown cost model '{costs}'"}, status_code=400)
+
+    # Claim the key atomically so two concurrent starts can't both launch
+    key = _scan_key(index, as_of)
+    fresh = _new_scan_entry(symbols)
+    entry = SCAN_CACHE.update(key, lambda old: old if old and old.get('running') else fresh)
+    if entry is not fresh:
+        return {'started': False, 'message': 'Scan already running', 'job_id': entry.get('job_id')}
+
+    # max_workers only caps this job's share of the global worker budget
+    job = _start_background_scan(index, symbols, bool(live), max(1, int(max_workers or 1)), costs, as_of)
+    SCAN_CACHE.update(key, lambda e: {**e, 'job_id': job.id} if e and e['start_seq'] == fresh['start_seq'] else e)
+    return {'started': True, 'job_id': job.id}
+
+
+@app.get('/api/scan-cancel')
+def api_scan_cancel(index: Optional[str] = Query(None), job_id: Optional[str] = Query(None), as_of: Optional[str] = Query(None)):
+    # Cancel by job id, or the running scan of an index (as started, with its as_of)
+    if job_id is None:
+        try:
+            entry = SCAN_CACHE.get(_scan_key(_resolve_index(index)[0], as_of))
+        except ValueError as e:
+            return JSONResponse({'error': str(e)}, status_code=400)
+        job_id = entry.get('job_id') if entry else None
+    if job_id is None or JOB_MANAGER.get(job_id) is None:
+        return JSONResponse({'cancelled': False, 'message': 'No such job'}, status_code=404)
+    return {'cancelled': JOB_MANAGER.cancel(job_id), 'job_id': job_id}
+
+
+@app.get('/api/jobs')
+def api_jobs(job_id: Optional[str] = Query(None)):
+    # All known jobs (running and recently finished), or one job by id
+    if job_id is None:
+        return {'workers': JOB_MANAGER.workers, 'jobs': JOB_MANAGER.list()}
+    job = JOB_MANAGER.get(job_id)
+    if job is None:
+        return JSONResponse({'message': 'No such job'}, status_code=404)
+    return job.snapshot()
 
 
 @app.get('/api/scan-status')
-def api_scan_status(index: Optional[str] = Query(None)):
-    if index is None:
-        index = next(iter(INDEXES.keys()))
-    with CACHE_LOCK:
-        entry = SCAN_CACHE.get(index)
-        if not entry:
-            return {'running': False, 'progress': 0, 'total': 0, 'last_updated': None}
-        return {'running': bool(entry.get('running')), 'progress': int(entry.get('progress', 0)), 'total': int(entry.get('total', 0)), 'last_updated': entry.get('last_updated')}
+def api_scan_status(index: Optional[str] = Query(None), as_of: Optional[str] = Query(None)):
+    try:
+        entry = SCAN_CACHE.get(_scan_key(_resolve_index(index)[0], as_of))
+    except ValueError as e:
+        return JSONResponse({'error': str(e)}, status_code=400)
+    if not entry:
+        return {'running': False, 'progress': 0, 'total': 0, 'last_updated': None}
+    return {'running': bool(entry.get('running')), 'progress': int(entry.get('progress', 0)), 'total': int(entry.get('total', 0)), 'last_updated': entry.get('last_updated')}
 
 
 @app.get('/api/scan-results')
-def api_scan_results(index: Optional[str] = Query(None)):
-    if index is None:
-        index = next(iter(INDEXES.keys()))
-    with CACHE_LOCK:
-        entry = SCAN_CACHE.get(index)
-        if not entry:
-            return {'results': [], 'last_updated': None}
-        return {'results': entry.get('results', []), 'last_updated': entry.get('last_updated')}
+def api_scan_results(
+    request: Request,
+    index: Optional[str] = Query(None),
+    since: Optional[int] = Query(None),
+    shape: Optional[str] = Query(None),
+    as_of: Optional[str] = Query(None)
+):
+    # With `since`, return only rows added/changed after that sequence number.
+    # `full` is true when the whole result set is sent (first poll, or the scan
+    # was restarted after `since`); clients then replace instead of merging.
+    try:
+        entry = SCAN_CACHE.get(_scan_key(_resolve_index(index)[0], as_of))
+    except ValueError as e:
+        return JSONResponse({'error': str(e)}, status_code=400)
+    if not entry:
+        payload = {'results': [], 'seq': 0, 'full': True, 'running': False, 'last_updated': None}
+    else:
+        n = entry['log_len']
+        full = since is None or since < entry['start_seq']
+        start = 0 if full else bisect.bisect_right(entry['log_seqs'], since, 0, n)
+        # Later log items supersede earlier ones for the same symbol
+        latest = {}
+        for sym, row in zip(entry['log_symbols'][start:n], entry['log_rows'][start:n]):
+            latest[sym] = row
+        payload = {
+            'results': list(latest.values()),
+            'seq': entry['seq'],
+            'full': full,
+            'running': bool(entry.get('running')),
+            'last_updated': entry.get('last_updated'),
+        }
+    return json_response(request, payload, shape=shape)
+
+
+@app.post('/api/alert-rules')
+def api_alert_rule_add(
+    kind: str = Query(...),
+    index: Optional[str] = Query(None),
+    symbol: Optional[str] = Query(None),
+    live: Optional[int] = Query(0),
+    direction: Optional[str] = Query('above'),
+    level: Optional[float] = Query(None),
+    window: Optional[int] = Query(None),
+    fast: Optional[int] = Query(None),
+    slow: Optional[int] = Query(None),
+    strategy: Optional[str] = Query(None),
+    to: Optional[str] = Query(None),
+    webhook: Optional[str] = Query(None)
+):
+    # e.g. kind=rsi_cross&index=NIFTY BANK&direction=below&level=30
+    #      kind=ma_cross&symbol=TCS.NS&fast=10&slow=30&live=1
+    #      kind=signal&index=NIFTY IT&strategy=momentum&to=Buy
+    params = {k: v for k, v in {
+        'direction': direction, 'level': level, 'window': window, 'fast': fast,
+        'slow': slow, 'strategy': strategy, 'to': to,
+    }.items() if v is not None}
+    if symbol:
+        index = None
+    else:
+        index = _resolve_index(index)[0]
+    try:
+        symbols = resolve_symbols(index=index, symbol=symbol)
+        rule = ALERT_ENGINE.add_rule(
+            kind, params, symbols, interval='5m' if live else '1d', index=index, webhook=webhook,
+        )
+    except ValueError as e:
+        return JSONResponse({'error': str(e)}, status_code=400)
+    return rule.to_dict()
+
+
+@app.get('/api/alert-rules')
+def api_alert_rules():
+    return {'rules': ALERT_ENGINE.rules(), 'engine': ALERT_ENGINE.status()}
+
+
+@app.delete('/api/alert-rules/{rule_id}')
+def api_alert_rule_delete(rule_id: str):
+    if ALERT_ENGINE.remove_rule(rule_id) is None:
+        return JSONResponse({'deleted': False, 'message': 'No such rule'}, status_code=404)
+    return {'deleted': True, 'rule_id': rule_id}
+
+
+@app.get('/api/alerts')
+def api_alerts(since: Optional[int] = Query(0)):
+    # Fired alerts with seq > since (poll with the last seq seen)
+    alerts = ALERT_ENGINE.since(since)
+    return {'alerts': alerts, 'seq': alerts[-1]['seq'] if alerts else since}
+
+
+@app.get('/api/alerts-stream')
+async def api_alerts_stream(since: Optional[int] = Query(None)):
+    # Server-sent events: one `alert` event per fired alert, keep-alives in between.
+    # Async, so idle subscribers wait on the event loop rather than holding a worker thread.
+    async def events():
+        q = ALERT_ENGINE.subscribe()
+        try:
+            if since is not None:
+                for alert in ALERT_ENGINE.since(since):
+                    yield b'id: %d\nevent: alert\ndata: %s\n\n' % (alert['seq'], dumps(alert))
+            while True:
+                try:
+                    alert = await asyncio.wait_for(q.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield b': keep-alive\n\n'
+                    continue
+                yield b'id: %d\nevent: alert\ndata: %s\n\n' % (alert['seq'], dumps(alert))
+        finally:
+            ALERT_ENGINE.unsubscribe(q)
+
+    return StreamingResponse(events(), media_type='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+
+@app.get('/api/profiles')
+def api_profiles():
+    # Stored request/job profiles, newest first
+    if not PROFILING_ENABLED:
+        return JSONResponse({'error': 'Profiling is disabled (set PROFILING_ENABLED=true)'}, status_code=404)
+    return {'profiles': list_profiles()}
+
+
+@app.get('/api/profiles/{profile_id}')
+def api_profile(profile_id: str, format: Optional[str] = Query('pstats')):
+    # format=pstats downloads the raw stats (snakeviz, pstats); format=summary returns the JSON summary
+    if not PROFILING_ENABLED:
+        return JSONResponse({'error': 'Profiling is disabled (set PROFILING_ENABLED=true)'}, status_code=404)
+    path = profile_path(profile_id, '.json' if format == 'summary' else '.pstats')
+    if path is None:
+        return JSONResponse({'error': f"Profile '{profile_id}' not found"}, status_code=404)
+    if format == 'summary':
+        with open(path) as f:
+            return json.load(f)
+    return FileResponse(path, media_type='application/octet-stream', filename=profile_id + '.pstats')
+
+
+@app.get('/api/live-feed')
+def api_live_feed():
+    # Tick feed state: when active, live scans read in-memory bars
+    return LIVE_FEED.status()
+
+
+@app.get('/api/providers')
+def api_providers():
+    # Data provider circuit breaker states and negative-cache size
+    return provider_status()
+
+
+@app.get('/api/cache-stats')
+def api_cache_stats():
+    # Scan cache hit rate, entry count, evictions and approximate memory
+    return SCAN_CACHE.stats()
@@ -0,0 +1,59 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The app imports `config` and `app.*` relative to backend/, as main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_frame(symbol, n=150, interval="1d", seed=None, start="2024-01-01"):
+    """A yfinance-style OHLCV frame (MultiIndex columns) of a random walk."""
+    rng = np.random.default_rng(seed if seed is not None else abs(hash(symbol)) % 2**32)
+    freq = "D" if interval == "1d" else interval.replace("m", "min")
+    index = pd.date_range(start, periods=n, freq=freq)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.02, n))
+    columns = pd.MultiIndex.from_product([["Close", "High", "Low", "Open", "Volume"], [symbol]])
+    data = np.column_stack([close, close * 1.01, close * 0.99, close, np.full(n, 1e5)])
+    return pd.DataFrame(data, index=index, columns=columns)
+
+
+@pytest.fixture
+def fake_prices(monkeypatch):
+    """Serve deterministic random-walk frames instead of downloading."""
+    import app.data
+
+    calls = []
+
+    def fetch(symbol, period="6mo", interval="1d"):
+        calls.append((symbol, period, interval))
+        if symbol.startswith("NODATA"):
+            return pd.DataFrame()
+        return make_frame(symbol, n=150 if interval == "1d" else 75, interval=interval)
+
+    monkeypatch.setattr(app.data, "fetch_data", fetch)
+    return calls
+
+
+@pytest.fixture
+def index_file(tmp_path, monkeypatch):
+    """Point the index universe at a small temporary index file.
+
+    Returns a function write(indexes) that (re)writes the file and reloads it.
+    """
+    import json
+    import app.universe as universe
+
+    path = tmp_path / "indexes.json"
+    monkeypatch.setattr(universe, "INDEX_FILE", str(path))
+    monkeypatch.setattr(universe, "_CURRENT", None)
+    monkeypatch.setattr(universe, "_FAILED_MTIME", None)
+
+    def write(indexes):
+        path.write_text(json.dumps({"indexes": indexes}))
+        return universe.reload_universe(str(path))
+
+    write({"TEST": {"aliases": ["T"], "benchmark": "^BENCH", "members": ["A.NS", "B.NS", "C.NS"]}})
+    return write
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+import vectorbt as vbt
+
+import app.alerts as alerts
+from app.alerts import AlertEngine, MAState, RSIState, _webhook_allowed
+from app.bars import Bars
+
+
+def _walk(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 * np.cumprod(1 + rng.normal(0, 0.02, n))
+
+
+def _bars(close, start="2024-01-01"):
+    close = np.asarray(close, dtype=np.float64)
+    index = pd.date_range(start, periods=len(close), freq="D")
+    return Bars(index, close, close, close, close, np.full(len(close), 1e5), symbol="A.NS")
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    """An engine with no polling thread, fed from `feed["close"]`."""
+    feed = {"close": _walk(120), "calls": []}
+
+    def fetch_bars(symbol, period="6mo", interval="1d"):
+        feed["calls"].append(period)
+        close = feed["close"]
+        if period == alerts.ALERT_UPDATE_PERIODS[interval]:
+            return _bars(close[-20:], start=pd.Timestamp("2024-01-01") + pd.Timedelta(days=len(close) - 20))
+        return _bars(close)
+
+    monkeypatch.setattr(alerts, "fetch_bars", fetch_bars)
+    engine = AlertEngine(poll_seconds=3600, webhook=None, webhook_allowlist=["https://hooks.example.com/alerts/"])
+    engine.start = lambda: None
+    engine.feed = feed
+    return engine
+
+
+def test_incremental_indicators_match_vectorbt():
+    close = _walk(200, seed=3)
+    rsi, ma = RSIState(14), MAState(20)
+    rsi_values = [rsi.update(c) for c in close]
+    ma_values = [ma.update(c) for c in close]
+    expected_rsi = vbt.RSI.run(pd.Series(close), window=14).rsi.to_numpy()
+    expected_ma = vbt.MA.run(pd.Series(close), window=20).ma.to_numpy()
+    np.testing.assert_allclose(rsi_values, expected_rsi, equal_nan=True)
+    np.testing.assert_allclose(ma_values, expected_ma, equal_nan=True)
+
+
+def test_forming_bar_is_reapplied_from_confirmed_state(engine):
+    engine.add_rule("rsi_cross", {"level": 50}, ["A.NS"])
+    engine.evaluate()
+    close = engine.feed["close"].copy()
+
+    # The newest bar is revised, then two more bars arrive
+    close[-1] *= 1.05
+    engine.feed["close"] = close
+    engine.evaluate()
+    close = np.append(close, [close[-1] * 0.97, close[-1] * 1.01])
+    engine.feed["close"] = close
+    engine.evaluate()
+
+    state = engine._states[("A.NS", "1d")]
+    expected = vbt.RSI.run(pd.Series(close), window=14).rsi.to_numpy()
+    # Confirmed up to the second-to-last bar, which saw the revised close
+    assert state.last_ts == pd.Timestamp("2024-01-01") + pd.Timedelta(days=len(close) - 2)
+    assert state.indicators[("rsi", 14)].value == pytest.approx(expected[-2])
+    # Only the first poll fetched the full history
+    assert engine.feed["calls"] == ["6mo", "1mo", "1mo"]
+
+
+def test_cross_on_forming_bar_fires_once(engine):
+    close = np.linspace(100, 90, 60)
+    engine.feed["close"] = close
+    engine.add_rule("price_cross", {"level": 95, "direction": "above"}, ["A.NS"])
+    assert engine.evaluate() == []
+
+    # A forming bar crosses, is revised (still above), then confirmed by a new bar
+    engine.feed["close"] = np.append(close, 96.0)
+    first = engine.evaluate()
+    engine.feed["close"] = np.append(close, 97.0)
+    second = engine.evaluate()
+    engine.feed["close"] = np.append(close, [97.5, 98.0])
+    third = engine.evaluate()
+    assert [a["close"] for a in first] == [96.0]
+    assert second == [] and third == []
+    assert [a["seq"] for a in engine.since(0)] == [1]
+
+
+def test_webhook_allowlist(engine):
+    assert _webhook_allowed("https://hooks.example.com/alerts/team", ["https://hooks.example.com/alerts/"])
+    assert not _webhook_allowed("https://hooks.example.com.evil.net/alerts/", ["https://hooks.example.com/alerts/"])
+    assert not _webhook_allowed("http://hooks.example.com/alerts/", ["https://hooks.example.com/alerts/"])
+    assert not _webhook_allowed("http://169.254.169.254/latest/", [])
+
+    rule = engine.add_rule("price_cross", {"level": 1}, ["A.NS"], webhook="https://hooks.example.com/alerts/x")
+    assert rule.webhook == "https://hooks.example.com/alerts/x"
+    with pytest.raises(ValueError):
+        engine.add_rule("price_cross", {"level": 1}, ["A.NS"], webhook="http://localhost:8080/admin")
+
+
+def test_subscribers_receive_alerts_published_from_another_thread(engine):
+    async def receive():
+        q = engine.subscribe()
+        threading.Thread(target=engine._publish, args=({"symbol": "A.NS", "webhook": None},)).start()
+        try:
+            return await asyncio.wait_for(q.get(), timeout=5)
+        finally:
+            engine.unsubscribe(q)
+
+    alert = asyncio.run(receive())
+    assert alert["symbol"] == "A.NS" and alert["seq"] == 1
+    assert engine.status()["subscribers"] == 0
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from app.bars import Bars, as_bars
+from conftest import make_frame
+
+
+def test_from_yfinance_multiindex_frame():
+    frame = make_frame("TCS.NS", n=10)
+    bars = Bars.from_frame(frame, symbol="TCS.NS")
+    assert len(bars) == 10 and not bars.empty
+    np.testing.assert_array_equal(bars.close, frame[("Close", "TCS.NS")].to_numpy())
+    assert bars.close.dtype == np.float64 and bars.close.flags["C_CONTIGUOUS"]
+    assert bars.last_close == float(frame[("Close", "TCS.NS")].iloc[-1])
+
+
+def test_from_flat_frame_with_missing_volume():
+    index = pd.date_range("2024-01-01", periods=3)
+    frame = pd.DataFrame({"Open": [1, 2, 3], "High": [1, 2, 3], "Low": [1, 2, 3], "Close": [1, 2, 3]}, index=index)
+    bars = Bars.from_frame(frame)
+    assert np.isnan(bars.volume).all()
+    assert bars.to_frame()["Close"].tolist() == [1.0, 2.0, 3.0]
+
+
+def test_empty_frame_gives_no_data_bars():
+    for frame in (None, pd.DataFrame()):
+        bars = Bars.from_frame(frame, symbol="NODATA.NS")
+        assert bars.empty and len(bars) == 0
+        assert bars.symbol == "NODATA.NS" and bars.last_close is None
+
+
+def test_close_series_shares_memory():
+    bars = as_bars(make_frame("A.NS", n=5))
+    series = bars.close_series()
+    assert np.shares_memory(series.to_numpy(), bars.close)
+    assert as_bars(bars) is bars
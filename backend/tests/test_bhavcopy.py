@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.bhavcopy import adjust_bars, ingest_bhavcopy, load_corporate_actions, read_bhavcopy
+from app.store import read_bars
+
+UDIFF = (
+    "TradDt,BizDt,Sgmt,Src,FinInstrmTp,FinInstrmId,ISIN,TckrSymb,SctySrs,OpnPric,HghPric,LwPric,ClsPric,TtlTradgVol\n"
+    "2024-07-08,2024-07-08,CM,NSE,STK,11536,INE467B01029,TCS,EQ,4000,4050,3990,4020,123456\n"
+)
+FULL = (
+    "SYMBOL, SERIES, DATE1, PREV_CLOSE, OPEN_PRICE, HIGH_PRICE, LOW_PRICE, LAST_PRICE, CLOSE_PRICE, TTL_TRD_QNTY\n"
+    "TCS, EQ, 08-Jul-2024, 3980, 4000, 4050, 3990, 4021, 4020, 123456\n"
+)
+LEGACY = (
+    "SYMBOL,SERIES,OPEN,HIGH,LOW,CLOSE,LAST,PREVCLOSE,TOTTRDQTY,TOTTRDVAL,TIMESTAMP,\n"
+    "TCS,EQ,4000,4050,3990,4020,4021,3980,123456,1.0,08-JUL-2024,\n"
+    "TCS,BE,1,1,1,1,1,1,1,1,08-JUL-2024,\n"
+)
+
+
+@pytest.mark.parametrize("name,text", [("udiff.csv", UDIFF), ("full.csv", FULL), ("legacy.csv", LEGACY)])
+def test_each_layout_parses_the_trade_date(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    frame = read_bhavcopy(str(path))
+    assert len(frame) == 1
+    row = frame.iloc[0]
+    assert row["symbol"] == "TCS"
+    assert row["date"] == pd.Timestamp("2024-07-08")
+    assert (row["Open"], row["High"], row["Low"], row["Close"], row["Volume"]) == (4000, 4050, 3990, 4020, 123456)
+
+
+def test_corporate_action_dates_and_factors(tmp_path):
+    path = tmp_path / "actions.csv"
+    path.write_text("symbol,ex_date,action,ratio\nTCS,2024-07-08,split,10:2\nINFY,09/07/2024,bonus,1:1\n")
+    actions = load_corporate_actions(str(path))
+    dates, factors = actions["TCS"]
+    assert pd.Timestamp(dates[0]) == pd.Timestamp("2024-07-08") and factors[0] == pytest.approx(0.2)
+    dates, factors = actions["INFY"]
+    assert pd.Timestamp(dates[0]) == pd.Timestamp("2024-07-09") and factors[0] == pytest.approx(0.5)
+
+
+def test_adjust_bars_scales_only_bars_before_each_ex_date():
+    index = pd.date_range("2024-07-01", periods=6, freq="D")
+    bars = pd.DataFrame({c: np.full(6, 100.0) for c in ("Open", "High", "Low", "Close")}, index=index)
+    bars["Volume"] = 10.0
+    ex_dates = np.array(["2024-07-03", "2024-07-05"], dtype="datetime64[ns]")
+    adjusted = adjust_bars(bars, ex_dates, np.array([0.5, 0.2]))
+    assert adjusted["Close"].tolist() == [10.0, 10.0, 20.0, 20.0, 100.0, 100.0]
+    assert adjusted["Volume"].tolist() == [100.0, 100.0, 50.0, 50.0, 10.0, 10.0]
+
+
+def test_ingest_writes_adjusted_bars(tmp_path):
+    source = tmp_path / "bhav"
+    source.mkdir()
+    for day, close in ((8, 4000), (9, 4100), (10, 820)):
+        (source / f"BhavCopy_NSE_CM_0_0_0_202407{day:02d}_F_0000.csv").write_text(
+            UDIFF.splitlines()[0] + "\n"
+            + f"2024-07-{day:02d},2024-07-{day:02d},CM,NSE,STK,1,X,TCS,EQ,{close},{close},{close},{close},100\n"
+        )
+    actions = tmp_path / "actions.csv"
+    actions.write_text("symbol,ex_date,action,ratio\nTCS,2024-07-10,split,10:2\n")
+    store = tmp_path / "store"
+    assert ingest_bhavcopy(str(source), actions_path=str(actions), root=str(store)) == 1
+    bars = read_bars("TCS.NS", "1d", root=str(store))
+    assert [d.day for d in bars.index] == [8, 9, 10]
+    assert bars["Close"].tolist() == pytest.approx([800.0, 820.0, 820.0])
+    assert read_bars("TCS.NS", "1d", raw=True, root=str(store))["Close"].tolist() == [4000, 4100, 820]
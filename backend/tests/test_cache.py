@@ -0,0 +1,77 @@
+import threading
+import time
+
+from app.cache import ShardedCache
+
+
+def test_update_is_atomic_per_key():
+    cache = ShardedCache(n_shards=4)
+
+    def bump():
+        for _ in range(500):
+            cache.update("n", lambda old: (old or 0) + 1)
+
+    threads = [threading.Thread(target=bump) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert cache.get("n") == 4000
+
+
+def test_lru_eviction_respects_can_evict():
+    cache = ShardedCache(n_shards=1, max_entries=2, can_evict=lambda v: v != "pinned")
+    cache.set("a", "pinned")
+    cache.set("b", 1)
+    cache.get("a")
+    cache.set("c", 2)
+    assert cache.get("a") == "pinned"
+    assert cache.get("b") is None
+    assert cache.get("c") == 2
+
+
+def test_expired_entries_are_dropped_on_read():
+    cache = ShardedCache(n_shards=2, ttl=0.05)
+    cache.set("k", 1)
+    assert cache.get("k") == 1
+    time.sleep(0.06)
+    assert cache.get("k") is None
+    assert cache.keys() == []
+    assert cache.stats()["evictions"] == 1
+
+
+def test_reads_sweep_idle_shards():
+    cache = ShardedCache(n_shards=16, ttl=0.05)
+    for i in range(32):
+        cache.set(("key", i), i)
+    time.sleep(0.06)
+    # Reading one key is enough to purge every expired entry, in all shards
+    cache.get("other")
+    assert cache.keys() == []
+
+
+def test_running_entries_never_expire():
+    cache = ShardedCache(n_shards=1, ttl=0.01, can_evict=lambda v: not v.get("running"))
+    cache.set("scan", {"running": True})
+    time.sleep(0.02)
+    assert cache.sweep() == 0
+    assert cache.get("scan") == {"running": True}
+
+
+def test_capacity_is_global_with_skewed_keys():
+    cache = ShardedCache(n_shards=8, max_entries=8)
+    # Eight keys that all land in the same shard
+    crowded = cache._shard("k0")
+    keys = [k for k in (f"k{i}" for i in range(1000)) if cache._shard(k) is crowded][:8]
+    for key in keys:
+        cache.set(key, key)
+        time.sleep(0.001)
+    assert sorted(cache.keys()) == sorted(keys)
+    assert cache.stats()["max_entries"] == 8
+
+    # Over capacity: the least recently used entry goes, whichever shard it is in
+    cache.get(keys[0])
+    cache.set("elsewhere", 1)
+    assert len(cache.keys()) == 8
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == keys[0] and cache.get("elsewhere") == 1
@@ -0,0 +1,138 @@
+import json
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import app.cli as cli
+from app.cli import Checkpoint, resolve_universe, write_results
+from app.jobs import JobManager, check_task
+
+RUN = {"command": "scan", "live": False}
+
+
+def test_checkpoint_resumes_and_ignores_truncated_line(tmp_path):
+    path = str(tmp_path / "run.checkpoint.jsonl")
+    checkpoint = Checkpoint(path, RUN)
+    checkpoint.add("A.NS", "ok", [{"symbol": "A.NS", "score": 1.5}])
+    checkpoint.add("B.NS", "error", error="timeout")
+    checkpoint.add("C.NS", "no_data")
+    checkpoint.close()
+    # Killed halfway through writing a record
+    with open(path, "a") as f:
+        f.write('{"symbol": "D.NS", "sta')
+
+    resumed = Checkpoint(path, RUN)
+    assert resumed.done() == {"A.NS", "C.NS"}
+    assert resumed.records["A.NS"]["rows"] == [{"symbol": "A.NS", "score": 1.5}]
+    resumed.add("B.NS", "ok", [{"symbol": "B.NS"}])
+    resumed.close()
+
+    assert Checkpoint(path, RUN).done() == {"A.NS", "B.NS", "C.NS"}
+
+
+def test_checkpoint_refuses_other_run_parameters(tmp_path):
+    path = str(tmp_path / "run.checkpoint.jsonl")
+    Checkpoint(path, RUN).close()
+    with pytest.raises(ValueError):
+        Checkpoint(path, {**RUN, "live": True})
+    fresh = Checkpoint(path, {**RUN, "live": True}, fresh=True)
+    fresh.close()
+    assert fresh.done() == set()
+
+
+def test_resolve_universe(index_file, tmp_path):
+    index_file({
+        "TEST": {"aliases": ["T"], "members": [
+            "A.NS", {"symbol": "B.NS", "to": "2024-01-01"}, {"symbol": "C.NS", "from": "2024-01-01"},
+        ]},
+    })
+    listing = tmp_path / "symbols.txt"
+    listing.write_text("# watchlist\nD.NS\nA.NS  # duplicate\n\n")
+
+    assert resolve_universe(["t"], str(listing), ["E.NS"]) == ["A.NS", "C.NS", "D.NS", "E.NS"]
+    assert resolve_universe(["TEST"], as_of="2023-06-30") == ["A.NS", "B.NS"]
+    with pytest.raises(ValueError):
+        resolve_universe(["NOPE"])
+
+
+def test_write_results_flattens_nested_rows(tmp_path):
+    path = str(tmp_path / "out.csv")
+    rows = [{"symbol": "A.NS", "metrics": {"sharpe": 1.2, "trades": 3}}, {"symbol": "B.NS", "metrics": {"sharpe": -0.4}}]
+    assert write_results(rows, path) == 2
+    frame = pd.read_csv(path)
+    assert list(frame.columns) == ["symbol", "metrics_sharpe", "metrics_trades"]
+    assert frame["metrics_sharpe"].tolist() == [1.2, -0.4]
+
+
+def test_main_resumes_failed_symbols_only(tmp_path, monkeypatch):
+    calls = []
+    failing = {"B.NS"}
+
+    def scan_symbol(symbol, live=False, cost_kwargs=None):
+        calls.append(symbol)
+        if symbol in failing:
+            raise RuntimeError("provider down")
+        return {"symbol": symbol, "score": len(symbol)}
+
+    monkeypatch.setattr(cli, "scan_symbol", scan_symbol)
+    output = str(tmp_path / "scan.csv")
+    argv = ["scan", "--symbols", "A.NS,B.NS,C.NS", "--engine", "serial", "--output", output]
+
+    cli.main(argv)
+    assert calls == ["A.NS", "B.NS", "C.NS"]
+    assert pd.read_csv(output)["symbol"].tolist() == ["A.NS", "C.NS"]
+
+    failing.clear()
+    cli.main(argv)
+    assert calls[3:] == ["B.NS"]
+    assert sorted(pd.read_csv(output)["symbol"]) == ["A.NS", "B.NS", "C.NS"]
+    with open(output + ".checkpoint.jsonl") as f:
+        assert json.loads(f.readline()) == {"run": {
+            "command": "scan", "live": False, "costs": None, "robustness": None, "strategies": None, "offline": False,
+        }}
+
+
+def test_unknown_strategy_is_a_usage_error(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exit:
+        cli.main(["strategies", "--symbols", "A.NS", "--strategies", "momentum,momentun",
+                  "--output", str(tmp_path / "m.csv")])
+    assert exit.value.code == 2
+    assert "momentun" in capsys.readouterr().err
+    assert not (tmp_path / "m.csv.checkpoint.jsonl").exists()
+
+
+def test_interrupt_records_running_symbols_before_closing_checkpoint(tmp_path, monkeypatch):
+    started = threading.Event()
+
+    def scan_symbol(symbol, live=False, cost_kwargs=None):
+        started.set()
+        while True:
+            time.sleep(0.01)
+            check_task()
+
+    class InterruptedManager(JobManager):
+        def submit(self, *args, **kwargs):
+            job = super().submit(*args, **kwargs)
+            wait = job.wait
+
+            def interrupted(timeout=None):
+                job.wait = wait
+                started.wait(5)
+                raise KeyboardInterrupt
+
+            job.wait = interrupted
+            return job
+
+    monkeypatch.setattr(cli, "scan_symbol", scan_symbol)
+    monkeypatch.setattr(cli, "JobManager", InterruptedManager)
+    output = str(tmp_path / "scan.csv")
+    with pytest.raises(KeyboardInterrupt):
+        cli.main(["scan", "--symbols", "A.NS,B.NS", "--workers", "1", "--output", output])
+
+    resumed = Checkpoint(output + ".checkpoint.jsonl", {
+        "command": "scan", "live": False, "costs": None, "robustness": None, "strategies": None, "offline": False,
+    })
+    resumed.close()
+    assert resumed.records["A.NS"]["status"] == "error"
@@ -0,0 +1,43 @@
+import pytest
+import vectorbt as vbt
+import pandas as pd
+
+from app.costs import broadcast_costs, resolve_costs
+from config import COST_MODELS
+
+
+def test_none_model_is_free():
+    assert resolve_costs("none") == {}
+
+
+def test_unknown_model_raises():
+    with pytest.raises(ValueError):
+        resolve_costs("no-such-model")
+
+
+@pytest.mark.parametrize("name", [n for n, m in COST_MODELS.items() if m])
+def test_round_trip_charges_the_model_total(name):
+    model = COST_MODELS[name]
+    kwargs = resolve_costs(name)
+    taxable = model.get("brokerage_pct", 0) + model.get("exchange_pct", 0) + model.get("sebi_pct", 0)
+    expected = (
+        2 * taxable * (1 + model.get("gst_pct", 0) / 100)
+        + model.get("stt_buy_pct", 0) + model.get("stt_sell_pct", 0) + model.get("stamp_buy_pct", 0)
+    )
+    assert 2 * kwargs["fees"] * 100 == pytest.approx(expected)
+
+
+def test_fees_reduce_the_simulated_return():
+    close = pd.Series([100.0, 101.0, 102.0, 103.0])
+    entries = pd.Series([True, False, False, False])
+    exits = pd.Series([False, False, False, True])
+    free = vbt.Portfolio.from_signals(close, entries, exits, init_cash=100000, freq="1D")
+    costs = resolve_costs("delivery")
+    charged = vbt.Portfolio.from_signals(close, entries, exits, init_cash=100000, freq="1D", **costs)
+    assert charged.total_return() < free.total_return()
+
+
+def test_broadcast_costs_per_column():
+    out = broadcast_costs({"fees": 0.001, "slippage": 0.0005}, 3)
+    assert out["fees"].tolist() == [0.001] * 3
+    assert out["slippage"].shape == (3,)
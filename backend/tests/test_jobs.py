@@ -0,0 +1,150 @@
+import threading
+import time
+
+import app.scanner as scanner
+from app.jobs import BULK, INTERACTIVE, JobManager, check_task, run_interactive
+
+
+def test_results_and_progress():
+    manager = JobManager(workers=3)
+    job = manager.submit("square", [1, 2, 3, 4], lambda x: x * x, collect=True)
+    assert job.wait(5)
+    assert sorted(job.results) == [1, 4, 9, 16]
+    assert job.snapshot()["progress"] == 4 and job.state == "done"
+
+
+def test_max_parallel_caps_a_job():
+    manager = JobManager(workers=4)
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def task(_):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+
+    job = manager.submit("capped", range(12), task, max_parallel=2)
+    assert job.wait(5)
+    assert peak[0] == 2
+
+
+def test_interactive_runs_ahead_of_queued_bulk():
+    manager = JobManager(workers=1)
+    order = []
+    started, gate = threading.Event(), threading.Event()
+
+    def bulk(symbol):
+        if symbol == "b1":
+            started.set()
+            gate.wait(5)
+        order.append(symbol)
+
+    job = manager.submit("bulk", ["b1", "b2", "b3"], bulk, priority=BULK, max_parallel=3)
+    # The only worker is busy with b1 while b2 and b3 wait in the queue
+    assert started.wait(5)
+    interactive = manager.submit("one", ["i1", "i2"], order.append, priority=INTERACTIVE)
+    gate.set()
+    assert interactive.wait(5) and job.wait(5)
+    assert order == ["b1", "i1", "i2", "b2", "b3"]
+
+
+def test_run_interactive_keeps_symbol_order():
+    manager = JobManager(workers=3)
+    delays = {"a": 0.06, "b": 0.03, "c": 0.0, "bad": 0.0}
+
+    def task(symbol):
+        time.sleep(delays[symbol])
+        if symbol == "bad":
+            raise ValueError(symbol)
+        return symbol.upper()
+
+    assert run_interactive("ordered", ["a", "bad", "b", "c"], task, manager=manager) == ["A", "B", "C"]
+
+
+def test_timeouts_are_cooperative_and_leave_no_threads():
+    manager = JobManager(workers=2)
+
+    def slow(_):
+        for _ in range(200):
+            time.sleep(0.01)
+            check_task()
+        return "finished"
+
+    before = threading.active_count()
+    job = manager.submit("slow", ["a", "b", "c"], slow, timeout=0.05, collect=True)
+    assert job.wait(5)
+    assert sorted(job.timed_out) == ["a", "b", "c"]
+    assert job.results == []
+    # Only the pool's own workers were started
+    assert threading.active_count() - before == 2
+
+
+def test_overrunning_task_without_checks_is_reported_as_timed_out():
+    manager = JobManager(workers=1)
+    job = manager.submit("overrun", ["a"], lambda s: time.sleep(0.1), timeout=0.02, collect=True)
+    assert job.wait(5)
+    assert job.timed_out == ["a"] and job.failed == 1
+
+
+def test_cancel_stops_running_tasks_at_the_next_check():
+    manager = JobManager(workers=1)
+    started = threading.Event()
+
+    def task(_):
+        started.set()
+        while True:
+            time.sleep(0.01)
+            check_task()
+
+    job = manager.submit("cancel", ["a", "b"], task)
+    assert started.wait(5)
+    assert job.cancel()
+    assert job.wait(5)
+    assert job.state == "cancelled" and job.completed == 1
+
+
+def test_coalesced_symbols_keep_each_jobs_own_timeout(monkeypatch):
+    # Two jobs share symbol X through the scanner's single-flight: the one
+    # with the short timeout computes it first and times out, the other
+    # (no timeout) must still get a result instead of inheriting the timeout
+    runs = []
+
+    def slow_scan(symbol, live, cost_kwargs):
+        runs.append(symbol)
+        for _ in range(30):
+            time.sleep(0.01)
+            check_task()
+        return {"symbol": symbol}
+
+    monkeypatch.setattr(scanner, "_scan_symbol", slow_scan)
+    manager = JobManager(workers=2)
+    short = manager.submit("short", ["X"], scanner.scan_symbol, timeout=0.1, collect=True)
+    while not runs:
+        time.sleep(0.001)
+    patient = manager.submit("patient", ["X"], scanner.scan_symbol, collect=True)
+    assert short.wait(5) and patient.wait(5)
+    assert short.timed_out == ["X"]
+    assert patient.timed_out == [] and patient.results == [{"symbol": "X"}]
+    assert runs == ["X", "X"]
+
+
+def test_waiting_on_a_coalesced_symbol_respects_own_deadline(monkeypatch):
+    release = threading.Event()
+
+    def blocked_scan(symbol, live, cost_kwargs):
+        release.wait(5)
+        return {"symbol": symbol}
+
+    monkeypatch.setattr(scanner, "_scan_symbol", blocked_scan)
+    manager = JobManager(workers=2)
+    leader = manager.submit("leader", ["Y"], scanner.scan_symbol, collect=True)
+    while scanner._FLIGHTS.in_flight() == 0:
+        time.sleep(0.001)
+    follower = manager.submit("follower", ["Y"], scanner.scan_symbol, timeout=0.1)
+    assert follower.wait(2)
+    assert follower.timed_out == ["Y"]
+    release.set()
+    assert leader.wait(5) and leader.results == [{"symbol": "Y"}]
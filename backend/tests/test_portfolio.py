@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.backtest import run_portfolio_backtest
+from conftest import make_frame
+
+
+def close_matrix(symbols, n=150):
+    return pd.concat([make_frame(s, n=n)["Close"] for s in symbols], axis=1)
+
+
+def test_contributions_add_up_to_total_pnl():
+    close = close_matrix(["A.NS", "B.NS", "C.NS"])
+    result = run_portfolio_backtest(close, strategy="momentum", freq="1D")
+    assert result["symbols"] == 3
+    total_pnl = sum(c["pnl"] for c in result["contributions"])
+    assert total_pnl == pytest.approx(result["final_value"] - result["init_cash"], rel=1e-9, abs=1e-6)
+    assert result["return_pct"] == pytest.approx(total_pnl / result["init_cash"] * 100, rel=1e-9, abs=1e-9)
+    assert len(result["equity"]) == len(close)
+
+
+def test_membership_mask_blocks_entries_outside_the_index():
+    close = close_matrix(["A.NS", "B.NS"])
+    never = np.zeros(close.shape, dtype=bool)
+    never[:, 0] = True
+    result = run_portfolio_backtest(close, strategy="momentum", freq="1D", membership=never)
+    pnl = {c["symbol"]: c["pnl"] for c in result["contributions"]}
+    assert pnl["B.NS"] == 0.0
@@ -0,0 +1,48 @@
+import json
+import os
+
+import pandas as pd
+
+import app.profiling as profiling
+from app.profiling import list_profiles, profile_thread, profiled_stream, request_session
+
+
+def test_middleware_only_installed_when_enabled():
+    import main
+
+    assert not main.PROFILING_ENABLED
+    assert all(getattr(m, "kwargs", {}).get("dispatch") is not main.profile_requests for m in main.app.user_middleware)
+    assert main.app.router.route_class is not profiling.ProfiledRoute
+
+
+def test_session_summary_attributes_time_to_libraries(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    with request_session("GET /api/test") as session:
+        with profile_thread(session):
+            pd.Series(range(50_000)).rolling(20).mean().sum()
+
+    with open(os.path.join(tmp_path, session.id + ".json")) as f:
+        summary = json.load(f)
+    assert summary["label"] == "GET /api/test" and summary["threads"] == 1
+    assert "pandas" in summary["self_seconds_by_library"]
+    assert any(e["library"] == "pandas" for e in summary["top_library_calls"])
+    assert [p["id"] for p in list_profiles()] == [session.id]
+
+
+def test_streamed_body_is_profiled_after_the_endpoint_returns(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+
+    def body():
+        yield "<table>"
+        yield str(pd.Series(range(50_000)).rolling(20).mean().sum())
+
+    with request_session("GET /api/scan?format=html") as session:
+        chunks = profiled_stream(body())
+    # The response has been returned but its body not generated yet
+    assert not os.path.exists(os.path.join(tmp_path, session.id + ".json"))
+
+    assert len(list(chunks)) == 2
+    with open(os.path.join(tmp_path, session.id + ".json")) as f:
+        summary = json.load(f)
+    assert "pandas" in summary["self_seconds_by_library"]
+    assert profiling.current_session() is None
@@ -0,0 +1,42 @@
+from fastapi.testclient import TestClient
+
+from app.render import stream_analyze_table, stream_scan_table
+
+
+def test_scan_table_streams_one_chunk_per_row():
+    produced = []
+
+    def rows():
+        for sym in ("A.NS", "<B>"):
+            produced.append(sym)
+            yield {"symbol": sym, "last_price": 10.0, "momentum_return": 1.234, "mean_rev_return": None}
+
+    chunks = stream_scan_table("NIFTY 50", rows())
+    head = next(chunks)
+    assert "NIFTY 50" in head and produced == []
+    first = next(chunks)
+    assert "A.NS" in first and "1.23" in first and produced == ["A.NS"]
+    rest = list(chunks)
+    assert "&lt;B&gt;" in rest[0] and "<B>" not in rest[0]
+    assert len(rest) == 2
+
+
+def test_analyze_table_reads_nested_metrics():
+    row = {
+        "symbol": "A.NS", "last_price": 5.0, "recommendation": "Strong Buy",
+        "momentum": {"signal": "Buy", "return_pct": 12.5, "sharpe": 1.5},
+        "mean_reversion": {"signal": "Hold", "return_pct": -3.0, "win_rate_pct": 40.0},
+    }
+    body = "".join(stream_analyze_table("t", [row]))
+    for text in ("12.50", "1.50", "-3.00", "40.00", "rec-Strong"):
+        assert text in body
+
+
+def test_static_pages_answer_304_for_matching_etag():
+    import main
+
+    client = TestClient(main.app)
+    first = client.get("/scan")
+    assert first.status_code == 200 and first.headers["etag"]
+    again = client.get("/scan", headers={"If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304
@@ -0,0 +1,101 @@
+import time
+
+import pandas as pd
+import pytest
+
+import app.data as data
+from app.resilience import CircuitBreaker, CircuitOpenError, NegativeCache, ProviderError, call_with_retries
+
+
+@pytest.fixture
+def yahoo(monkeypatch):
+    """Route fetch_data to a mocked yf.download, bypassing the local bar store."""
+    monkeypatch.delenv("USE_ZERODHA", raising=False)
+    monkeypatch.delenv("NSE_OFFLINE", raising=False)
+    monkeypatch.setattr(data, "load_period", lambda *a, **k: None)
+    monkeypatch.setattr(data, "_NO_DATA", NegativeCache(ttl=60))
+    monkeypatch.setitem(data._BREAKERS, "yahoo", CircuitBreaker("yahoo", threshold=3, reset_after=60))
+    monkeypatch.setattr(data, "FETCH_BACKOFF_SECONDS", 0.0)
+    calls = []
+
+    def install(download):
+        def wrapped(symbol, **kwargs):
+            calls.append(symbol)
+            return download(symbol, **kwargs)
+        monkeypatch.setattr(data.yf, "download", wrapped)
+        return calls
+    return install
+
+
+def test_empty_download_is_no_data_and_negatively_cached(yahoo):
+    calls = yahoo(lambda symbol, **kwargs: pd.DataFrame())
+    first = data.fetch_data("M&M.NS")
+    assert isinstance(first, pd.DataFrame) and first.empty
+    assert ("yahoo", "M&M.NS", "6mo", "1d") in data._NO_DATA
+    assert data.fetch_data("M&M.NS").empty
+    assert calls == ["M&M.NS"]
+
+
+def test_transient_errors_are_retried_then_return_empty(yahoo):
+    def fail(symbol, **kwargs):
+        raise ConnectionError("connection reset")
+
+    calls = yahoo(fail)
+    assert data.fetch_data("TCS.NS").empty
+    assert len(calls) == data.FETCH_RETRIES + 1
+    # Provider failures are not mistaken for missing data
+    assert ("yahoo", "TCS.NS", "6mo", "1d") not in data._NO_DATA
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("p", threshold=2, reset_after=0.05)
+
+    def fail():
+        raise ProviderError("down")
+
+    for _ in range(2):
+        with pytest.raises(ProviderError):
+            call_with_retries(fail, breaker, retries=0)
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        call_with_retries(lambda: 1, breaker)
+    time.sleep(0.06)
+    assert breaker.state == "half-open"
+    assert call_with_retries(lambda: 1, breaker) == 1
+    assert breaker.state == "closed"
+
+
+def test_no_data_answer_closes_a_half_open_breaker():
+    class NoData(Exception):
+        pass
+
+    def fail():
+        raise ProviderError("down")
+
+    def stop():
+        raise TimeoutError("caller out of time")
+
+    breaker = CircuitBreaker("p", threshold=1, reset_after=0.02)
+    with pytest.raises(ProviderError):
+        call_with_retries(fail, breaker, retries=0)
+    time.sleep(0.03)
+
+    # The caller's own check runs before the trial is taken
+    with pytest.raises(TimeoutError):
+        call_with_retries(lambda: 1, breaker, check=stop)
+    assert breaker.state == "half-open"
+
+    def empty():
+        raise NoData()
+
+    with pytest.raises(NoData):
+        call_with_retries(empty, breaker)
+    assert breaker.state == "closed"
+
+
+def test_negative_cache_expires():
+    cache = NegativeCache(ttl=0.02)
+    cache.add("k")
+    assert "k" in cache and len(cache) == 1
+    time.sleep(0.03)
+    assert "k" not in cache and len(cache) == 0
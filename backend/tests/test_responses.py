@@ -0,0 +1,38 @@
+import gzip
+import json
+
+import numpy as np
+import pytest
+from starlette.requests import Request
+
+import app.responses as responses
+from app.responses import dumps, json_response, to_columns
+
+CONTENT = {
+    "nan": float("nan"), "inf": float("inf"), "np_nan": np.float64("nan"),
+    "arr": np.array([1.0, np.inf]), "ok": [1, 2.5, np.int64(3)], "nested": {"x": -float("inf")},
+}
+EXPECTED = {"nan": None, "inf": None, "np_nan": None, "arr": [1.0, None], "ok": [1, 2.5, 3], "nested": {"x": None}}
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_non_finite_values_encode_as_null(monkeypatch, use_orjson):
+    if use_orjson and responses.orjson is None:
+        pytest.skip("orjson not installed")
+    if not use_orjson:
+        monkeypatch.setattr(responses, "orjson", None)
+    assert json.loads(dumps(CONTENT)) == EXPECTED
+
+
+def test_to_columns_flattens_nested_rows():
+    out = to_columns([{"symbol": "A", "m": {"sharpe": 1.0}}, {"symbol": "B", "extra": 2}])
+    assert out["columns"] == ["symbol", "m.sharpe", "extra"]
+    assert out["rows"] == [["A", 1.0, None], ["B", None, 2]]
+
+
+def test_large_bodies_are_gzipped_when_accepted():
+    request = Request({"type": "http", "headers": [(b"accept-encoding", b"gzip")]})
+    rows = [{"symbol": f"S{i}", "value": i} for i in range(200)]
+    response = json_response(request, rows)
+    assert response.headers["content-encoding"] == "gzip"
+    assert json.loads(gzip.decompress(response.body)) == rows
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import app.data
+import app.risk as risk
+from app.cache import ShardedCache
+from app.risk import RollingCovariance, risk_matrix
+from conftest import make_frame
+
+SYMBOLS = ["A.NS", "B.NS", "C.NS"]
+
+
+def test_rolling_covariance_matches_pandas():
+    rng = np.random.default_rng(0)
+    rows = rng.normal(size=(120, 4))
+    rows[5, 1] = np.nan
+    rows[70:75, 2] = np.nan
+    window = 30
+    model = RollingCovariance.from_rows(rows[:40], window)
+    for row in rows[40:]:
+        model.push(row)
+    expected = pd.DataFrame(rows[-window:])
+    np.testing.assert_allclose(model.cov(), expected.cov().to_numpy(), atol=1e-12)
+    np.testing.assert_allclose(model.corr(), expected.corr().to_numpy(), atol=1e-12)
+
+    revised = rows[-1] + 0.5
+    model.replace_last(revised)
+    expected.iloc[-1] = revised
+    np.testing.assert_allclose(model.cov(), expected.cov().to_numpy(), atol=1e-12)
+
+
+@pytest.fixture
+def market(monkeypatch, index_file):
+    """Prices up to a movable 'now', served by period like a real provider."""
+    frames = {s: make_frame(s, n=400) for s in SYMBOLS + ["^BENCH"]}
+    state = {"end": 300, "calls": []}
+
+    def fetch(symbol, period="6mo", interval="1d"):
+        state["calls"].append(period)
+        frame = frames[symbol].iloc[:state["end"]]
+        return frame.iloc[-30:] if period == "1mo" else frame
+
+    monkeypatch.setattr(app.data, "fetch_data", fetch)
+    monkeypatch.setattr(risk, "_MODELS", ShardedCache(n_shards=1))
+    state["frames"] = frames
+    return state
+
+
+def fresh(window):
+    # What a model built from scratch says for the current data
+    saved = risk._MODELS
+    risk._MODELS = ShardedCache(n_shards=1)
+    try:
+        return risk_matrix("TEST", SYMBOLS, window=window)
+    finally:
+        risk._MODELS = saved
+
+
+def assert_same(result, expected):
+    assert result["as_of"] == expected["as_of"] and result["bars"] == expected["bars"]
+    np.testing.assert_allclose(np.array(result["covariance"], dtype=float), np.array(expected["covariance"], dtype=float), rtol=1e-9)
+    for s in SYMBOLS:
+        assert result["beta"][s] == pytest.approx(expected["beta"][s], rel=1e-9)
+
+
+def test_cached_model_is_fed_only_recent_bars(market):
+    first = risk_matrix("TEST", SYMBOLS, window=20)
+    assert first["benchmark"] == "^BENCH" and "2y" in market["calls"]
+    returns = market["frames"]["A.NS"]["Close"].iloc[:300].pct_change().iloc[-20:, 0]
+    bench = market["frames"]["^BENCH"]["Close"].iloc[:300].pct_change().iloc[-20:, 0]
+    assert first["beta"]["A.NS"] == pytest.approx(returns.cov(bench) / bench.var(), rel=1e-9)
+
+    market["end"] = 305
+    market["calls"].clear()
+    advanced = risk_matrix("TEST", SYMBOLS, window=20)
+    assert set(market["calls"]) == {"1mo"}
+    assert_same(advanced, fresh(20))
+
+    # Another window gets its own model, and neither replaces the other
+    market["calls"].clear()
+    wider = risk_matrix("TEST", SYMBOLS, window=45)
+    assert "2y" in market["calls"]
+    assert_same(wider, fresh(45))
+    assert sorted(risk._MODELS.keys()) == [("TEST", "1d", 20), ("TEST", "1d", 45)]
+    market["calls"].clear()
+    cached = risk_matrix("TEST", SYMBOLS, window=20)
+    assert set(market["calls"]) == {"1mo"}
+    assert_same(cached, fresh(20))
+
+
+def test_revised_last_bar_is_reapplied(market):
+    risk_matrix("TEST", SYMBOLS, window=20)
+    close = market["frames"]["B.NS"][("Close", "B.NS")]
+    close.iloc[299] *= 1.05
+    assert_same(risk_matrix("TEST", SYMBOLS, window=20), fresh(20))
+
+
+def test_gap_longer_than_update_period_rebuilds(market):
+    risk_matrix("TEST", SYMBOLS, window=20)
+    market["end"] = 390
+    market["calls"].clear()
+    result = risk_matrix("TEST", SYMBOLS, window=20)
+    assert "2y" in market["calls"]
+    assert_same(result, fresh(20))
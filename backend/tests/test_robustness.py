@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+import vectorbt as vbt
+
+from app.backtest import run_analysis
+from app.robustness import block_bootstrap_indices, bootstrap_returns, max_drawdowns, periods_per_year
+from conftest import make_frame
+
+
+def test_block_indices_are_runs_of_consecutive_bars():
+    idx = block_bootstrap_indices(np.random.default_rng(0), 50, 103, 5)
+    assert idx.shape == (50, 103)
+    assert idx.min() >= 0 and idx.max() < 103
+    blocks = idx[:, :100].reshape(50, 20, 5)
+    assert (np.diff(blocks, axis=2) == 1).all()
+
+
+def test_max_drawdowns_match_equity_curve():
+    returns = np.array([[0.1, -0.5, 0.2, 0.0], [0.01, 0.01, 0.01, 0.01]])
+    np.testing.assert_allclose(max_drawdowns(returns), [-0.5, 0.0])
+
+
+def test_periods_per_year_follows_vectorbt_year_freq():
+    assert periods_per_year("1D") == 365
+    assert periods_per_year("5m") == 365 * 288
+
+
+@pytest.mark.parametrize("freq", ["1D", "5m"])
+def test_bootstrap_median_sharpe_matches_portfolio_sharpe(freq):
+    rng = np.random.default_rng(1)
+    close = 100 * np.cumprod(1 + rng.normal(0.001, 0.01, 2000))
+    index = pd.date_range("2020-01-01", periods=len(close), freq=freq.replace("m", "min"))
+    pf = vbt.Portfolio.from_holding(pd.Series(close, index=index), freq=freq)
+    result = bootstrap_returns(pf.returns(), freq=freq, n_samples=2000, block=5, seed=0)
+    assert result["sharpe"]["p50"] == pytest.approx(pf.sharpe_ratio(), rel=0.1)
+
+
+def test_run_analysis_attaches_intervals():
+    analysis = run_analysis(make_frame("A.NS", n=200), freq="1D", robustness={"n_samples": 200, "block": 5, "seed": 0})
+    robustness = analysis["momentum"]["robustness"]
+    assert set(robustness["sharpe"]) == {"p5", "p50", "p95"}
+    assert robustness["sharpe"]["p5"] <= robustness["sharpe"]["p50"] <= robustness["sharpe"]["p95"]
+    assert 0.0 <= robustness["prob_sharpe_gt_1"] <= 1.0
@@ -0,0 +1,56 @@
+import time
+
+from fastapi.testclient import TestClient
+
+import main
+
+
+def wait_for_scan(client, index, **params):
+    for _ in range(500):
+        status = client.get("/api/scan-status", params={"index": index, **params}).json()
+        if not status["running"] and status["total"]:
+            return status
+        time.sleep(0.02)
+    raise AssertionError("scan did not finish")
+
+
+def test_since_returns_only_newer_rows(fake_prices, index_file):
+    client = TestClient(main.app)
+    assert client.get("/api/scan-start", params={"index": "TEST"}).json()["started"]
+    status = wait_for_scan(client, "TEST")
+    assert status["progress"] == status["total"] == 3
+
+    full = client.get("/api/scan-results", params={"index": "TEST"}).json()
+    assert full["full"] and {r["symbol"] for r in full["results"]} == {"A.NS", "B.NS", "C.NS"}
+
+    delta = client.get("/api/scan-results", params={"index": "TEST", "since": full["seq"]}).json()
+    assert (delta["full"], delta["results"], delta["seq"]) == (False, [], full["seq"])
+
+    # A restarted scan invalidates old sequence numbers: the client gets everything again
+    client.get("/api/scan-start", params={"index": "TEST"})
+    wait_for_scan(client, "TEST")
+    again = client.get("/api/scan-results", params={"index": "TEST", "since": full["seq"]}).json()
+    assert again["full"] and len(again["results"]) == 3 and again["seq"] > full["seq"]
+
+
+def test_as_of_scans_are_kept_apart_from_todays(fake_prices, index_file):
+    index_file({"PAST": {"members": [
+        "A.NS", {"symbol": "OLD.NS", "to": "2024-01-01"}, {"symbol": "NEW.NS", "from": "2024-01-01"},
+    ]}})
+    client = TestClient(main.app)
+    assert client.get("/api/scan-start", params={"index": "PAST", "as_of": "2023-06-30"}).json()["started"]
+    wait_for_scan(client, "PAST", as_of="2023-06-30")
+    # Today's scan is a different key, so it starts rather than reporting "already running"
+    assert client.get("/api/scan-start", params={"index": "PAST"}).json()["started"]
+    wait_for_scan(client, "PAST")
+
+    past = client.get("/api/scan-results", params={"index": "PAST", "as_of": "2023-06-30"}).json()
+    today = client.get("/api/scan-results", params={"index": "PAST"}).json()
+    assert {r["symbol"] for r in past["results"]} == {"A.NS", "OLD.NS"}
+    assert {r["symbol"] for r in today["results"]} == {"A.NS", "NEW.NS"}
+
+    # Only today's constituents are ranked
+    ranked = client.get("/api/screener", params={"index": "PAST", "n": 10}).json()
+    assert {r["symbol"] for r in ranked["results"]} == {"A.NS", "NEW.NS"}
+
+    assert client.get("/api/scan-status", params={"index": "PAST", "as_of": "June"}).status_code == 400
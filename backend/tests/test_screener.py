@@ -0,0 +1,62 @@
+from app.screener import screen, update_screener
+
+
+def rows(values):
+    return [{"symbol": s, "momentum_return": v} for s, v in values.items()]
+
+
+def test_top_and_bottom_n():
+    update_screener("T-TOPN", rows({"A": 5.0, "B": -2.0, "C": 9.0, "D": 1.0}))
+    top = screen("T-TOPN", metric="return", n=2)
+    assert [r["symbol"] for r in top["results"]] == ["C", "A"]
+    assert top["results"][0]["percentile"] == 100.0
+    bottom = screen("T-TOPN", metric="return", n=1, order="bottom")
+    assert [r["symbol"] for r in bottom["results"]] == ["B"]
+    assert bottom["results"][0]["percentile"] == 0.0
+
+
+def test_updates_rerank_incrementally():
+    update_screener("T-INCR", rows({f"S{i}": float(i) for i in range(40)}))
+    assert screen("T-INCR", n=1)["results"][0]["symbol"] == "S39"
+    update_screener("T-INCR", rows({"S0": 100.0, "NEW": 50.0}))
+    result = screen("T-INCR", n=2)["results"]
+    assert [r["symbol"] for r in result] == ["S0", "NEW"]
+    # 41 symbols now: the lowest remaining (S1) is at the 0th percentile
+    lowest = screen("T-INCR", n=1, order="bottom")["results"][0]
+    assert (lowest["symbol"], lowest["percentile"]) == ("S1", 0.0)
+
+
+def test_intervals_are_ranked_separately():
+    update_screener("T-INTV", rows({"A": 1.0, "B": 2.0}), interval="1d")
+    update_screener("T-INTV", rows({"A": 9.0, "C": 0.5}), interval="5m")
+    daily = screen("T-INTV", n=5)
+    live = screen("T-INTV", n=5, interval="5m")
+    assert [r["symbol"] for r in daily["results"]] == ["B", "A"]
+    assert [(r["symbol"], r["value"]) for r in live["results"]] == [("A", 9.0), ("C", 0.5)]
+
+
+def test_missing_metrics_keep_previous_values():
+    update_screener("T-KEEP", [{"symbol": "A", "momentum_return": 3.0, "rsi": 40.0}])
+    update_screener("T-KEEP", [{"symbol": "A", "momentum_return": 4.0}])
+    result = screen("T-KEEP", metric="rsi", n=1)["results"][0]
+    assert result["value"] == 40.0
+    assert result["percentiles"]["return"] == 100.0
+
+
+def test_cost_models_are_ranked_separately():
+    update_screener("T-COST", rows({"A": 5.0, "B": 4.0}), costs="none")
+    update_screener("T-COST", rows({"A": 1.0, "B": 3.0}), costs="delivery")
+    gross = screen("T-COST", n=1, costs="none")
+    net = screen("T-COST", n=1, costs="delivery")
+    assert (gross["costs"], gross["results"][0]["symbol"]) == ("none", "A")
+    assert (net["costs"], net["results"][0]["symbol"]) == ("delivery", "B")
+    assert screen("T-COST", n=1)["results"] == []
+
+
+def test_percentiles_follow_repeated_updates():
+    update_screener("T-MOVE", rows({"A": 1.0, "B": 2.0, "C": 3.0}))
+    for value in (10.0, -5.0, 2.0):
+        update_screener("T-MOVE", rows({"A": value}))
+    result = {r["symbol"]: r["percentile"] for r in screen("T-MOVE", n=3)["results"]}
+    # A and B tie at 2.0 and share the lower rank
+    assert result == {"C": 100.0, "A": 0.0, "B": 0.0}
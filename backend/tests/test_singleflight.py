@@ -0,0 +1,77 @@
+import threading
+import time
+
+import pytest
+
+from app.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def slow(x):
+        calls.append(x)
+        release.wait(5)
+        return [x]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flights.do("k", slow, 1))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    while flights.in_flight() == 0:
+        time.sleep(0.001)
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+    assert calls == [1]
+    assert len(results) == 5 and all(r is results[0] for r in results)
+    assert flights.in_flight() == 0
+
+
+def test_errors_are_shared_and_not_cached():
+    flights = SingleFlight()
+
+    def boom():
+        raise RuntimeError("nope")
+
+    with pytest.raises(RuntimeError):
+        flights.do("k", boom)
+    assert flights.do("k", lambda: 42) == 42
+
+
+def test_different_keys_run_separately():
+    flights = SingleFlight()
+    assert flights.do("a", lambda: 1) == 1
+    assert flights.do("b", lambda: 2) == 2
+
+
+def test_waiters_rerun_on_the_leaders_own_errors():
+    class LeaderStopped(Exception):
+        pass
+
+    flights = SingleFlight(retry_on=(LeaderStopped,))
+    entered, release = threading.Event(), threading.Event()
+    calls = []
+
+    def work(fail):
+        calls.append(fail)
+        if fail:
+            entered.set()
+            release.wait(5)
+            raise LeaderStopped()
+        return "ok"
+
+    leader = threading.Thread(target=lambda: pytest.raises(LeaderStopped, flights.do, "k", work, True))
+    leader.start()
+    assert entered.wait(5)
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(flights.do("k", work, False)))
+    waiter.start()
+    time.sleep(0.05)
+    release.set()
+    leader.join()
+    waiter.join()
+    assert result == ["ok"] and calls == [True, False]
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.backtest import run_strategy_matrix
+from app.strategies import STRATEGIES, register_strategy, stacked_signals, strategy_signals
+from conftest import make_frame
+
+
+@pytest.fixture
+def close():
+    return pd.concat([make_frame(s, n=200)["Close"] for s in ("A.NS", "B.NS")], axis=1)
+
+
+def test_stacked_signals_match_per_strategy_signals(close):
+    names = list(STRATEGIES)
+    stacked_close, entries, exits = stacked_signals(close, names)
+    assert stacked_close.shape == (len(close), len(names) * close.shape[1])
+    for name in names:
+        e, x = strategy_signals(name, close)
+        np.testing.assert_array_equal(entries[name].to_numpy(), e.to_numpy())
+        np.testing.assert_array_equal(exits[name].to_numpy(), x.to_numpy())
+
+
+def test_matrix_has_every_symbol_strategy_pair(close):
+    matrix = run_strategy_matrix(close, strategies=["momentum", "macd"], freq="1D")
+    assert set(matrix) == {"A.NS", "B.NS"}
+    assert all(set(row) == {"momentum", "macd"} for row in matrix.values())
+
+
+def test_register_rejects_unknown_indicator():
+    with pytest.raises(ValueError):
+        register_strategy("bad", "no-such-indicator")
@@ -0,0 +1,108 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.bars import Bars
+from app.ticks import BarRing, LiveFeed, ReplayTickSource
+
+TICKS = """symbol,ts,price,volume
+TCS.NS,2024-03-05 09:15:02,100.0,10
+INFY.NS,2024-03-05 09:15:03,50.0,5
+TCS.NS,2024-03-05 09:16:40,101.5,20
+TCS.NS,2024-03-05 09:19:59,99.0,5
+TCS.NS,2024-03-05 09:20:00,99.5,7
+INFY.NS,2024-03-05 09:21:00,51.0,1
+TCS.NS,2024-03-05 09:24:30,102.0,3
+TCS.NS,2024-03-05 09:23:00,98.0,4
+TCS.NS,2024-03-05 09:31:00,103.0,8
+"""
+
+
+def _wait(feed, ticks, timeout=5):
+    deadline = time.monotonic() + timeout
+    while feed.status()["ticks"] < ticks:
+        assert time.monotonic() < deadline, "replay did not finish"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def replayed(tmp_path):
+    path = tmp_path / "ticks.csv"
+    path.write_text(TICKS)
+    feed = LiveFeed(capacity={"1m": 100, "5m": 50}, stale_after=60)
+    feed.start(ReplayTickSource(str(path)))
+    _wait(feed, 9)
+    yield feed
+    feed.stop()
+
+
+def test_replay_aggregates_5m_ohlcv(replayed):
+    bars = replayed.bars("TCS.NS", "5m")
+    assert list(bars.index.strftime("%H:%M")) == ["09:15", "09:20", "09:30"]
+    assert str(bars.index.tz) == "Asia/Kolkata"
+    # 09:25 has no ticks, so no bar; 09:23 arrived after 09:24:30 but is in the same bucket
+    np.testing.assert_array_equal(bars.open, [100.0, 99.5, 103.0])
+    np.testing.assert_array_equal(bars.high, [101.5, 102.0, 103.0])
+    np.testing.assert_array_equal(bars.low, [99.0, 98.0, 103.0])
+    np.testing.assert_array_equal(bars.close, [99.0, 98.0, 103.0])
+    np.testing.assert_array_equal(bars.volume, [35.0, 14.0, 8.0])
+
+    infy = replayed.bars("INFY.NS", "1m")
+    assert list(infy.index.strftime("%H:%M")) == ["09:15", "09:21"]
+    assert replayed.bars("WIPRO.NS", "5m") is None
+
+
+def test_bars_period_filters_tz_aware_index(replayed):
+    for period in ("ytd", "1d", "5d", "1mo"):
+        assert len(replayed.bars("TCS.NS", "5m", period=period)) == 3
+
+
+def test_seed_backfills_behind_ticks_already_received():
+    ring = BarRing(300, capacity=4)
+    first_tick = pd.Timestamp("2024-03-05 09:20:30", tz="Asia/Kolkata").value
+    ring.update(first_tick, 99.5, 7)
+
+    index = pd.date_range("2024-03-05 09:00", periods=5, freq="5min", tz="Asia/Kolkata")
+    close = np.array([95.0, 96.0, 97.0, 98.0, 90.0])
+    ring.seed(Bars(index, close, close, close, close, np.full(5, 100.0)))
+
+    bars = ring.to_bars()
+    # History up to 09:15 fills the room left; the 09:20 bar keeps its tick values
+    assert list(bars.index.strftime("%H:%M")) == ["09:05", "09:10", "09:15", "09:20"]
+    np.testing.assert_array_equal(bars.close, [96.0, 97.0, 98.0, 99.5])
+    np.testing.assert_array_equal(bars.volume, [100.0, 100.0, 100.0, 7.0])
+
+    # Later ticks keep building on the newest bar
+    ring.update(first_tick + 60 * 10**9, 101.0, 3)
+    assert ring.to_bars().close[-1] == 101.0 and ring.to_bars().volume[-1] == 10.0
+
+
+def test_start_backfills_while_ticks_flow(tmp_path):
+    path = tmp_path / "ticks.csv"
+    path.write_text(TICKS)
+    source = ReplayTickSource(str(path))
+    source.symbols = ("TCS.NS",)
+    calls = []
+
+    def backfill(symbol, period="5d", interval="5m"):
+        calls.append((symbol, interval))
+        index = pd.date_range("2024-03-04 15:20", periods=2, freq="5min", tz="Asia/Kolkata")
+        return pd.DataFrame({"Open": [97.0, 98.0], "High": [97.0, 98.0], "Low": [97.0, 98.0],
+                             "Close": [97.0, 98.0], "Volume": [1.0, 2.0]}, index=index)
+
+    feed = LiveFeed(capacity={"1m": 100, "5m": 50}, stale_after=60)
+    feed.start(source, backfill=backfill)
+    try:
+        _wait(feed, 9)
+        deadline = time.monotonic() + 5
+        while len(feed.bars("TCS.NS", "5m")) < 5:
+            assert time.monotonic() < deadline, "backfill did not finish"
+            time.sleep(0.01)
+        bars = feed.bars("TCS.NS", "5m")
+        assert list(bars.index.strftime("%d %H:%M")) == ["04 15:20", "04 15:25", "05 09:15", "05 09:20", "05 09:30"]
+        assert sorted(calls) == [("TCS.NS", "1m"), ("TCS.NS", "5m")]
+        assert len(feed.bars("TCS.NS", "5m", period="1d")) == 3
+    finally:
+        feed.stop()
@@ -0,0 +1,111 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app.universe as universe
+from app.universe import IndexUniverse, get_universe, parse_as_of
+
+DEFINITIONS = {
+    "NIFTY 50": {
+        "aliases": ["NSE 50"],
+        "benchmark": "^NSEI",
+        "members": ["A.NS", "B.NS", {"symbol": "OLD.NS", "to": "2023-03-31"},
+                    {"symbol": "NEW.NS", "from": "2023-03-31"}],
+    },
+    "NIFTY BANK": {
+        "members": ["B.NS", {"symbol": "BANK.NS", "from": "2022-01-01", "to": "2024-01-01"}],
+    },
+}
+
+
+@pytest.fixture
+def indexes():
+    return IndexUniverse(DEFINITIONS)
+
+
+def test_names_and_aliases(indexes):
+    assert indexes.names() == ["NIFTY 50", "NIFTY BANK"]
+    assert indexes.default() == "NIFTY 50"
+    assert indexes.resolve("nse 50") == indexes.resolve("Nifty 50") == "NIFTY 50"
+    assert indexes.resolve("SENSEX") is None
+    assert indexes.benchmark("NIFTY 50") == "^NSEI" and indexes.benchmark("NIFTY BANK") is None
+
+
+def test_members_as_of(indexes):
+    assert indexes.members("NIFTY 50", parse_as_of("2023-03-30")) == ("A.NS", "B.NS", "OLD.NS")
+    # `to` is exclusive and `from` inclusive: the swap happens on 2023-03-31
+    assert indexes.members("NIFTY 50", parse_as_of("2023-03-31")) == ("A.NS", "B.NS", "NEW.NS")
+    assert indexes.members("NIFTY 50") == ("A.NS", "B.NS", "NEW.NS")
+    assert indexes.members("NIFTY BANK", parse_as_of("2021-06-30")) == ("B.NS",)
+    assert indexes.is_member("BANK.NS", "NIFTY BANK", parse_as_of("2023-06-30"))
+    assert not indexes.is_member("BANK.NS", "NIFTY BANK")
+    assert not indexes.is_member("UNKNOWN.NS", "NIFTY BANK")
+
+
+def test_union_intersection_and_indexes_of(indexes):
+    when = parse_as_of("2023-06-30")
+    names = ["NIFTY 50", "NIFTY BANK"]
+    assert set(indexes.union(names, when)) == {"A.NS", "B.NS", "NEW.NS", "BANK.NS"}
+    assert indexes.intersection(names, when) == ("B.NS",)
+    assert indexes.intersection([]) == ()
+    assert indexes.indexes_of("B.NS") == names
+    assert indexes.indexes_of("OLD.NS", parse_as_of("2022-06-30")) == ["NIFTY 50"]
+    assert set(indexes.members_between("NIFTY 50")) == {"A.NS", "B.NS", "OLD.NS", "NEW.NS"}
+    assert set(indexes.members_between("NIFTY 50", start=parse_as_of("2023-04-01"))) == {"A.NS", "B.NS", "NEW.NS"}
+
+
+def test_members_keep_file_order():
+    indexes = IndexUniverse({
+        "FIRST": {"members": ["A.NS", "B.NS", "C.NS"]},
+        "SECOND": {"members": ["C.NS", {"symbol": "D.NS", "to": "2023-01-01"}, "A.NS", "E.NS"]},
+    })
+    when = parse_as_of("2022-06-30")
+    assert indexes.members("SECOND", when) == ("C.NS", "D.NS", "A.NS", "E.NS")
+    assert indexes.members("SECOND") == ("C.NS", "A.NS", "E.NS")
+    assert indexes.union(["SECOND", "FIRST"], when) == ("C.NS", "D.NS", "A.NS", "E.NS", "B.NS")
+    assert indexes.intersection(["SECOND", "FIRST"]) == ("C.NS", "A.NS")
+    assert indexes.members_between("SECOND") == ("C.NS", "D.NS", "A.NS", "E.NS")
+
+
+def test_membership_mask(indexes):
+    dates = pd.DatetimeIndex(["2023-03-30 15:30", "2023-03-31 09:15"], tz="Asia/Kolkata")
+    mask = indexes.membership_mask("NIFTY 50", dates, ["OLD.NS", "NEW.NS", "A.NS", "UNKNOWN.NS"])
+    np.testing.assert_array_equal(mask, [[True, False, True, False], [False, True, True, False]])
+
+
+def test_invalid_definitions_and_dates():
+    with pytest.raises(ValueError):
+        IndexUniverse({"X": {"members": "A.NS"}})
+    with pytest.raises(ValueError):
+        IndexUniverse({"X": {"members": [{"symbol": "A.NS", "from": "2024-01-01", "to": "2023-01-01"}]}})
+    with pytest.raises(ValueError):
+        IndexUniverse({"X": {"aliases": ["Y"], "members": []}, "Y": {"members": []}})
+    assert parse_as_of(None) is None and parse_as_of("") is None
+    for bad in ("June", "2023-13-01", "yesterday-ish"):
+        with pytest.raises(ValueError):
+            parse_as_of(bad)
+
+
+def test_hot_reload_keeps_previous_universe_on_error(index_file, monkeypatch):
+    monkeypatch.setattr(universe, "INDEX_RELOAD_SECONDS", 0)
+    path = universe.INDEX_FILE
+    assert get_universe().names() == ["TEST"]
+
+    def touch(text, mtime):
+        with open(path, "w") as f:
+            f.write(text)
+        os.utime(path, (mtime, mtime))
+
+    touch(json.dumps({"indexes": {"OTHER": {"members": ["X.NS"]}}}), 1_700_000_000)
+    assert get_universe().names() == ["OTHER"]
+
+    touch('{"indexes": {"BROKEN": ', 1_700_000_100)
+    assert get_universe().names() == ["OTHER"]
+    assert universe._FAILED_MTIME == 1_700_000_100
+
+    touch(json.dumps({"indexes": {"FIXED": {"members": ["Y.NS"]}}}), 1_700_000_200)
+    assert get_universe().names() == ["FIXED"]
+    assert universe.default_symbols() == ["Y.NS"]